@@ -0,0 +1,77 @@
+import datetime
+from collections import namedtuple
+from functools import lru_cache
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+WEEKS_RU = {
+    'n': 'Числитель',
+    'd': 'Знаменатель',
+}
+
+WEEKDAYS_RU = ('Понедельник', 'Вторник', 'Среда', 'Четверг', 'Пятница', 'Суббота', 'Воскресенье')
+
+CalendarDay = namedtuple('CalendarDay', ('date', 'week', 'weekday', 'semester', 'is_holiday'))
+
+
+def iso_week_parity(date):
+    if date.isocalendar().week % 2 == 0:
+        return 'd'
+    return 'n'
+
+
+class AcademicCalendar:
+    def __init__(self, first_year, last_year):
+        self._week_parity = import_string(settings.ACADEMIC_WEEK_PARITY)
+        self._holidays = set(settings.ACADEMIC_HOLIDAYS)
+        self._days = {}
+
+        date = datetime.date(first_year, 1, 1)
+        while date.year <= last_year:
+            self._days[date] = self._generate_day(date)
+            date += datetime.timedelta(days=1)
+
+    def get_day(self, date):
+        day = self._days.get(date)
+        if day is None:
+            day = self._generate_day(date)
+        return day
+
+    def get_days(self, first_date, last_date):
+        days = []
+        date = first_date
+        while date <= last_date:
+            days.append(self.get_day(date))
+            date += datetime.timedelta(days=1)
+        return days
+
+    def get_semester_bounds(self, date):
+        for year in (date.year, date.year + 1):
+            for _, (start_month, start_day), (end_month, end_day) in settings.SCHEDULE_SEMESTERS:
+                end = datetime.date(year, end_month, end_day)
+                if date <= end:
+                    return datetime.date(year, start_month, start_day), end
+
+    def _generate_day(self, date):
+        return CalendarDay(
+            date=date,
+            week=self._week_parity(date),
+            weekday=date.weekday(),
+            semester=self._get_semester(date),
+            is_holiday=date.weekday() == 6 or (date.month, date.day) in self._holidays,
+        )
+
+    @staticmethod
+    def _get_semester(date):
+        for name, start, end in settings.SCHEDULE_SEMESTERS:
+            if start <= (date.month, date.day) <= end:
+                return f'{date.year}-{name}'
+        return None
+
+
+@lru_cache(maxsize=None)
+def get_academic_calendar():
+    year = timezone.localdate().year
+    return AcademicCalendar(year - 1, year + 1)
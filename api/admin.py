@@ -1,11 +1,18 @@
-from django.contrib import admin
+import zipfile
+
+from django import forms
+from django.contrib import admin, messages
 from django.contrib.admin import ModelAdmin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth.models import Group
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import path
 from django.utils.translation import gettext_lazy as _
 import sys, inspect
 
-from .models import User, Map, Schedule, CourseGroup, Publication, Student, Professor, Event
+from .models import User, Map, Schedule, CourseGroup, Publication, Student, Professor, Event, ProfessorSchedule, \
+    Lesson
 
 
 class StudentInline(admin.StackedInline):
@@ -64,12 +71,78 @@ class UserAdmin(BaseUserAdmin):
 
 
 class EventAdmin(ModelAdmin):
-    list_display = ("title", "event_start_datetime", "event_end_datetime", "is_full_day", "e_type")
+    list_display = ("title", "event_start_datetime", "event_end_datetime", "is_full_day", "e_type", "recurrence")
     filter_horizontal = ("course_groups",)
+    raw_id_fields = ("recurrence_parent",)
+
+
+class ScheduleImportForm(forms.Form):
+    archive = forms.FileField(label='Архив')
+    skip_invalid = forms.BooleanField(label='Импортировать корректные файлы, даже если есть ошибки', required=False)
+
+
+class ScheduleAdmin(ModelAdmin):
+    list_display = ("course_group", "schedule_file")
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        for conflict in obj.conflicts:
+            self.message_user(request, f'Конфликт расписаний: {conflict}', messages.WARNING)
+
+    def get_urls(self):
+        return [
+            path('import/', self.admin_site.admin_view(self.import_view), name='api_schedule_import'),
+        ] + super().get_urls()
+
+    def import_view(self, request):
+        from .schedule_import import import_schedules
+
+        if not self.has_add_permission(request):
+            return redirect('admin:api_schedule_changelist')
+
+        form = ScheduleImportForm(request.POST or None, request.FILES or None)
+        if request.method == 'POST' and form.is_valid():
+            try:
+                report = import_schedules(form.cleaned_data['archive'],
+                                          skip_invalid=form.cleaned_data['skip_invalid'])
+            except zipfile.BadZipFile as e:
+                self.message_user(request, f'Ошибка чтения архива: {e}', messages.ERROR)
+                return redirect('admin:api_schedule_import')
+
+            for row in report:
+                timing = f"{(row['validate_time'] + row['save_time']) * 1000:.0f} мс"
+                for conflict in row['conflicts']:
+                    self.message_user(request, f"{row['name']}: конфликт расписаний: {conflict}", messages.WARNING)
+                if row['errors']:
+                    self.message_user(request, f"{row['name']}: {'; '.join(row['errors'])}", messages.ERROR)
+                elif row['imported']:
+                    self.message_user(request, f"{row['name']} → {row['course_group']}: {timing}", messages.SUCCESS)
+                else:
+                    self.message_user(request, f"{row['name']}: не импортирован", messages.WARNING)
+            return redirect('admin:api_schedule_changelist')
+
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'form': form,
+            'title': 'Импорт расписаний',
+        }
+        return TemplateResponse(request, 'admin/api/schedule/import_schedules.html', context)
+
+
+class ProfessorScheduleAdmin(ModelAdmin):
+    list_display = ("identification",)
+    search_fields = ("identification",)
+
+
+class LessonAdmin(ModelAdmin):
+    list_display = ("subject_name", "course_group", "week", "weekday", "start_minute", "classroom", "professor")
+    list_filter = ("week", "weekday", "course_group")
+    search_fields = ("subject_name", "classroom", "professor")
 
 
 class PublicationAdmin(ModelAdmin):
-    list_display = ("title", "publication_datetime")
+    list_display = ("title", "publication_datetime", "vk_post_id")
     list_filter = ("publication_datetime",)
     search_fields = ("title", "publication_datetime",)
 
@@ -81,7 +154,9 @@ admin.site.unregister(Group)
 # reg
 admin.site.register(User, UserAdmin)
 admin.site.register(Map)
-admin.site.register(Schedule)
+admin.site.register(Schedule, ScheduleAdmin)
+admin.site.register(ProfessorSchedule, ProfessorScheduleAdmin)
+admin.site.register(Lesson, LessonAdmin)
 admin.site.register(CourseGroup)
 admin.site.register(Event, EventAdmin)
 admin.site.register(Publication, PublicationAdmin)
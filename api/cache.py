@@ -0,0 +1,61 @@
+import threading
+from collections import OrderedDict
+
+
+class LRUCache:
+    # on_evict is called with every value that leaves the cache
+    def __init__(self, maxsize, on_evict=None):
+        self.maxsize = maxsize
+        self.on_evict = on_evict
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, version=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] != version:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value, version=None):
+        with self._lock:
+            evicted = [self._data[key][1]] if key in self._data and self._data[key][1] is not value else []
+            self._data[key] = (version, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                evicted.append(self._data.popitem(last=False)[1][1])
+        self._evict(evicted)
+
+    def delete(self, key):
+        with self._lock:
+            entry = self._data.pop(key, None)
+        self._evict([entry[1]] if entry is not None else [])
+
+    def clear(self):
+        with self._lock:
+            evicted = [value for _, value in self._data.values()]
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+        self._evict(evicted)
+
+    def _evict(self, values):
+        if self.on_evict is not None:
+            for value in values:
+                self.on_evict(value)
+
+    def stats(self):
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / requests if requests else 0.0,
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+            }
@@ -0,0 +1,166 @@
+import datetime
+import hashlib
+import logging
+
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework.exceptions import NotFound
+
+from api.event_feed import get_day_start, get_feed_version, get_occurrences, get_skipped_dates
+from api.models import Event
+from api.recurrence import parse_rule
+from api.schedule_utilities import WEEKS, WEEKDAYS, get_date_week, get_schedule_owner, get_semester_bounds, \
+    get_user_schedule_etag, load_user_schedule, parse_minutes
+
+CALENDAR_CACHE_TIMEOUT = 60 * 60 * 24
+
+logger = logging.getLogger(__name__)
+
+
+def get_user_calendar(user, user_role, date=None):
+    semester_start, semester_end = get_semester_bounds(date or timezone.localdate())
+    # the event feed version changes with every event, events are only read when the calendar is rendered
+    etag = get_user_schedule_etag(user, user_role, 'ics', semester_start, get_feed_version())
+    owner = hashlib.sha1(f'{user_role}:{get_schedule_owner(user, user_role)}'.encode('utf-8')).hexdigest()
+    key = f'schedule-ics:{owner}:{etag}'
+    if etag is not None:
+        body = cache.get(key)
+        if body is not None:
+            return etag, iter(body)
+
+    schedule = load_user_schedule(user, user_role)
+    if schedule is None:
+        raise NotFound('schedule not found')
+    events = _get_visible_events(user, user_role, semester_start, semester_end)
+    lines = _render_calendar(schedule, events, semester_start, semester_end)
+    if etag is None:
+        return etag, lines
+    return etag, _cache_lines(key, lines)
+
+
+def _get_visible_events(user, user_role, date_from, date_to):
+    if user_role == 'student' and user.course_group_id is not None:
+        queryset = Event.objects.filter(Q(course_groups=None) | Q(course_groups=user.course_group_id))
+    else:
+        queryset = Event.objects.filter(course_groups=None)
+
+    events = list(queryset.filter(recurrence='', event_end_datetime__date__gte=date_from,
+                                  event_start_datetime__date__lte=date_to)
+                  .order_by('id').distinct().values_list(
+        'id', 'title', 'description', 'event_start_datetime', 'event_end_datetime', 'is_full_day'))
+
+    recurring = list(queryset.exclude(recurrence='').filter(event_start_datetime__date__lte=date_to)
+                     .order_by('id').distinct())
+    skipped_dates = get_skipped_dates(recurring)
+    window_start, window_end = get_day_start(date_from), get_day_start(date_to + datetime.timedelta(days=1))
+    for event in recurring:
+        for start, end in get_occurrences(event.event_start_datetime, event.event_end_datetime,
+                                          parse_rule(event.recurrence), skipped_dates[event.pk],
+                                          window_start, window_end):
+            events.append((f'{event.pk}-{timezone.localdate(start):%Y%m%d}', event.title, event.description,
+                           start, end, event.is_full_day))
+    return events
+
+
+def _cache_lines(key, lines):
+    body = []
+    for line in lines:
+        body.append(line)
+        yield line
+    cache.set(key, body, CALENDAR_CACHE_TIMEOUT)
+
+
+def _render_calendar(schedule, events, semester_start, semester_end):
+    timestamp = _format_datetime(timezone.now())
+
+    yield 'BEGIN:VCALENDAR\r\n'
+    yield 'VERSION:2.0\r\n'
+    yield 'PRODID:-//CSF App//Schedule//RU\r\n'
+    yield 'CALSCALE:GREGORIAN\r\n'
+
+    date = semester_start
+    while date <= semester_end:
+        if date.weekday() < len(WEEKDAYS):
+            week, day = WEEKS[get_date_week(date)], WEEKDAYS[date.weekday()]
+            for couple in schedule.get(week, {}).get(day, []):
+                if len(couple) == 0:
+                    continue
+                try:
+                    lesson = _render_lesson(couple, date, timestamp)
+                except (KeyError, ValueError) as e:
+                    logger.warning("calendar: %s %s: %r", week, day, e)
+                    continue
+                yield lesson
+        date += datetime.timedelta(days=1)
+
+    for event in events:
+        yield _render_event(*event, timestamp)
+
+    yield 'END:VCALENDAR\r\n'
+
+
+def _render_lesson(couple, date, timestamp):
+    start = _combine(date, parse_minutes(couple['timeFrom']))
+    end = _combine(date, parse_minutes(couple['timeTo']))
+    subject_name, classroom, professor = (couple.get(name, '') for name in ('subjectName', 'classroom', 'professor'))
+    uid = hashlib.sha1(f'{start}:{subject_name}:{classroom}:{professor}'.encode('utf-8')).hexdigest()
+    return _render_component('VEVENT', [
+        f'UID:{uid}@csf-app',
+        f'DTSTAMP:{timestamp}',
+        f'DTSTART:{_format_datetime(start)}',
+        f'DTEND:{_format_datetime(end)}',
+        f'SUMMARY:{_escape(subject_name)}',
+        f'LOCATION:{_escape(classroom)}',
+        f'DESCRIPTION:{_escape(professor)}',
+    ])
+
+
+def _render_event(event_id, title, description, start, end, is_full_day, timestamp):
+    if is_full_day:
+        start_date = timezone.localtime(start).date()
+        end_date = timezone.localtime(end).date() + datetime.timedelta(days=1)
+        period = [f'DTSTART;VALUE=DATE:{start_date:%Y%m%d}', f'DTEND;VALUE=DATE:{end_date:%Y%m%d}']
+    else:
+        period = [f'DTSTART:{_format_datetime(start)}', f'DTEND:{_format_datetime(end)}']
+    return _render_component('VEVENT', [
+        f'UID:event-{event_id}@csf-app',
+        f'DTSTAMP:{timestamp}',
+        *period,
+        f'SUMMARY:{_escape(title)}',
+        f'DESCRIPTION:{_escape(description)}',
+    ])
+
+
+def _render_component(name, properties):
+    return f'BEGIN:{name}\r\n' + ''.join(_fold(line) for line in properties) + f'END:{name}\r\n'
+
+
+def _combine(date, minutes):
+    return timezone.make_aware(datetime.datetime.combine(date, datetime.time(minutes // 60, minutes % 60)))
+
+
+def _format_datetime(value):
+    return value.astimezone(datetime.timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def _escape(text):
+    return text.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,').replace('\r\n', '\\n') \
+        .replace('\n', '\\n')
+
+
+def _fold(line):
+    parts = []
+    current = ''
+    current_length = 0
+    limit = 75
+    for char in line:
+        char_length = len(char.encode('utf-8'))
+        if current_length + char_length > limit:
+            parts.append(current)
+            current = ' '
+            current_length = 1
+        current += char
+        current_length += char_length
+    parts.append(current)
+    return '\r\n'.join(parts) + '\r\n'
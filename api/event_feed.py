@@ -0,0 +1,153 @@
+import datetime
+from collections import namedtuple
+from itertools import islice
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q, Count
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from rest_framework import serializers
+
+from api.models import Event
+from api.recurrence import parse_rule, expand
+from api.serializers import EventSerializer
+
+FEED_VERSION_KEY = 'event-feed-version'
+
+FeedEvent = namedtuple('FeedEvent', ('start', 'end', 'data', 'rule', 'skipped_dates'))
+
+
+def get_event_feed(course_group_id=None, all_groups=False):
+    # list of FeedEvent ordered by start, without duplicates, a recurring event is a single item
+    key = f'event-feed:{get_feed_version()}:{"all" if all_groups else course_group_id or "public"}'
+    feed = cache.get(key)
+    if feed is None:
+        feed = _build_event_feed(course_group_id, all_groups)
+        cache.set(key, feed, settings.EVENT_FEED_CACHE_TIMEOUT)
+    return feed
+
+
+def invalidate_event_feeds():
+    cache.add(FEED_VERSION_KEY, 0, None)
+    cache.incr(FEED_VERSION_KEY)
+
+
+def get_feed_version():
+    version = cache.get(FEED_VERSION_KEY)
+    if version is None:
+        cache.add(FEED_VERSION_KEY, 0, None)
+        version = cache.get(FEED_VERSION_KEY, 0)
+    return version
+
+
+def _build_event_feed(course_group_id, all_groups):
+    if all_groups:
+        queryset = Event.objects.all()
+    elif course_group_id is None:
+        queryset = Event.objects.filter(course_groups=None)
+    else:
+        queryset = Event.objects.filter(Q(course_groups=None) | Q(course_groups=course_group_id))
+    events = list(queryset.distinct().order_by('event_start_datetime', 'id'))
+    skipped_dates = get_skipped_dates(events)
+    return [FeedEvent(event.event_start_datetime, event.event_end_datetime, dict(data),
+                      parse_rule(event.recurrence) if event.recurrence else None, skipped_dates.get(event.pk))
+            for event, data in zip(events, EventSerializer(events, many=True).data)]
+
+
+def get_skipped_dates(events):
+    # dates of cancelled occurrences and of occurrences replaced by an override, by recurring event id
+    skipped_dates = {
+        event.pk: {datetime.date.fromisoformat(date) for date in event.recurrence_exceptions}
+        for event in events if event.recurrence
+    }
+    if skipped_dates:
+        overrides = Event.objects.filter(recurrence_parent__in=list(skipped_dates)) \
+            .values_list('recurrence_parent', 'recurrence_date')
+        for parent_id, date in overrides:
+            skipped_dates[parent_id].add(date)
+    return {pk: frozenset(dates) for pk, dates in skipped_dates.items()}
+
+
+def get_occurrences(start, end, rule, skipped_dates, window_start=None, window_end=None, starts_after=None):
+    # without a window end only the first occurrence is returned, an unbounded series has no last one
+    if rule is None:
+        if (window_start is None or end >= window_start) and (window_end is None or start < window_end) \
+                and (starts_after is None or start >= starts_after):
+            return [(start, end)]
+        return []
+    if starts_after is not None:
+        window_start = max(window_start or starts_after, starts_after)
+    occurrences = expand(start, end, rule, skipped_dates or (), window_start, window_end)
+    if starts_after is not None:
+        occurrences = (occurrence for occurrence in occurrences if occurrence[0] >= starts_after)
+    return occurrences if window_end is not None else islice(occurrences, 1)
+
+
+def get_day_start(date):
+    return timezone.make_aware(datetime.datetime.combine(date, datetime.time()))
+
+
+def filter_events(queryset, ends_after=None, starts_before=None, e_types=None):
+    if ends_after is not None:
+        queryset = queryset.filter(event_end_datetime__gte=ends_after)
+    if starts_before is not None:
+        queryset = queryset.filter(event_start_datetime__lt=starts_before)
+    if e_types:
+        queryset = queryset.filter(e_type__in=e_types)
+    return queryset
+
+
+def filter_event_feed(feed, ends_after=None, starts_before=None, e_types=None, starts_after=None):
+    # recurring events are replaced by their occurrences inside the window
+    items = []
+    for item in feed:
+        if e_types and item.data['e_type'] not in e_types:
+            continue
+        for start, end in get_occurrences(item.start, item.end, item.rule, item.skipped_dates,
+                                          ends_after, starts_before, starts_after):
+            if item.rule is None:
+                items.append(item)
+            else:
+                items.append(_get_occurrence(item, start, end))
+    return sorted(items, key=lambda item: (item.start, item.data['id']))
+
+
+def _get_occurrence(item, start, end):
+    field = serializers.DateTimeField()
+    data = dict(item.data, event_start_datetime=field.to_representation(start),
+                event_end_datetime=field.to_representation(end))
+    return item._replace(start=start, end=end, data=data)
+
+
+def get_event_day_counts(queryset, first_day, last_day, e_types=None):
+    # one grouped query by (start day, end day), events lasting several days are then counted on every day,
+    # recurring events are expanded inside the month
+    window_start = get_day_start(first_day)
+    window_end = get_day_start(last_day + datetime.timedelta(days=1))
+    rows = filter_events(queryset.order_by().filter(recurrence=''), window_start, window_end, e_types) \
+        .values(start_day=TruncDate('event_start_datetime'), end_day=TruncDate('event_end_datetime')) \
+        .annotate(count=Count('id', distinct=True))
+    rows = [(row['start_day'], row['end_day'], row['count']) for row in rows]
+
+    recurring = filter_events(queryset.exclude(recurrence=''), starts_before=window_end, e_types=e_types)
+    recurring = list(recurring.order_by())
+    skipped_dates = get_skipped_dates(recurring)
+    for event in recurring:
+        for start, end in get_occurrences(event.event_start_datetime, event.event_end_datetime,
+                                          parse_rule(event.recurrence), skipped_dates[event.pk],
+                                          window_start, window_end):
+            rows.append((timezone.localdate(start), timezone.localdate(end), 1))
+
+    counts = {}
+    day = first_day
+    while day <= last_day:
+        counts[day] = 0
+        day += datetime.timedelta(days=1)
+    for start_day, end_day, count in rows:
+        day = max(start_day, first_day)
+        while day <= min(end_day, last_day):
+            counts[day] += count
+            day += datetime.timedelta(days=1)
+    return counts
@@ -0,0 +1,198 @@
+import re
+from collections import namedtuple
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from api.models import Publication, Event
+
+TABLE = 'api_search_document'
+# kind: (model, title field, body field)
+KINDS = {
+    'publication': (Publication, 'title', 'body_text'),
+    'event': (Event, 'title', 'description'),
+}
+HIGHLIGHT_START = '<b>'
+HIGHLIGHT_STOP = '</b>'
+
+SearchHit = namedtuple('SearchHit', ('rank', 'kind', 'object_id', 'title', 'snippet'))
+
+
+class PostgresSearchBackend:
+    # stored tsvector with Russian stemming, title weighted above body, and a GIN index on it
+    def create_table(self, cursor):
+        cursor.execute(f'''
+            CREATE TABLE IF NOT EXISTS {TABLE} (
+                kind varchar(16) NOT NULL,
+                object_id bigint NOT NULL,
+                title text NOT NULL,
+                body text NOT NULL,
+                document tsvector GENERATED ALWAYS AS (
+                    setweight(to_tsvector('russian', title), 'A') || setweight(to_tsvector('russian', body), 'B')
+                ) STORED,
+                PRIMARY KEY (kind, object_id)
+            )
+        ''')
+        cursor.execute(f'CREATE INDEX IF NOT EXISTS {TABLE}_document ON {TABLE} USING gin (document)')
+
+    def save(self, cursor, rows):
+        cursor.executemany(f'''
+            INSERT INTO {TABLE} (kind, object_id, title, body) VALUES (%s, %s, %s, %s)
+            ON CONFLICT (kind, object_id) DO UPDATE SET title = EXCLUDED.title, body = EXCLUDED.body
+        ''', rows)
+
+    def delete(self, cursor, kind, object_id):
+        cursor.execute(f'DELETE FROM {TABLE} WHERE kind = %s AND object_id = %s', [kind, object_id])
+
+    def clear(self, cursor):
+        cursor.execute(f'DELETE FROM {TABLE}')
+
+    def search(self, cursor, query, kinds, limit, after, course_group_id, all_events):
+        where, params = _get_filters(kinds, after, course_group_id, all_events)
+        # headlines are the expensive part, they are built for the page only
+        cursor.execute(f'''
+            SELECT rank, kind, object_id,
+                   ts_headline('russian', title, query, %s),
+                   ts_headline('russian', body, query, %s)
+            FROM (
+                SELECT * FROM (
+                    SELECT ts_rank_cd(document, query) AS rank, kind, object_id, title, body, query
+                    FROM {TABLE}, websearch_to_tsquery('russian', %s) query
+                    WHERE document @@ query
+                ) matches
+                WHERE {where}
+                ORDER BY rank DESC, kind, object_id
+                LIMIT %s
+            ) page
+            ORDER BY rank DESC, kind, object_id
+        ''', [f'StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_STOP}, HighlightAll=true',
+              f'StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_STOP}, MaxFragments=2, MaxWords=30, MinWords=10',
+              query, *params, limit])
+        return cursor.fetchall()
+
+
+class SqliteSearchBackend:
+    # FTS5 for local runs, there is no Russian stemmer so long words are matched by a shortened prefix
+    def create_table(self, cursor):
+        cursor.execute(f'''
+            CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE}
+            USING fts5(kind UNINDEXED, object_id UNINDEXED, title, body, tokenize="unicode61 remove_diacritics 2")
+        ''')
+
+    def save(self, cursor, rows):
+        cursor.executemany(f'INSERT OR REPLACE INTO {TABLE} (rowid, kind, object_id, title, body) '
+                           f'VALUES (%s, %s, %s, %s, %s)',
+                           [(_get_rowid(kind, object_id), kind, object_id, title, body)
+                            for kind, object_id, title, body in rows])
+
+    def delete(self, cursor, kind, object_id):
+        cursor.execute(f'DELETE FROM {TABLE} WHERE rowid = %s', [_get_rowid(kind, object_id)])
+
+    def clear(self, cursor):
+        cursor.execute(f'DELETE FROM {TABLE}')
+
+    def search(self, cursor, query, kinds, limit, after, course_group_id, all_events):
+        terms = [f'"{word[:-2] if len(word) > 5 else word}"*' for word in re.findall(r'\w+', query.lower())]
+        if not terms:
+            return []
+        where, params = _get_filters(kinds, after, course_group_id, all_events)
+        match = ' '.join(terms)
+        cursor.execute(f'''
+            SELECT page.rank, page.kind, page.object_id,
+                   highlight({TABLE}, 2, %s, %s),
+                   snippet({TABLE}, 3, %s, %s, '…', 30)
+            FROM (
+                SELECT * FROM (
+                    SELECT -bm25({TABLE}, 0, 0, 4.0, 1.0) AS rank, rowid AS document_id, kind, object_id
+                    FROM {TABLE}
+                    WHERE {TABLE} MATCH %s
+                ) matches
+                WHERE {where}
+                ORDER BY rank DESC, kind, object_id
+                LIMIT %s
+            ) page
+            JOIN {TABLE} ON {TABLE}.rowid = page.document_id
+            WHERE {TABLE} MATCH %s
+            ORDER BY page.rank DESC, page.kind, page.object_id
+        ''', [HIGHLIGHT_START, HIGHLIGHT_STOP, HIGHLIGHT_START, HIGHLIGHT_STOP, match, *params, limit, match])
+        return cursor.fetchall()
+
+
+BACKENDS = {
+    'postgresql': PostgresSearchBackend(),
+    'sqlite': SqliteSearchBackend(),
+}
+
+
+def get_search_backend(using=DEFAULT_DB_ALIAS):
+    vendor = connections[using].vendor
+    try:
+        return BACKENDS[vendor]
+    except KeyError:
+        raise ImproperlyConfigured(f'Full-text search is not supported on {vendor}')
+
+
+def create_search_table(using=DEFAULT_DB_ALIAS):
+    with connections[using].cursor() as cursor:
+        get_search_backend(using).create_table(cursor)
+
+
+def search(query, kinds=tuple(KINDS), limit=20, after=None, course_group_id=None, all_events=True,
+           using=DEFAULT_DB_ALIAS):
+    # hits ordered by rank, after is the (rank, kind, object_id) of the last hit of the previous page,
+    # unless all_events is set only events for everyone or for course_group_id are returned
+    with connections[using].cursor() as cursor:
+        rows = get_search_backend(using).search(cursor, query, kinds, limit, after, course_group_id, all_events)
+    return [SearchHit(*row) for row in rows]
+
+
+def index_objects(kind, objects, using=DEFAULT_DB_ALIAS):
+    _, title_field, body_field = KINDS[kind]
+    rows = [(kind, obj.pk, getattr(obj, title_field) or '', getattr(obj, body_field) or '') for obj in objects]
+    if rows:
+        with connections[using].cursor() as cursor:
+            get_search_backend(using).save(cursor, rows)
+
+
+def remove_object(kind, object_id, using=DEFAULT_DB_ALIAS):
+    with connections[using].cursor() as cursor:
+        get_search_backend(using).delete(cursor, kind, object_id)
+
+
+def rebuild_search_index(using=DEFAULT_DB_ALIAS):
+    with connections[using].cursor() as cursor:
+        get_search_backend(using).clear(cursor)
+    for kind, (model, _, _) in KINDS.items():
+        index_objects(kind, model.objects.using(using).iterator(), using)
+
+
+def get_kind(model):
+    for kind, (kind_model, _, _) in KINDS.items():
+        if kind_model is model:
+            return kind
+    return None
+
+
+def _get_filters(kinds, after, course_group_id, all_events):
+    where = [f"kind IN ({', '.join(['%s'] * len(kinds))})"]
+    params = list(kinds)
+    if after is not None:
+        rank, kind, object_id = after
+        where.append('(rank < %s OR (rank = %s AND (kind > %s OR (kind = %s AND object_id > %s))))')
+        params += [rank, rank, kind, kind, object_id]
+    if not all_events and 'event' in kinds:
+        # an event without course groups is for everyone
+        through = Event.course_groups.through._meta
+        table = through.db_table
+        event_column = through.get_field('event').column
+        group_column = through.get_field('coursegroup').column
+        where.append(f"""(kind <> %s
+            OR NOT EXISTS (SELECT 1 FROM {table} WHERE {table}.{event_column} = object_id)
+            OR EXISTS (SELECT 1 FROM {table} WHERE {table}.{event_column} = object_id
+                       AND {table}.{group_column} = %s))""")
+        params += ['event', course_group_id]
+    return ' AND '.join(where), params
+
+
+def _get_rowid(kind, object_id):
+    return object_id * len(KINDS) + list(KINDS).index(kind)
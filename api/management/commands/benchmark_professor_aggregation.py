@@ -0,0 +1,121 @@
+import datetime
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.schedule_utilities import WEEKS, WEEKDAYS, aggregate_professor_schedules, format_minutes, \
+    _create_empty_schedule_dict, _create_couple_dict
+
+PAIR_STARTS = (8 * 60, 9 * 60 + 45, 11 * 60 + 30, 13 * 60 + 25, 15 * 60 + 10, 16 * 60 + 55, 18 * 60 + 40)
+
+
+class Command(BaseCommand):
+    help = 'Compare the previous and the current professor schedule aggregation on synthetic schedule files'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--files', type=int, default=500)
+        parser.add_argument('--professors', type=int, default=150)
+        parser.add_argument('--repeat', type=int, default=3)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        documents = _generate_documents(options['files'], options['professors'], random.Random(options['seed']))
+        lessons = [
+            (week, weekday, start_minute, end_minute, subject_name, classroom, professor)
+            for document in documents
+            for week, weekday, start_minute, end_minute, subject_name, classroom, professor in _parse(document)
+        ]
+        self.stdout.write(f"{len(documents)} files, {len(lessons)} lessons, {options['professors']} professors")
+
+        legacy_time = self._measure(lambda: _legacy_aggregate(documents), options['repeat'])
+        current_time = self._measure(lambda: aggregate_professor_schedules(lessons), options['repeat'])
+
+        if _legacy_aggregate(documents) != aggregate_professor_schedules(lessons):
+            self.stdout.write(self.style.ERROR('Results differ'))
+        self.stdout.write(f'linear dedupe + strptime sort: {legacy_time * 1000:.1f} ms')
+        self.stdout.write(f'hashed dedupe + minutes sort:  {current_time * 1000:.1f} ms')
+        self.stdout.write(self.style.SUCCESS(f'speedup: {legacy_time / current_time:.1f}x'))
+
+    @staticmethod
+    def _measure(function, repeat):
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            function()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+
+
+def _generate_documents(files, professors, rng):
+    names = [f'Преподаватель{number} А.Б.' for number in range(professors)]
+    subjects = [f'Предмет {number}' for number in range(files // 2 + 1)]
+    streams = [
+        {week: {day: _generate_day(rng, names, subjects) for day in WEEKDAYS} for week in WEEKS.values()}
+        for _ in range(max(files // 10, 1))
+    ]
+
+    documents = []
+    for _ in range(files):
+        stream = rng.choice(streams)
+        document = {week: {} for week in WEEKS.values()}
+        for week in WEEKS.values():
+            for day in WEEKDAYS:
+                own = _generate_day(rng, names, subjects, count=2)
+                document[week][day] = stream[week][day] + own
+        documents.append(document)
+    return documents
+
+
+def _generate_day(rng, names, subjects, count=3):
+    couples = []
+    for start_minute in rng.sample(PAIR_STARTS, count):
+        couples.append(_create_couple_dict(
+            format_minutes(start_minute),
+            format_minutes(start_minute + 95),
+            rng.choice(subjects),
+            str(rng.randint(100, 500)),
+            rng.choice(names)
+        ))
+    return couples
+
+
+def _parse(document):
+    weeks = {name: week for week, name in WEEKS.items()}
+    for week_name, days in document.items():
+        for weekday, day in enumerate(WEEKDAYS):
+            for couple in days[day]:
+                start_hours, start_minutes = couple['timeFrom'].split(':')
+                end_hours, end_minutes = couple['timeTo'].split(':')
+                yield (weeks[week_name], weekday, int(start_hours) * 60 + int(start_minutes),
+                       int(end_hours) * 60 + int(end_minutes), couple['subjectName'], couple['classroom'],
+                       couple['professor'])
+
+
+def _legacy_aggregate(documents):
+    professors = {}
+    for document in documents:
+        for week in document.keys():
+            for day, couples in document[week].items():
+                for couple in couples:
+                    schedule_dict = professors.setdefault(couple['professor'], _create_empty_schedule_dict())
+                    if _legacy_check_uniq_couple(schedule_dict[week][day], couple):
+                        schedule_dict[week][day].append(dict(couple))
+
+    for schedule_dict in professors.values():
+        for week in schedule_dict.values():
+            for couples in week.values():
+                couples.sort(key=lambda couple: (datetime.datetime.strptime(couple['timeFrom'], '%H:%M'),
+                                                 couple['timeTo'], couple['subjectName'], couple['classroom']))
+    return professors
+
+
+def _legacy_check_uniq_couple(day, couple):
+    for curr_couple in day:
+        if curr_couple['timeFrom'] == couple['timeFrom'] \
+                and curr_couple['timeTo'] == couple['timeTo'] \
+                and curr_couple['subjectName'] == couple['subjectName'] \
+                and curr_couple['classroom'] == couple['classroom']:
+            return False
+    return True
@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.models import Lesson
+from api.schedule_conflicts import CONFLICT_KINDS, LessonColumns, describe_conflicts, find_conflicts
+
+
+class Command(BaseCommand):
+    help = 'Report professors and classrooms booked twice in the same slot by different group schedules'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--kind', choices=list(CONFLICT_KINDS), action='append',
+                            help='Only check professors or classrooms, both by default')
+        parser.add_argument('--fail', action='store_true', help='Exit with an error if conflicts are found')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        columns = LessonColumns()
+        columns.extend_from_lessons(Lesson.objects.all())
+        conflicts = find_conflicts(columns, options['kind'] or tuple(CONFLICT_KINDS))
+
+        for description in describe_conflicts(conflicts):
+            self.stdout.write(description)
+
+        counts = ', '.join(f'{sum(conflict.kind == kind for conflict in conflicts)} {kind}'
+                           for kind in options['kind'] or CONFLICT_KINDS)
+        self.stdout.write(f'{len(conflicts)} conflicts ({counts}) in {len(columns)} lessons, '
+                          f'{time.perf_counter() - started:.2f} s')
+        if conflicts and options['fail']:
+            raise CommandError('Schedule conflicts found')
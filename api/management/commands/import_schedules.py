@@ -0,0 +1,46 @@
+import os
+import time
+import zipfile
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.schedule_import import import_schedules
+
+
+class Command(BaseCommand):
+    help = 'Import a directory or a zip archive of {course}_{group}_{level}.json schedule files'
+
+    def add_arguments(self, parser):
+        parser.add_argument('source', help='Directory or zip archive with schedule files')
+        parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                            help='Validation processes, CPU count by default')
+        parser.add_argument('--skip-invalid', action='store_true',
+                            help='Import valid files even if some files have errors')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            report = import_schedules(options['source'], workers=options['workers'],
+                                      skip_invalid=options['skip_invalid'])
+        except (OSError, ValueError, zipfile.BadZipFile) as e:
+            raise CommandError(e)
+
+        for row in report:
+            for conflict in row['conflicts']:
+                self.stdout.write(self.style.WARNING(f"{row['name']}: conflict: {conflict}"))
+            timing = f"validate {row['validate_time'] * 1000:.1f} ms, save {row['save_time'] * 1000:.1f} ms"
+            if row['errors']:
+                self.stdout.write(self.style.ERROR(f"{row['name']}: {timing}"))
+                for error in row['errors']:
+                    self.stdout.write(f"    {error}")
+            elif row['imported']:
+                self.stdout.write(self.style.SUCCESS(f"{row['name']} -> {row['course_group']}: {timing}"))
+            else:
+                self.stdout.write(f"{row['name']}: not imported, {timing}")
+
+        imported = sum(row['imported'] for row in report)
+        failed = sum(bool(row['errors']) for row in report)
+        self.stdout.write(f'{imported} imported, {failed} with errors, {len(report)} files, '
+                          f'{time.perf_counter() - started:.2f} s')
+        if failed and not options['skip_invalid']:
+            raise CommandError('Nothing was imported because some files have errors')
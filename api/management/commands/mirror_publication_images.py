@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from api.models import Publication
+from api.publication_cache import bump_feed_version
+from api.publication_images import mirror_images
+
+
+class Command(BaseCommand):
+    help = 'Download the images of publications that have no local copies yet and generate their variants'
+
+    def handle(self, *args, **options):
+        publications = list(Publication.objects.filter(image_variants=[]).exclude(image=None).exclude(image=''))
+        variants = mirror_images(publication.image for publication in publications)
+        for publication in publications:
+            publication.image_variants = variants.get(publication.image, [])
+        Publication.objects.bulk_update([publication for publication in publications if publication.image_variants],
+                                        ['image_variants'])
+        # bulk_update sends no post_save
+        bump_feed_version()
+        self.stdout.write(self.style.SUCCESS(
+            f'{sum(1 for publication in publications if publication.image_variants)} of {len(publications)} '
+            f'publication images mirrored'))
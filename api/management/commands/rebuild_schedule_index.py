@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from api.models import Schedule
+from api.schedule_utilities import index_schedule_lessons, rebuild_professor_index, save_schedule_binary
+
+
+class Command(BaseCommand):
+    help = 'Rebuild lessons, professor schedules and binary schedule files from all uploaded schedule files'
+
+    def handle(self, *args, **options):
+        for schedule in Schedule.objects.all():
+            checksum = schedule.compute_checksum()
+            if checksum != schedule.checksum:
+                Schedule.objects.filter(pk=schedule.pk).update(checksum=checksum)
+                schedule.checksum = checksum
+            save_schedule_binary(schedule)
+            index_schedule_lessons(schedule)
+
+        rebuild_professor_index()
+        self.stdout.write(self.style.SUCCESS('Schedule index rebuilt'))
@@ -1,3 +1,4 @@
+import hashlib
 import os
 from datetime import datetime, timedelta
 
@@ -6,9 +7,10 @@ from django.conf import settings
 from django.contrib import auth
 from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin, BaseUserManager
+from django.core.exceptions import ValidationError
 from django.core.validators import FileExtensionValidator, MinValueValidator, MaxValueValidator
-from django.db import models
-from django.db.models.signals import pre_save
+from django.db import models, transaction
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete, m2m_changed, post_migrate
 from django.dispatch import receiver
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
@@ -18,7 +20,8 @@ from phonenumber_field.modelfields import PhoneNumberField
 from pytils.translit import slugify
 
 from api.storage import OverwriteStorage
-from api.validators import CustomUnicodeUsernameValidator, FileValidator
+from api.validators import CustomUnicodeUsernameValidator, FileValidator, validate_recurrence_rule, \
+    validate_recurrence_exceptions
 
 
 def transliterate_filename(filename):
@@ -295,11 +298,125 @@ class Schedule(models.Model):
                                      ],
                                      storage=OverwriteStorage(),
                                      max_length=50)
+    checksum = models.CharField(_('Контрольная сумма файла'), max_length=64, blank=True, editable=False)
+
+    document = None
+    conflicts = ()
+    # content written by import_schedules that replaces schedule_file on commit
+    staged_path = None
+
+    def clean(self):
+        from api.schedule_conflicts import describe_conflicts, find_new_conflicts
+        from api.schedule_utilities import get_document_lessons
+
+        document = getattr(self.schedule_file, 'schedule_document', None)
+        if document is None or self.course_group_id is None:
+            return
+
+        lessons = get_document_lessons(document, self.schedule_file.name)
+        self.conflicts = describe_conflicts(find_new_conflicts({self.course_group_id: lessons}))
+        if self.conflicts and settings.SCHEDULE_CONFLICTS == 'reject':
+            raise ValidationError({'schedule_file': [f'Конфликт расписаний: {conflict}'
+                                                     for conflict in self.conflicts]})
+
+    def save(self, *args, **kwargs):
+        self.document = getattr(self.schedule_file, 'schedule_document', None)
+        self.checksum = getattr(self.schedule_file, 'schedule_checksum', None) or self.compute_checksum()
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+    def compute_checksum(self):
+        checksum = hashlib.sha256()
+        try:
+            self.schedule_file.open('rb')
+            for chunk in self.schedule_file.chunks():
+                checksum.update(chunk)
+        except (OSError, ValueError):
+            return ''
+        finally:
+            if self.schedule_file and self.schedule_file._committed:
+                self.schedule_file.close()
+        return checksum.hexdigest()
 
     def __str__(self):
         return f"Расписание для {self.course_group}"
 
 
+class ProfessorSchedule(models.Model):
+    identification = models.CharField(_('Преподаватель'), max_length=50, unique=True)
+    schedule = models.JSONField(_('Расписание преподавателя'), default=dict)
+    checksum = models.CharField(_('Контрольная сумма расписания'), max_length=64, blank=True)
+    version = models.PositiveIntegerField(_('Версия расписания'), default=1)
+
+    def __str__(self):
+        return f"Расписание для {self.identification}"
+
+
+class Lesson(models.Model):
+    WEEKS = [
+        ('n', "numerator"),
+        ('d', "denominator"),
+    ]
+    WEEKDAYS = [
+        (0, "monday"),
+        (1, "tuesday"),
+        (2, "wednesday"),
+        (3, "thursday"),
+        (4, "friday"),
+        (5, "saturday"),
+    ]
+
+    schedule = models.ForeignKey("Schedule", on_delete=models.CASCADE, related_name='lessons')
+    course_group = models.ForeignKey("CourseGroup", on_delete=models.DO_NOTHING, related_name='lessons')
+    week = models.CharField(_('Неделя'), max_length=1, choices=WEEKS)
+    weekday = models.PositiveSmallIntegerField(_('День недели'), choices=WEEKDAYS)
+    position = models.PositiveSmallIntegerField(_('Номер в расписании дня'))
+    start_minute = models.PositiveSmallIntegerField(_('Начало, мин'))
+    end_minute = models.PositiveSmallIntegerField(_('Конец, мин'))
+    subject_name = models.CharField(_('Предмет'), max_length=200, blank=True)
+    classroom = models.CharField(_('Аудитория'), max_length=50, blank=True)
+    professor = models.CharField(_('Преподаватель'), max_length=50, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['course_group', 'week', 'weekday', 'start_minute']),
+            models.Index(fields=['professor', 'week', 'weekday', 'start_minute']),
+            models.Index(fields=['classroom', 'week', 'weekday', 'start_minute']),
+            models.Index(fields=['subject_name']),
+        ]
+
+    def __str__(self):
+        return f"{self.subject_name} {self.get_week_display()} {self.get_weekday_display()}"
+
+
+@receiver(post_save, sender=Schedule)
+def index_schedule(sender, instance, **kwargs):
+    from api.schedule_indexes import invalidate_schedule_indexes
+    from api.schedule_utilities import index_schedule_lessons, refresh_professor_index, save_schedule_binary, \
+        schedule_cache
+    schedule_cache.delete(instance.course_group_id)
+    if instance.staged_path is None:
+        save_schedule_binary(instance)
+    refresh_professor_index(index_schedule_lessons(instance))
+    transaction.on_commit(invalidate_schedule_indexes)
+
+
+@receiver(pre_delete, sender=Schedule)
+def collect_schedule_professors(sender, instance, **kwargs):
+    from api.schedule_utilities import get_schedule_professors
+    instance.indexed_professors = get_schedule_professors(instance)
+
+
+@receiver(post_delete, sender=Schedule)
+def unindex_schedule(sender, instance, **kwargs):
+    from api.schedule_indexes import invalidate_schedule_indexes
+    from api.schedule_utilities import delete_schedule_binary, refresh_professor_index, schedule_cache
+    schedule_cache.delete(instance.course_group_id)
+    delete_schedule_binary(instance)
+    refresh_professor_index(getattr(instance, 'indexed_professors', set()))
+    transaction.on_commit(invalidate_schedule_indexes)
+
+
 class Event(models.Model):
     title = models.CharField(
         _('Название события'),
@@ -335,9 +452,76 @@ class Event(models.Model):
 
     e_type = models.CharField(_("Тип события"), max_length=1, choices=EVENT_TYPES_RU, blank=False, null=False)
 
+    recurrence = models.CharField(
+        _('Правило повторения'),
+        max_length=200,
+        blank=True,
+        validators=[validate_recurrence_rule],
+        help_text=_('RRULE, например FREQ=WEEKLY;BYDAY=MO,WE;UNTIL=20231231')
+    )
+    recurrence_exceptions = models.JSONField(
+        _('Отменённые повторения'),
+        default=list,
+        blank=True,
+        validators=[validate_recurrence_exceptions],
+        help_text=_('Список дат в формате YYYY-MM-DD')
+    )
+    recurrence_parent = models.ForeignKey(
+        "Event",
+        on_delete=models.CASCADE,
+        related_name='overrides',
+        blank=True,
+        null=True,
+        verbose_name=_('Повторяющееся событие')
+    )
+    recurrence_date = models.DateField(
+        _('Заменяемое повторение'),
+        blank=True,
+        null=True
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['event_start_datetime', 'id']),
+            models.Index(fields=['event_end_datetime', 'event_start_datetime']),
+            models.Index(fields=['e_type', 'event_start_datetime']),
+        ]
+
     def __str__(self):
         return self.title
 
+    def clean(self):
+        errors = get_recurrence_errors(self.recurrence, self.recurrence_parent, self.recurrence_date)
+        if errors:
+            raise ValidationError(errors)
+
+
+def get_recurrence_errors(recurrence, recurrence_parent, recurrence_date):
+    # an override replaces the occurrence of recurrence_parent on recurrence_date
+    errors = {}
+    if recurrence_parent is not None:
+        if recurrence:
+            errors['recurrence'] = 'Замена повторения не может повторяться'
+        if not recurrence_parent.recurrence:
+            errors['recurrence_parent'] = 'Событие не повторяется'
+        if recurrence_date is None:
+            errors['recurrence_date'] = 'Укажите дату заменяемого повторения'
+    elif recurrence_date is not None:
+        errors['recurrence_parent'] = 'Укажите повторяющееся событие'
+    return errors
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+@receiver(m2m_changed, sender=Event.course_groups.through)
+def refresh_event_feeds(sender, action='post_', **kwargs):
+    from api.event_feed import invalidate_event_feeds
+    if action.startswith('pre_'):
+        return
+    # again on commit, a feed rebuilt by another request before the commit may hold the old rows
+    invalidate_event_feeds()
+    transaction.on_commit(invalidate_event_feeds)
+
 
 class Publication(models.Model):
     title = models.CharField(
@@ -356,7 +540,66 @@ class Publication(models.Model):
 
     image = models.CharField(_('Изображение'),
                              blank=True, null=True)
+    image_variants = models.JSONField(_('Копии изображения'), default=list, blank=True)
+
+    vk_owner_id = models.BigIntegerField(_('Сообщество VK'), blank=True, null=True)
+    vk_post_id = models.BigIntegerField(_('Пост VK'), blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['publication_datetime', 'id']),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['vk_owner_id', 'vk_post_id'], name='unique_vk_post'),
+        ]
 
     def __str__(self):
         return self.title
 
+
+class PublicationFeedVersion(models.Model):
+    # a single row that is bumped whenever publications change, rendered pages of the feed are keyed by it
+    version = models.PositiveBigIntegerField(default=0)
+
+
+@receiver(post_save, sender=Publication)
+@receiver(post_delete, sender=Publication)
+def refresh_publication_cache(sender, **kwargs):
+    from api.publication_cache import bump_feed_version
+    bump_feed_version()
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_save, sender=Publication)
+def index_search_document(sender, instance, using, **kwargs):
+    from api.full_text_search import get_kind, index_objects
+    index_objects(get_kind(sender), [instance], using)
+
+
+@receiver(post_delete, sender=Event)
+@receiver(post_delete, sender=Publication)
+def remove_search_document(sender, instance, using, **kwargs):
+    from api.full_text_search import get_kind, remove_object
+    remove_object(get_kind(sender), instance.pk, using)
+
+
+@receiver(post_migrate)
+def prepare_search_table(sender, using='default', **kwargs):
+    from api.full_text_search import TABLE, create_search_table, rebuild_search_index
+    from django.db import connections
+    if sender.name != 'api':
+        return
+    # the table is kept outside of the models, its DDL differs between PostgreSQL and SQLite
+    created = TABLE not in connections[using].introspection.table_names()
+    create_search_table(using)
+    if created:
+        rebuild_search_index(using)
+
+
+@receiver(post_migrate)
+def create_publication_feed_version(sender, using='default', **kwargs):
+    from api.publication_cache import FEED_VERSION_ID
+    if sender.name != 'api':
+        return
+    PublicationFeedVersion.objects.using(using).get_or_create(pk=FEED_VERSION_ID)
+
@@ -0,0 +1,112 @@
+import asyncio
+import datetime
+import logging
+import os
+import random
+
+import aiohttp
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# VK errors worth another attempt: too many requests per second, flood control, internal server error
+RETRY_VK_ERRORS = {6, 9, 10}
+
+
+class NewsFetchError(Exception):
+    pass
+
+
+class RetryableFetchError(NewsFetchError):
+    pass
+
+
+def fetch_news(sources, high_water_marks, legacy_datetime=None):
+    # posts of all sources, a failed source is logged and skipped
+    return asyncio.run(_fetch_news(sources, high_water_marks, legacy_datetime))
+
+
+async def _fetch_news(sources, high_water_marks, legacy_datetime):
+    semaphore = asyncio.Semaphore(settings.NEWS_FETCH_CONCURRENCY)
+    timeout = aiohttp.ClientTimeout(total=settings.NEWS_FETCH_TIMEOUT)
+    async with aiohttp.ClientSession(timeout=timeout) as session:
+        results = await asyncio.gather(*[
+            fetch_source(session, semaphore, source, high_water_marks, legacy_datetime) for source in sources
+        ], return_exceptions=True)
+
+    posts = []
+    for source, result in zip(sources, results):
+        if isinstance(result, BaseException):
+            logger.error("news: %s failed: %s", source, result)
+        else:
+            posts.extend(result)
+    return posts
+
+
+async def fetch_source(session, semaphore, source, high_water_marks, legacy_datetime=None):
+    # Pages through the wall, newest first, until a post at or below the high-water mark of the wall.
+    # A wall without stored posts only gets its first page, as a fresh install did before.
+    posts = []
+    offset = 0
+    requests = 0
+    while offset < settings.NEWS_MAX_POSTS:
+        page = await fetch_page(session, semaphore, source, offset)
+        requests += 1
+        reached = False
+        for post in page['items']:
+            if is_stored(post, high_water_marks.get(post['owner_id']), legacy_datetime):
+                # a pinned post is shown first whatever its age
+                reached = reached or not post.get('is_pinned')
+                continue
+            posts.append(post)
+
+        offset += len(page['items'])
+        has_mark = legacy_datetime is not None or any(post['owner_id'] in high_water_marks for post in page['items'])
+        if reached or not has_mark or not page['items'] or offset >= page.get('count', 0):
+            break
+    logger.info("news: %s, %d new posts in %d requests", source, len(posts), requests)
+    return posts
+
+
+async def fetch_page(session, semaphore, source, offset):
+    params = {
+        'access_token': os.getenv('TOKEN_USER', ''),
+        'v': os.getenv('VERSION', '5.131'),
+        'count': settings.NEWS_PAGE_SIZE,
+        'offset': offset,
+        'filter': 'owner',
+    }
+    params['owner_id' if source.lstrip('-').isdigit() else 'domain'] = source
+
+    for attempt in range(settings.NEWS_FETCH_RETRIES + 1):
+        try:
+            async with semaphore:
+                async with session.get(f'{settings.VK_API_URL}wall.get', params=params) as response:
+                    if response.status == 429 or response.status >= 500:
+                        raise RetryableFetchError(f'HTTP {response.status}')
+                    response.raise_for_status()
+                    data = await response.json(content_type=None)
+            if 'error' in data:
+                error = data['error']
+                message = f"VK error {error.get('error_code')}: {error.get('error_msg')}"
+                if error.get('error_code') in RETRY_VK_ERRORS:
+                    raise RetryableFetchError(message)
+                raise NewsFetchError(message)
+            return data['response']
+        except (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError,
+                RetryableFetchError) as e:
+            if attempt == settings.NEWS_FETCH_RETRIES:
+                raise
+            delay = settings.NEWS_FETCH_BACKOFF * 2 ** attempt * random.uniform(0.5, 1.5)
+            logger.warning("news: %s offset %d failed (%r), retrying in %.1fs", source, offset, e, delay)
+            await asyncio.sleep(delay)
+
+
+def is_stored(post, post_id, legacy_datetime):
+    if post_id is not None:
+        return post['id'] <= post_id
+    return legacy_datetime is not None and get_post_datetime(post) <= legacy_datetime
+
+
+def get_post_datetime(post):
+    return datetime.datetime.fromtimestamp(post['date'], tz=datetime.timezone.utc)
@@ -3,58 +3,112 @@ os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
 
 import django
 django.setup()
-import datetime
-import requests
+import logging
+import time
 
+from django.conf import settings
+from django.db.models import Max
+
+from api.full_text_search import index_objects
 from api.models import Publication
-from api.serializers import PublicationSerializer
+from api.news_fetcher import fetch_news, is_stored, get_post_datetime
+from api.publication_cache import bump_feed_version
+from api.publication_images import mirror_images
 from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
 
-def get_news():
-    response = requests.get('https://api.vk.com/method/wall.get',
-                            params={'access_token': os.getenv('TOKEN_USER'),
-                                    'v': os.getenv('VERSION'),
-                                    'domain': os.getenv('DOMAIN'),
-                                    'count': os.getenv('NEWS_COUNT'),
-                                    'filter': str('owner')})
-
-    data = response.json()['response']['items']
 
-    for post in sorted(data, key=lambda item: item['date']):
+def get_news():
+    started = time.monotonic()
+    high_water_marks, legacy_datetime = get_high_water_marks()
+    posts = fetch_news(settings.NEWS_SOURCES, high_water_marks, legacy_datetime)
+    fetched = time.monotonic()
+
+    counts = save_posts(posts, (high_water_marks, legacy_datetime))
+    logger.info("news: %d posts fetched in %.2fs, %d created, %d already stored, %d without text, %d failed, "
+                "saved in %.2fs", len(posts), fetched - started, counts['created'], counts['stored'],
+                counts['empty'], counts['failed'], time.monotonic() - fetched)
+    return counts
+
+
+def save_posts(posts, marks=None):
+    counts = {'created': 0, 'stored': 0, 'empty': 0, 'failed': 0}
+    high_water_marks, legacy_datetime = marks or get_high_water_marks()
+    publications = {}
+    for post in sorted(posts, key=lambda item: (item['date'], item['id'])):
         try:
-            validated_data = {'image': None,
-                              'body_text': '',
-                              'title': '',
-                              'publication_datetime': datetime.datetime.fromtimestamp(post['date'])}
-
-            if 'copy_history' in post:
-                parent_post = post['copy_history'][0]
-                if parent_post['text'] is None or len(parent_post['text']) == 0:
-                    continue
-                validated_data['body_text'] = parent_post['text'][:2000]
-                validated_data['image'] = get_photo(parent_post['attachments'])
-
-            else:
-                if post['text'] is None or len(post['text']) == 0:
-                    continue
-                validated_data['body_text'] = post['text'][:2000]
-                validated_data['image'] = get_photo(post['attachments'])
-
-            validated_data['title'] = " ".join(validated_data['body_text'].split()[:4])
-
-            latest_publication = None
-            if Publication.objects.count() != 0:
-                latest_publication = Publication.objects.latest('publication_datetime')
-
-            if latest_publication is None or validated_data['publication_datetime'].timestamp() > \
-                    latest_publication.publication_datetime.timestamp():
-                PublicationSerializer().create(validated_data)
-
+            if is_stored(post, high_water_marks.get(post['owner_id']), legacy_datetime):
+                counts['stored'] += 1
+                continue
+
+            publication = parse_post(post)
+            if publication is None:
+                counts['empty'] += 1
+                continue
+            # offset paging repeats posts when the wall changes between pages
+            publications[publication.vk_owner_id, publication.vk_post_id] = publication
         except Exception as e:
-            print(f"CRON ERR: {e}")
+            counts['failed'] += 1
+            logger.exception("CRON ERR: %s", e)
+
+    if not publications:
+        return counts
+
+    # a concurrent run may have stored some of the posts, the unique constraint skips them
+    existing = set(Publication.objects.filter(
+        vk_owner_id__in={owner_id for owner_id, _ in publications},
+        vk_post_id__in=[post_id for _, post_id in publications]
+    ).values_list('vk_owner_id', 'vk_post_id'))
+    publications = [publication for key, publication in publications.items() if key not in existing]
+    variants = mirror_images(publication.image for publication in publications)
+    for publication in publications:
+        publication.image_variants = variants.get(publication.image, [])
+    Publication.objects.bulk_create(publications, ignore_conflicts=True)
+    # bulk_create sends no post_save and, ignoring conflicts, returns no ids; posts stored by a concurrent run
+    # in the meantime are indexed and counted here too
+    created = [publication for publication in Publication.objects.filter(
+        vk_owner_id__in={publication.vk_owner_id for publication in publications},
+        vk_post_id__in=[publication.vk_post_id for publication in publications]
+    ) if (publication.vk_owner_id, publication.vk_post_id) not in existing]
+    index_objects('publication', created)
+    bump_feed_version()
+    counts['created'] = len(created)
+    counts['stored'] += len(existing)
+    return counts
+
+
+def get_high_water_marks():
+    # greatest stored post id of every wall, and the latest publication saved before post ids were stored
+    high_water_marks = dict(Publication.objects.filter(vk_post_id__isnull=False).order_by()
+                            .values('vk_owner_id').annotate(post_id=Max('vk_post_id'))
+                            .values_list('vk_owner_id', 'post_id'))
+    legacy_datetime = Publication.objects.filter(vk_post_id=None).aggregate(
+        legacy_datetime=Max('publication_datetime'))['legacy_datetime']
+    return high_water_marks, legacy_datetime
+
+
+def parse_post(post):
+    publication = Publication(image=None, body_text='', title='', publication_datetime=get_post_datetime(post),
+                              vk_owner_id=post['owner_id'], vk_post_id=post['id'])
+
+    if 'copy_history' in post:
+        parent_post = post['copy_history'][0]
+        if parent_post['text'] is None or len(parent_post['text']) == 0:
+            return None
+        publication.body_text = parent_post['text'][:2000]
+        publication.image = get_photo(parent_post.get('attachments', []))
+
+    else:
+        if post['text'] is None or len(post['text']) == 0:
+            return None
+        publication.body_text = post['text'][:2000]
+        publication.image = get_photo(post.get('attachments', []))
+
+    publication.title = " ".join(publication.body_text.split()[:4])
+    return publication
 
 
 def get_photo(attachments: list):
@@ -0,0 +1,199 @@
+import base64
+import datetime
+import json
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.compat import coreapi, coreschema
+from rest_framework.pagination import BasePagination, LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    # Pages continue after the (field, id) position of the last row instead of an offset, so neither
+    # COUNT(*) nor skipped rows are needed. Requests with cursor or page_size are paginated this way,
+    # requests with limit or offset by LimitOffsetPagination, other requests get the whole list.
+    ordering = None
+    page_size = 20
+    max_page_size = 100
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    offset_pagination_class = LimitOffsetPagination
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.start_pagination(request)
+        if self.offset_paginator is not None:
+            return self.offset_paginator.paginate_queryset(queryset, request, view)
+        if self.page_size_value is None:
+            return None
+
+        field, descending = self.get_ordering_field()
+        queryset = queryset.order_by(*self.ordering)
+        if self.position is not None:
+            value, pk = self.position
+            if descending:
+                queryset = queryset.filter(Q(**{f'{field}__lt': value}) | Q(**{field: value, 'id__lt': pk}))
+            else:
+                queryset = queryset.filter(Q(**{f'{field}__gt': value}) | Q(**{field: value, 'id__gt': pk}))
+
+        return self.finish_page(list(queryset[:self.page_size_value + 1]),
+                                lambda obj: (getattr(obj, field), obj.pk))
+
+    def paginate_list(self, items, request, key, view=None):
+        # items must already be sorted by key, a (field value, id) pair
+        self.start_pagination(request)
+        if self.offset_paginator is not None:
+            return self.offset_paginator.paginate_queryset(items, request, view)
+        if self.page_size_value is None:
+            return None
+
+        if self.position is not None:
+            _, descending = self.get_ordering_field()
+            items = [item for item in items if (key(item) < self.position if descending
+                                                else key(item) > self.position)]
+        return self.finish_page(items[:self.page_size_value + 1], key)
+
+    def start_pagination(self, request):
+        self.request = request
+        self.offset_paginator = None
+        self.page_size_value = None
+        self.position = None
+        if 'limit' in request.query_params or 'offset' in request.query_params:
+            self.offset_paginator = self.offset_pagination_class()
+        elif self.cursor_query_param in request.query_params or self.page_size_query_param in request.query_params:
+            self.page_size_value = self.get_page_size(request)
+            self.position = self.decode_cursor(request)
+
+    def finish_page(self, rows, key):
+        has_next = len(rows) > self.page_size_value
+        rows = rows[:self.page_size_value]
+        self.next_position = key(rows[-1]) if has_next else None
+        return rows
+
+    def get_paginated_response(self, data):
+        if self.offset_paginator is not None:
+            return self.offset_paginator.get_paginated_response(data)
+        return Response({
+            'next': self.get_next_link(),
+            'results': data
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {
+                    'type': 'string',
+                    'nullable': True,
+                    'format': 'uri',
+                },
+                'results': schema,
+            },
+        }
+
+    def get_ordering_field(self):
+        field = self.ordering[0]
+        return field.lstrip('-'), field.startswith('-')
+
+    def get_page_size(self, request):
+        try:
+            return _parse_page_size(request.query_params[self.page_size_query_param], self.max_page_size)
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_position))
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            value, pk = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            value = parse_datetime(value)
+            if value is None or not isinstance(pk, int):
+                raise ValueError
+        except (TypeError, ValueError, UnicodeEncodeError):
+            raise NotFound(self.invalid_cursor_message)
+        return value, pk
+
+    def encode_cursor(self, position):
+        value, pk = position
+        if isinstance(value, datetime.datetime):
+            value = value.isoformat()
+        return base64.urlsafe_b64encode(json.dumps([value, pk]).encode('ascii')).decode('ascii')
+
+    def get_schema_fields(self, view):
+        return [
+            coreapi.Field(
+                name=self.cursor_query_param,
+                required=False,
+                location='query',
+                schema=coreschema.String(title='Cursor', description='The pagination cursor value.')
+            ),
+            coreapi.Field(
+                name=self.page_size_query_param,
+                required=False,
+                location='query',
+                schema=coreschema.Integer(title='Page size', description='Number of results to return per page.')
+            ),
+            *self.offset_pagination_class().get_schema_fields(view)
+        ]
+
+
+class PublicationPagination(KeysetPagination):
+    ordering = ('-publication_datetime', '-id')
+
+
+class EventPagination(KeysetPagination):
+    ordering = ('event_start_datetime', 'id')
+
+
+class ScheduleSearchPagination(LimitOffsetPagination):
+    default_limit = 50
+    max_limit = 500
+
+
+class SearchPagination(KeysetPagination):
+    # pages of full-text search hits continue after the (rank, kind, id) of the last hit
+    page_size = 20
+    max_page_size = 50
+
+    def paginate_search(self, search, request, view=None):
+        self.request = request
+        self.offset_paginator = None
+        self.page_size_value = self.get_page_size(request)
+        self.position = self.decode_cursor(request)
+        return self.finish_page(search(self.page_size_value + 1, self.position),
+                                lambda hit: (hit.rank, hit.kind, hit.object_id))
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            rank, kind, object_id = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            if not isinstance(rank, (int, float)) or not isinstance(kind, str) or not isinstance(object_id, int):
+                raise ValueError
+        except (TypeError, ValueError, UnicodeEncodeError):
+            raise NotFound(self.invalid_cursor_message)
+        return rank, kind, object_id
+
+    def encode_cursor(self, position):
+        return base64.urlsafe_b64encode(json.dumps(list(position)).encode('ascii')).decode('ascii')
+
+    def get_schema_fields(self, view):
+        return super().get_schema_fields(view)[:2]
+
+
+def _parse_page_size(value, max_page_size):
+    page_size = int(value)
+    if page_size <= 0:
+        raise ValueError(value)
+    return min(page_size, max_page_size)
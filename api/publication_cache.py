@@ -0,0 +1,112 @@
+import gzip
+import hashlib
+import json
+import threading
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+from django.utils.cache import patch_vary_headers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from api.models import PublicationFeedVersion
+
+# pagination parameters, other parameters are not cached so that they cannot flood the cache
+CACHED_PARAMS = {'cursor', 'page_size', 'limit', 'offset'}
+FEED_VERSION_ID = 1
+
+
+class PublicationResponseCache:
+    # Rendered JSON bodies of the publication list, stored together with their gzip encoding and keyed by
+    # the feed version. The version is read from the database, so posts saved by get_news in another
+    # container are visible at once even though the cache of every worker is its own.
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get_response(self, request, render):
+        if not self.can_cache(request):
+            return None
+        key = self.get_key(request)
+        entry = cache.get(key)
+        self.count(entry is not None)
+        if entry is None:
+            body = render()
+            entry = (body, gzip.compress(body, compresslevel=settings.PUBLICATION_CACHE_GZIP_LEVEL))
+            cache.set(key, entry, settings.PUBLICATION_CACHE_TIMEOUT)
+        return self.make_response(request, *entry)
+
+    def can_cache(self, request):
+        return isinstance(request.accepted_renderer, JSONRenderer) and set(request.query_params) <= CACHED_PARAMS
+
+    def get_key(self, request):
+        # absolute urls in the body depend on the host, get_host() only returns hosts allowed by ALLOWED_HOSTS
+        query = urlencode(sorted(request.query_params.lists()), doseq=True)
+        digest = hashlib.sha1(f'{request.scheme}://{request.get_host()}?{query}'.encode('utf-8')).hexdigest()
+        return f'publication-page:{get_feed_version()}:{digest}'
+
+    def make_response(self, request, body, compressed_body):
+        accepts_gzip = 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', '')
+        response = PrerenderedResponse(body, compressed_body if accepts_gzip else body)
+        response['Content-Type'] = request.accepted_renderer.media_type
+        if accepts_gzip:
+            response['Content-Encoding'] = 'gzip'
+        patch_vary_headers(response, ('Accept-Encoding',))
+        return response
+
+    def count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def clear_stats(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / requests if requests else 0.0,
+                'version': get_feed_version(),
+            }
+
+
+class PrerenderedResponse(Response):
+    # the body is sent as is, data is only decoded when something reads it
+    def __init__(self, body, content):
+        super().__init__()
+        self._body = body
+        self.content = content
+
+    @property
+    def data(self):
+        if self._data is None:
+            self._data = json.loads(self._body)
+        return self._data
+
+    @data.setter
+    def data(self, value):
+        self._data = value
+
+
+def get_feed_version():
+    return PublicationFeedVersion.objects.filter(pk=FEED_VERSION_ID).values_list('version', flat=True).first() or 0
+
+
+def bump_feed_version():
+    # bulk_create and bulk_update send no signals, their callers bump the version themselves; the row is
+    # created after migrate
+    if not PublicationFeedVersion.objects.filter(pk=FEED_VERSION_ID).update(version=F('version') + 1):
+        PublicationFeedVersion.objects.get_or_create(pk=FEED_VERSION_ID, defaults={'version': 1})
+
+
+publication_cache = PublicationResponseCache()
@@ -0,0 +1,86 @@
+import hashlib
+import io
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.conf import settings
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# (extension, Pillow format, content type) of every variant
+FORMATS = (
+    ('webp', 'WEBP', 'image/webp'),
+    ('jpg', 'JPEG', 'image/jpeg'),
+)
+MANIFEST = 'variants.json'
+
+
+def mirror_images(urls):
+    # Downloads every image once and stores its variants, returns the variants by url, an empty list if
+    # the image could not be mirrored. Pillow releases the GIL while decoding and resizing, so threads suffice.
+    urls = list(dict.fromkeys(url for url in urls if url))
+    if not urls:
+        return {}
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(settings.NEWS_IMAGE_WORKERS) as pool:
+        variants = dict(zip(urls, pool.map(_mirror_image, urls)))
+    logger.info("images: %d of %d mirrored in %.2fs", sum(1 for value in variants.values() if value), len(urls),
+                time.monotonic() - started)
+    return variants
+
+
+def _mirror_image(url):
+    try:
+        response = requests.get(url, timeout=settings.NEWS_FETCH_TIMEOUT)
+        response.raise_for_status()
+        return store_image(response.content)
+    except Exception as e:
+        logger.warning("images: %s failed: %s", url, e)
+        return []
+
+
+def store_image(content):
+    # Variants are stored under the hash of the original, so reposts of a photo share the files.
+    # The manifest is written last and marks a complete directory.
+    digest = hashlib.sha256(content).hexdigest()
+    directory = f'{settings.NEWS_IMAGE_DIR}/{digest[:2]}/{digest}'
+    root = os.path.join(settings.MEDIA_ROOT, directory)
+    try:
+        with open(os.path.join(root, MANIFEST)) as file:
+            return json.load(file)
+    except FileNotFoundError:
+        pass
+
+    widths = settings.NEWS_IMAGE_WIDTHS
+    with Image.open(io.BytesIO(content)) as image:
+        # JPEG is decoded at a reduced scale when even the largest variant is much smaller
+        image.draft('RGB', (max(widths), max(widths) * image.height // image.width))
+        image = ImageOps.exif_transpose(image).convert('RGB')
+
+    os.makedirs(root, exist_ok=True)
+    variants = []
+    for width in sorted({min(width, image.width) for width in widths}):
+        height = max(1, round(image.height * width / image.width))
+        resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+        for extension, image_format, content_type in FORMATS:
+            name = f'{width}.{extension}'
+            buffer = io.BytesIO()
+            resized.save(buffer, image_format, quality=settings.NEWS_IMAGE_QUALITY)
+            _write(os.path.join(root, name), buffer.getvalue())
+            variants.append({'path': f'{directory}/{name}', 'width': width, 'height': height, 'type': content_type})
+
+    _write(os.path.join(root, MANIFEST), json.dumps(variants).encode('utf-8'))
+    return variants
+
+
+def _write(path, content):
+    temporary_path = f'{path}.{os.getpid()}.{id(content)}.tmp'
+    with open(temporary_path, 'wb') as file:
+        file.write(content)
+    os.replace(temporary_path, path)
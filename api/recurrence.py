@@ -0,0 +1,122 @@
+import calendar
+import datetime
+from collections import namedtuple
+
+from django.utils import timezone
+
+FREQUENCIES = ('DAILY', 'WEEKLY', 'MONTHLY')
+WEEKDAY_CODES = ('MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU')
+
+RecurrenceRule = namedtuple('RecurrenceRule', ('freq', 'interval', 'count', 'until', 'by_day'))
+
+
+def parse_rule(text):
+    # subset of RFC 5545 RRULE: FREQ=DAILY|WEEKLY|MONTHLY, INTERVAL, COUNT or UNTIL, BYDAY with WEEKLY
+    parts = {}
+    text = text.strip().upper()
+    if text.startswith('RRULE:'):
+        text = text[len('RRULE:'):]
+    for part in text.split(';'):
+        if not part:
+            continue
+        name, separator, value = part.partition('=')
+        if not separator or not value or name in parts:
+            raise ValueError(f'invalid rule part "{part}"')
+        parts[name] = value
+
+    unsupported = set(parts) - {'FREQ', 'INTERVAL', 'COUNT', 'UNTIL', 'BYDAY'}
+    if unsupported:
+        raise ValueError(f'unsupported rule parts: {", ".join(sorted(unsupported))}')
+    if parts.get('FREQ') not in FREQUENCIES:
+        raise ValueError(f'FREQ must be one of {", ".join(FREQUENCIES)}')
+    if 'COUNT' in parts and 'UNTIL' in parts:
+        raise ValueError('COUNT and UNTIL must not be used together')
+
+    interval = int(parts.get('INTERVAL', 1))
+    count = int(parts['COUNT']) if 'COUNT' in parts else None
+    if interval < 1 or (count is not None and count < 1):
+        raise ValueError('INTERVAL and COUNT must be positive')
+
+    by_day = ()
+    if 'BYDAY' in parts:
+        if parts['FREQ'] != 'WEEKLY':
+            raise ValueError('BYDAY is supported only with FREQ=WEEKLY')
+        days = parts['BYDAY'].split(',')
+        if not set(days) <= set(WEEKDAY_CODES):
+            raise ValueError(f'BYDAY must be a list of {", ".join(WEEKDAY_CODES)}')
+        by_day = tuple(sorted({WEEKDAY_CODES.index(day) for day in days}))
+
+    return RecurrenceRule(parts['FREQ'], interval, count, _parse_until(parts['UNTIL']) if 'UNTIL' in parts else None,
+                          by_day)
+
+
+def iter_occurrences(rule, start, after=None):
+    # Yields the starts of the series in order. Without COUNT the periods before "after" are skipped
+    # instead of generated, so a far window of an unbounded series costs the same as the first one.
+    current_timezone = timezone.get_current_timezone()
+    first = timezone.localtime(start, current_timezone).replace(tzinfo=None)
+    period = 0
+    if after is not None and rule.count is None:
+        period = max(_get_period(rule, first, timezone.localtime(after, current_timezone).replace(tzinfo=None)) - 1,
+                     0)
+
+    until_date = isinstance(rule.until, datetime.date) and not isinstance(rule.until, datetime.datetime)
+    emitted = 0
+    while True:
+        for candidate in _get_period_candidates(rule, first, period):
+            if candidate < first:
+                continue
+            occurrence = timezone.make_aware(candidate, current_timezone)
+            if rule.until is not None and (candidate.date() if until_date else occurrence) > rule.until:
+                return
+            yield occurrence
+            emitted += 1
+            if rule.count is not None and emitted >= rule.count:
+                return
+        period += 1
+
+
+def expand(start, end, rule, skipped_dates=(), window_start=None, window_end=None):
+    # occurrences (start, end) that end on or after window_start and start before window_end
+    duration = end - start
+    after = window_start - duration if window_start is not None else None
+    for occurrence in iter_occurrences(rule, start, after):
+        if window_end is not None and occurrence >= window_end:
+            return
+        if window_start is not None and occurrence + duration < window_start:
+            continue
+        if timezone.localdate(occurrence) in skipped_dates:
+            continue
+        yield occurrence, occurrence + duration
+
+
+def _get_period(rule, first, moment):
+    if rule.freq == 'DAILY':
+        return (moment - first).days // rule.interval
+    if rule.freq == 'WEEKLY':
+        return ((moment - first).days + first.weekday()) // 7 // rule.interval
+    return ((moment.year - first.year) * 12 + moment.month - first.month) // rule.interval
+
+
+def _get_period_candidates(rule, first, period):
+    if rule.freq == 'DAILY':
+        return [first + datetime.timedelta(days=period * rule.interval)]
+    if rule.freq == 'WEEKLY':
+        week_start = first - datetime.timedelta(days=first.weekday() - 7 * period * rule.interval)
+        return [week_start + datetime.timedelta(days=weekday) for weekday in rule.by_day or (first.weekday(),)]
+
+    month = first.month - 1 + period * rule.interval
+    year, month = first.year + month // 12, month % 12 + 1
+    # months without this day are skipped as RFC 5545 requires
+    if first.day > calendar.monthrange(year, month)[1]:
+        return []
+    return [first.replace(year=year, month=month)]
+
+
+def _parse_until(value):
+    try:
+        if 'T' in value:
+            return datetime.datetime.strptime(value, '%Y%m%dT%H%M%SZ').replace(tzinfo=datetime.timezone.utc)
+        return datetime.datetime.strptime(value, '%Y%m%d').date()
+    except ValueError:
+        raise ValueError('UNTIL must be in the format YYYYMMDD or YYYYMMDDTHHMMSSZ')
@@ -0,0 +1,174 @@
+import mmap
+import os
+import struct
+from collections.abc import Mapping
+
+# Layout: header, day table (first record and record count of every week/weekday, first record is
+# ABSENT if the day is missing from the JSON), fixed-width records (one per slot of a day, string
+# indexes are ABSENT for the keys of an empty couple), string offsets and the UTF-8 string table.
+MAGIC = b'CSFB'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sH32sIII')
+DAY = struct.Struct('<IH')
+RECORD = struct.Struct('<5I')
+OFFSET = struct.Struct('<I')
+ABSENT = 0xFFFFFFFF
+
+WEEK_NAMES = ('numerator', 'denominator')
+DAY_NAMES = ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday')
+COUPLE_KEYS = ('timeFrom', 'timeTo', 'subjectName', 'classroom', 'professor')
+
+
+def get_binary_path(schedule_path):
+    return f'{schedule_path}.bin'
+
+
+def can_encode(document):
+    if not isinstance(document, dict) or not set(document) <= set(WEEK_NAMES):
+        return False
+    for week in document.values():
+        if not isinstance(week, dict) or not week or not set(week) <= set(DAY_NAMES):
+            return False
+        for day in week.values():
+            if not isinstance(day, list):
+                return False
+            for couple in day:
+                if not isinstance(couple, dict) or not set(couple) <= set(COUPLE_KEYS) \
+                        or (couple and set(couple) != set(COUPLE_KEYS)) \
+                        or not all(isinstance(value, str) for value in couple.values()):
+                    return False
+    return True
+
+
+def encode_schedule(document, checksum):
+    strings = {}
+    days = []
+    records = []
+    for week_name in WEEK_NAMES:
+        week = document.get(week_name)
+        for day_name in DAY_NAMES:
+            day = week.get(day_name) if week is not None else None
+            if day is None:
+                days.append(DAY.pack(ABSENT, 0))
+                continue
+            days.append(DAY.pack(len(records), len(day)))
+            for couple in day:
+                indexes = [strings.setdefault(couple[key], len(strings)) if key in couple else ABSENT
+                           for key in COUPLE_KEYS]
+                records.append(RECORD.pack(*indexes))
+
+    offsets = []
+    blob = bytearray()
+    for string in strings:
+        offsets.append(OFFSET.pack(len(blob)))
+        blob += string.encode('utf-8')
+    offsets.append(OFFSET.pack(len(blob)))
+
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, bytes.fromhex(checksum), len(strings), len(records), len(blob))
+    return b''.join([header, *days, *records, *offsets, bytes(blob)])
+
+
+def write_schedule_binary(path, document, checksum):
+    if not checksum or not can_encode(document):
+        remove_schedule_binary(path)
+        return False
+
+    temporary_path = f'{path}.{os.getpid()}.tmp'
+    with open(temporary_path, 'wb') as file:
+        file.write(encode_schedule(document, checksum))
+    # workers that still map the previous file keep reading its inode until their cache closes it
+    os.replace(temporary_path, path)
+    return True
+
+
+def remove_schedule_binary(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def open_schedule_binary(path, checksum):
+    # the mapping shares the page cache between workers, the caller closes it when it drops the schedule
+    try:
+        with open(path, 'rb') as file:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (FileNotFoundError, ValueError):
+        return None
+
+    if len(buffer) < HEADER.size:
+        buffer.close()
+        return None
+    magic, version, file_checksum, _, _, _ = HEADER.unpack_from(buffer)
+    if magic != MAGIC or version != FORMAT_VERSION or file_checksum.hex() != checksum:
+        buffer.close()
+        return None
+    return BinarySchedule(buffer)
+
+
+class BinarySchedule(Mapping):
+    # Read-only view of a schedule document, couples are decoded from the mapped file on access.
+    def __init__(self, buffer):
+        self._buffer = buffer
+        _, _, _, string_count, record_count, _ = HEADER.unpack_from(buffer)
+        self._days_offset = HEADER.size
+        self._records_offset = self._days_offset + DAY.size * len(WEEK_NAMES) * len(DAY_NAMES)
+        self._offsets_offset = self._records_offset + RECORD.size * record_count
+        self._strings_offset = self._offsets_offset + OFFSET.size * (string_count + 1)
+        self._weeks = {
+            week_name: BinaryScheduleWeek(self, week)
+            for week, week_name in enumerate(WEEK_NAMES) if self._has_week(week)
+        }
+
+    def __getitem__(self, week_name):
+        return self._weeks[week_name]
+
+    def __iter__(self):
+        return iter(self._weeks)
+
+    def __len__(self):
+        return len(self._weeks)
+
+    def close(self):
+        self._buffer.close()
+
+    def get_day(self, week, weekday):
+        first, count = self._get_day_range(week, weekday)
+        if first == ABSENT:
+            return None
+        return [self._get_couple(first + i) for i in range(count)]
+
+    def _has_week(self, week):
+        return any(self._get_day_range(week, weekday)[0] != ABSENT for weekday in range(len(DAY_NAMES)))
+
+    def _get_day_range(self, week, weekday):
+        return DAY.unpack_from(self._buffer, self._days_offset + DAY.size * (week * len(DAY_NAMES) + weekday))
+
+    def _get_couple(self, record):
+        indexes = RECORD.unpack_from(self._buffer, self._records_offset + RECORD.size * record)
+        return {key: self._get_string(index) for key, index in zip(COUPLE_KEYS, indexes) if index != ABSENT}
+
+    def _get_string(self, index):
+        start, = OFFSET.unpack_from(self._buffer, self._offsets_offset + OFFSET.size * index)
+        end, = OFFSET.unpack_from(self._buffer, self._offsets_offset + OFFSET.size * (index + 1))
+        return str(self._buffer[self._strings_offset + start:self._strings_offset + end], 'utf-8')
+
+
+class BinaryScheduleWeek(Mapping):
+    def __init__(self, schedule, week):
+        self._schedule = schedule
+        self._week = week
+        self._days = [day_name for weekday, day_name in enumerate(DAY_NAMES)
+                      if schedule._get_day_range(week, weekday)[0] != ABSENT]
+
+    def __getitem__(self, day_name):
+        if day_name not in self._days:
+            raise KeyError(day_name)
+        return self._schedule.get_day(self._week, DAY_NAMES.index(day_name))
+
+    def __iter__(self):
+        return iter(self._days)
+
+    def __len__(self):
+        return len(self._days)
+
@@ -0,0 +1,125 @@
+from collections import namedtuple
+
+from api.academic_calendar import WEEKS_RU, WEEKDAYS_RU
+from api.models import CourseGroup, Lesson
+from api.schedule_utilities import format_minutes
+
+CONFLICT_KINDS = {
+    'professor': 'Преподаватель',
+    'classroom': 'Аудитория',
+}
+
+Conflict = namedtuple('Conflict', ('kind', 'resource', 'week', 'weekday', 'start_minute', 'end_minute',
+                                   'course_group_ids', 'subjects'))
+
+
+class LessonColumns:
+    # One list per lesson attribute, so the sweep only touches the columns it compares.
+    def __init__(self):
+        self.course_group_ids = []
+        self.weeks = []
+        self.weekdays = []
+        self.start_minutes = []
+        self.end_minutes = []
+        self.subject_names = []
+        self.classrooms = []
+        self.professors = []
+
+    def __len__(self):
+        return len(self.course_group_ids)
+
+    def append(self, course_group_id, week, weekday, start_minute, end_minute, subject_name, classroom, professor):
+        self.course_group_ids.append(course_group_id)
+        self.weeks.append(week)
+        self.weekdays.append(weekday)
+        self.start_minutes.append(start_minute)
+        self.end_minutes.append(end_minute)
+        self.subject_names.append(subject_name)
+        self.classrooms.append(classroom.strip())
+        self.professors.append(professor)
+
+    def extend_from_lessons(self, queryset):
+        for lesson in queryset.values_list('course_group_id', 'week', 'weekday', 'start_minute', 'end_minute',
+                                           'subject_name', 'classroom', 'professor'):
+            self.append(*lesson)
+
+    def extend_from_document_lessons(self, course_group_id, lessons):
+        for lesson in lessons:
+            self.append(course_group_id, lesson['week'], lesson['weekday'], lesson['start_minute'],
+                        lesson['end_minute'], lesson['subject_name'], lesson['classroom'], lesson['professor'])
+
+
+def find_conflicts(columns, kinds=tuple(CONFLICT_KINDS)):
+    conflicts = []
+    for kind in kinds:
+        conflicts += _sweep(columns, kind)
+    return conflicts
+
+
+def find_new_conflicts(document_lessons):
+    # document_lessons maps a course group id to the lessons of its new schedule file, the stored
+    # lessons of those groups are replaced by them.
+    columns = LessonColumns()
+    columns.extend_from_lessons(Lesson.objects.exclude(course_group_id__in=document_lessons))
+    for course_group_id, lessons in document_lessons.items():
+        columns.extend_from_document_lessons(course_group_id, lessons)
+
+    return [conflict for conflict in find_conflicts(columns)
+            if any(course_group_id in document_lessons for course_group_id in conflict.course_group_ids)]
+
+
+def describe_conflicts(conflicts):
+    course_groups = CourseGroup.objects.in_bulk(
+        {course_group_id for conflict in conflicts for course_group_id in conflict.course_group_ids})
+    return [describe_conflict(conflict, course_groups) for conflict in conflicts]
+
+
+def describe_conflict(conflict, course_groups):
+    lessons = ' и '.join(
+        f'{course_groups.get(course_group_id, course_group_id)} «{subject}»'
+        for course_group_id, subject in zip(conflict.course_group_ids, conflict.subjects)
+    )
+    return f'{CONFLICT_KINDS[conflict.kind]} {conflict.resource}: {WEEKS_RU[conflict.week]}, ' \
+           f'{WEEKDAYS_RU[conflict.weekday]} {format_minutes(conflict.start_minute)}-' \
+           f'{format_minutes(conflict.end_minute)} — {lessons}'
+
+
+def _sweep(columns, kind):
+    resources = columns.professors if kind == 'professor' else columns.classrooms
+    weeks, weekdays = columns.weeks, columns.weekdays
+    starts, ends = columns.start_minutes, columns.end_minutes
+
+    order = sorted((i for i in range(len(columns)) if resources[i] and starts[i] < ends[i]),
+                   key=lambda i: (resources[i], weeks[i], weekdays[i], starts[i], ends[i]))
+
+    conflicts = []
+    slot = None
+    active = []
+    for i in order:
+        if (resources[i], weeks[i], weekdays[i]) != slot:
+            slot = (resources[i], weeks[i], weekdays[i])
+            active = []
+        active = [j for j in active if ends[j] > starts[i]]
+        for j in active:
+            if columns.course_group_ids[j] != columns.course_group_ids[i] and not _is_joint_lesson(columns, i, j):
+                conflicts.append(Conflict(
+                    kind=kind,
+                    resource=resources[i],
+                    week=weeks[i],
+                    weekday=weekdays[i],
+                    start_minute=starts[i],
+                    end_minute=min(ends[i], ends[j]),
+                    course_group_ids=(columns.course_group_ids[j], columns.course_group_ids[i]),
+                    subjects=(columns.subject_names[j], columns.subject_names[i]),
+                ))
+        active.append(i)
+    return conflicts
+
+
+def _is_joint_lesson(columns, i, j):
+    # a lecture read to several groups at once is the same lesson in every group file
+    return columns.start_minutes[i] == columns.start_minutes[j] \
+        and columns.end_minutes[i] == columns.end_minutes[j] \
+        and columns.subject_names[i] == columns.subject_names[j] \
+        and columns.classrooms[i] == columns.classrooms[j] \
+        and columns.professors[i] == columns.professors[j]
@@ -0,0 +1,186 @@
+import hashlib
+import json
+import os
+import re
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.db import connections, transaction
+
+from api.models import CourseGroup, Schedule
+from api.schedule_conflicts import describe_conflicts, find_new_conflicts
+from api.schedule_utilities import bulk_schedule_update, get_document_lessons, save_schedule_binary, \
+    schedule_cache
+from api.validators import get_schedule_errors
+
+SCHEDULE_FILENAME = re.compile(r'^(?P<course_number>\d+)_(?P<group_number>.+)_(?P<level>[bmps])\.json$')
+
+
+def import_schedules(source, workers=1, skip_invalid=False):
+    # Files are validated in this process unless workers asks for a process pool, which only the
+    # import_schedules command does: forking and closing connections is not safe in a web worker.
+    files = _read_schedule_files(source)
+
+    if workers == 1 or len(files) <= 1:
+        results = [_validate_schedule_file(file) for file in files]
+    else:
+        for connection in connections.all():
+            if not connection.in_atomic_block:
+                connection.close()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_validate_schedule_file, files))
+    for result, (_, content) in zip(results, files):
+        result['content'] = content
+
+    course_groups = _get_course_groups(result['key'] for result in results if result['key'] is not None)
+    for result in results:
+        if result['key'] is not None and not result['errors']:
+            result['course_group'] = course_groups.get(result['key'])
+            if result['course_group'] is None:
+                result['errors'].append('Группа не найдена')
+
+    _check_conflicts([result for result in results if not result['errors']])
+
+    valid = [result for result in results if not result['errors']]
+    if len(valid) != len(results) and not skip_invalid:
+        valid = []
+
+    schedules = {}
+    for schedule in Schedule.objects.filter(course_group__in=[result['course_group'] for result in valid]):
+        schedules.setdefault(schedule.course_group_id, schedule)
+
+    # New files are written next to the current ones and moved in place once the rows are committed,
+    # a rolled back import leaves the schedules on disk untouched.
+    staged = []
+    try:
+        with transaction.atomic(), bulk_schedule_update():
+            for result in valid:
+                started = time.perf_counter()
+                course_group = result['course_group']
+                schedule = schedules.get(course_group.pk) or Schedule(course_group=course_group)
+                schedule.schedule_file = schedule.get_schedule_path(result['name'])
+                schedule.staged_path = _stage_file(schedule.schedule_file.path, result['content'])
+                staged.append(schedule.staged_path)
+                schedule.schedule_file.schedule_document = result['document']
+                schedule.schedule_file.schedule_checksum = result['checksum']
+                schedule.save()
+                transaction.on_commit(lambda schedule=schedule: _publish_schedule_file(schedule))
+                result['imported'] = True
+                result['save_time'] = time.perf_counter() - started
+    except BaseException:
+        for path in staged:
+            _remove_file(path)
+        raise
+
+    return [
+        {
+            'name': result['name'],
+            'course_group': result.get('course_group'),
+            'imported': result.get('imported', False),
+            'errors': result['errors'],
+            'conflicts': result.get('conflicts', []),
+            'validate_time': result['validate_time'],
+            'save_time': result.get('save_time', 0.0),
+        }
+        for result in results
+    ]
+
+
+def _check_conflicts(results):
+    by_course_group = {result['course_group'].pk: result for result in results}
+    conflicts = find_new_conflicts({
+        course_group_id: get_document_lessons(result['document'], result['name'])
+        for course_group_id, result in by_course_group.items()
+    })
+
+    for conflict, description in zip(conflicts, describe_conflicts(conflicts)):
+        for course_group_id in set(conflict.course_group_ids):
+            if course_group_id in by_course_group:
+                by_course_group[course_group_id].setdefault('conflicts', []).append(description)
+
+    if settings.SCHEDULE_CONFLICTS == 'reject':
+        for result in results:
+            if result.get('conflicts'):
+                result['errors'].append(f"Конфликтов с другими расписаниями: {len(result['conflicts'])}")
+
+
+def _stage_file(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    staged_path = f'{path}.{os.getpid()}.{time.monotonic_ns()}.tmp'
+    with open(staged_path, 'wb') as file:
+        file.write(content)
+    return staged_path
+
+
+def _publish_schedule_file(schedule):
+    os.replace(schedule.staged_path, schedule.schedule_file.path)
+    schedule.staged_path = None
+    schedule_cache.delete(schedule.course_group_id)
+    save_schedule_binary(schedule)
+
+
+def _remove_file(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _read_schedule_files(source):
+    if isinstance(source, (str, os.PathLike)) and os.path.isdir(source):
+        return [
+            (name, _read_file(os.path.join(source, name)))
+            for name in sorted(os.listdir(source)) if name.endswith('.json')
+        ]
+
+    with zipfile.ZipFile(source) as archive:
+        return [
+            (os.path.basename(info.filename), archive.read(info))
+            for info in sorted(archive.infolist(), key=lambda info: info.filename)
+            if not info.is_dir() and info.filename.endswith('.json')
+        ]
+
+
+def _read_file(path):
+    with open(path, 'rb') as file:
+        return file.read()
+
+
+def _validate_schedule_file(file):
+    name, content = file
+    started = time.perf_counter()
+    result = {'name': name, 'key': None, 'document': None, 'checksum': None, 'errors': []}
+
+    match = SCHEDULE_FILENAME.match(name)
+    if match is None:
+        result['errors'].append('Имя файла должно иметь вид {курс}_{группа}_{ступень}.json')
+    else:
+        result['key'] = (int(match['course_number']), match['group_number'], match['level'])
+
+    try:
+        result['document'] = json.loads(content)
+        result['errors'] += get_schedule_errors(result['document'])
+        result['checksum'] = hashlib.sha256(content).hexdigest()
+    except ValueError as e:
+        result['errors'].append(f'Ошибка чтения файла расписания: {e}')
+
+    result['validate_time'] = time.perf_counter() - started
+    return result
+
+
+def _get_course_groups(keys):
+    keys = set(keys)
+    if not keys:
+        return {}
+
+    course_groups = CourseGroup.objects.filter(
+        course_number__in={course_number for course_number, _, _ in keys},
+        group_number__in={group_number for _, group_number, _ in keys},
+    )
+    return {
+        (course_group.course_number, course_group.group_number, course_group.higher_education_level): course_group
+        for course_group in course_groups
+        if (course_group.course_number, course_group.group_number, course_group.higher_education_level) in keys
+    }
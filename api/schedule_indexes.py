@@ -0,0 +1,333 @@
+import abc
+import bisect
+import datetime
+import re
+import threading
+import time
+
+from django.conf import settings
+
+from api.academic_calendar import get_academic_calendar
+from api.models import Schedule, Lesson
+from api.schedule_utilities import normalize_professor_name
+
+LESSON_FIELDS = ('schedule_id', 'course_group_id', 'week', 'weekday', 'start_minute', 'end_minute',
+                 'subject_name', 'classroom', 'professor')
+
+MINUTES_PER_DAY = 24 * 60
+
+_indexes = []
+
+
+class ScheduleIndex(abc.ABC):
+    # Only lessons of schedule files whose checksum changed since the previous refresh are reloaded.
+    # Other workers' uploads are noticed after SCHEDULE_INDEX_REFRESH_SECONDS.
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._versions = {}
+        self._checked_at = 0.0
+        self._stale = True
+        _indexes.append(self)
+
+    def invalidate(self):
+        self._stale = True
+
+    def clear(self):
+        with self._lock:
+            self.retract(set(self._versions))
+            self._versions = {}
+            self._stale = True
+
+    def refresh(self):
+        with self._lock:
+            now = time.monotonic()
+            if not self._stale and now - self._checked_at < settings.SCHEDULE_INDEX_REFRESH_SECONDS:
+                return
+
+            versions = dict(Schedule.objects.values_list('id', 'checksum'))
+            changed = {schedule_id for schedule_id, checksum in versions.items()
+                       if self._versions.get(schedule_id) != checksum}
+            removed = set(self._versions) - set(versions)
+
+            if changed or removed:
+                self.retract(changed | removed)
+            if changed:
+                self.add(Lesson.objects.filter(schedule_id__in=changed).values_list(*LESSON_FIELDS))
+
+            self._versions = versions
+            self._checked_at = now
+            self._stale = False
+
+    @abc.abstractmethod
+    def retract(self, schedule_ids):
+        pass
+
+    @abc.abstractmethod
+    def add(self, lessons):
+        pass
+
+
+def invalidate_schedule_indexes():
+    for index in _indexes:
+        index.invalidate()
+
+
+class ClassroomOccupancyIndex(ScheduleIndex):
+    def __init__(self):
+        super().__init__()
+        self._intervals = {}
+        self._schedule_keys = {}
+        self._bitmaps = {}
+        self._classrooms = []
+
+    def retract(self, schedule_ids):
+        keys = set()
+        for schedule_id in schedule_ids:
+            keys |= self._schedule_keys.pop(schedule_id, set())
+
+        for key in keys:
+            intervals = [interval for interval in self._intervals[key] if interval[2] not in schedule_ids]
+            self._set_intervals(key, intervals)
+        self._update_classrooms()
+
+    def add(self, lessons):
+        added = {}
+        for schedule_id, _, week, weekday, start_minute, end_minute, _, classroom, _ in lessons:
+            classroom = classroom.strip()
+            if not classroom or end_minute <= start_minute:
+                continue
+            key = (week, weekday, classroom)
+            added.setdefault(key, []).append((start_minute, end_minute, schedule_id))
+            self._schedule_keys.setdefault(schedule_id, set()).add(key)
+
+        for key, intervals in added.items():
+            self._set_intervals(key, self._intervals.get(key, []) + intervals)
+        self._update_classrooms()
+
+    def _set_intervals(self, key, intervals):
+        week, weekday, classroom = key
+        day = self._bitmaps.setdefault((week, weekday), {})
+        if not intervals:
+            self._intervals.pop(key, None)
+            day.pop(classroom, None)
+        else:
+            intervals.sort()
+            self._intervals[key] = intervals
+            bitmap = 0
+            for start_minute, end_minute, _ in intervals:
+                bitmap |= _minutes_mask(start_minute, end_minute)
+            day[classroom] = bitmap
+
+    def _update_classrooms(self):
+        self._classrooms = sorted({classroom for _, _, classroom in self._intervals})
+
+    def get_free_classrooms(self, week, weekday, start_minute, end_minute):
+        self.refresh()
+        mask = _minutes_mask(start_minute, min(end_minute, MINUTES_PER_DAY))
+        day = self._bitmaps.get((week, weekday), {})
+        return [classroom for classroom in self._classrooms if not day.get(classroom, 0) & mask]
+
+    def get_classroom_intervals(self, week, weekday, classroom):
+        self.refresh()
+        return [(start_minute, end_minute) for start_minute, end_minute, _ in
+                self._intervals.get((week, weekday, classroom), [])]
+
+
+class ScheduleSearchIndex(ScheduleIndex):
+    # Distinct field values are indexed by trigrams for substring queries and by sorted words for
+    # queries shorter than a trigram, every value keeps the ids of the lessons it occurs in.
+    FIELDS = {
+        'subjectName': 6,
+        'classroom': 7,
+        'professor': 8,
+    }
+
+    def __init__(self):
+        super().__init__()
+        self._lessons = {}
+        self._ranks = {}
+        self._schedule_lessons = {}
+        self._next_id = 0
+        self._values = {field: {} for field in self.FIELDS}
+        self._trigrams = {field: {} for field in self.FIELDS}
+        self._words = {field: [] for field in self.FIELDS}
+        self._sorted = True
+
+    def retract(self, schedule_ids):
+        self._sorted = False
+        removed = {field: set() for field in self.FIELDS}
+        for schedule_id in schedule_ids:
+            for lesson_id in self._schedule_lessons.pop(schedule_id, ()):
+                lesson = self._lessons.pop(lesson_id)
+                for field, position in self.FIELDS.items():
+                    value = _normalize_search_text(lesson[position])
+                    if self._remove_value(field, value, lesson_id):
+                        removed[field].add(value)
+
+        for field, values in removed.items():
+            if values:
+                self._words[field] = [word for word in self._words[field] if word[1] not in values]
+
+    def add(self, lessons):
+        self._sorted = False
+        for lesson in lessons:
+            lesson_id = self._next_id
+            self._next_id += 1
+            self._lessons[lesson_id] = lesson
+            self._schedule_lessons.setdefault(lesson[0], []).append(lesson_id)
+            for field, position in self.FIELDS.items():
+                self._add_value(field, _normalize_search_text(lesson[position]), lesson_id)
+
+    def search(self, query, fields=None):
+        self.refresh()
+        query = _normalize_search_text(query)
+        if not query:
+            return []
+
+        with self._lock:
+            if not self._sorted:
+                self._sort()
+
+            lesson_ids = set()
+            for field in fields or self.FIELDS:
+                for value in self._find_values(field, query):
+                    lesson_ids |= self._values[field][value]
+            return [self._lessons[lesson_id] for lesson_id in sorted(lesson_ids, key=self._ranks.__getitem__)]
+
+    def _sort(self):
+        for words in self._words.values():
+            words.sort()
+
+        # results are ordered by subject, week, weekday, start time and group
+        lesson_ids = sorted(self._lessons, key=lambda lesson_id: _get_search_order(self._lessons[lesson_id]))
+        self._ranks = {lesson_id: rank for rank, lesson_id in enumerate(lesson_ids)}
+        self._sorted = True
+
+    def _find_values(self, field, query):
+        if len(query) < 3:
+            words = self._words[field]
+            values = set()
+            i = bisect.bisect_left(words, (query,))
+            while i < len(words) and words[i][0].startswith(query):
+                values.add(words[i][1])
+                i += 1
+            return values
+
+        trigrams = self._trigrams[field]
+        postings = sorted((trigrams.get(trigram, set()) for trigram in _get_trigrams(query)), key=len)
+        values = set(postings[0]).intersection(*postings[1:])
+        return {value for value in values if query in value}
+
+    def _add_value(self, field, value, lesson_id):
+        if not value:
+            return
+        values = self._values[field]
+        if value not in values:
+            values[value] = set()
+            for trigram in _get_trigrams(value):
+                self._trigrams[field].setdefault(trigram, set()).add(value)
+            self._words[field] += [(word, value) for word in _get_words(value)]
+        values[value].add(lesson_id)
+
+    def _remove_value(self, field, value, lesson_id):
+        # True when the last lesson of the value is removed, retract() then drops its words
+        lesson_ids = self._values[field].get(value)
+        if lesson_ids is None:
+            return False
+        lesson_ids.discard(lesson_id)
+        if lesson_ids:
+            return False
+
+        del self._values[field][value]
+        trigrams = self._trigrams[field]
+        for trigram in _get_trigrams(value):
+            trigrams[trigram].discard(value)
+            if not trigrams[trigram]:
+                del trigrams[trigram]
+        return True
+
+
+class NextLessonIndex(ScheduleIndex):
+    # Lessons of every group and professor are kept per (week, weekday) as a sorted list of start
+    # minutes with the lessons in the same order.
+    LOOKAHEAD_DAYS = 28
+
+    def __init__(self):
+        super().__init__()
+        self._days = {}
+        self._schedule_keys = {}
+
+    def retract(self, schedule_ids):
+        keys = set()
+        for schedule_id in schedule_ids:
+            keys |= self._schedule_keys.pop(schedule_id, set())
+
+        for key in keys:
+            lessons = [lesson for lesson in self._days[key][1] if lesson[0] not in schedule_ids]
+            self._set_lessons(key, lessons)
+
+    def add(self, lessons):
+        added = {}
+        for lesson in lessons:
+            schedule_id, course_group_id, week, weekday, start_minute, end_minute, _, _, professor = lesson
+            if end_minute <= start_minute:
+                continue
+            owners = [('group', course_group_id)]
+            if professor:
+                owners.append(('professor', professor))
+            for owner in owners:
+                key = (owner, week, weekday)
+                added.setdefault(key, []).append(lesson)
+                self._schedule_keys.setdefault(schedule_id, set()).add(key)
+
+        for key, lessons in added.items():
+            self._set_lessons(key, self._days.get(key, ([], []))[1] + lessons)
+
+    def _set_lessons(self, key, lessons):
+        if not lessons:
+            self._days.pop(key, None)
+            return
+        lessons.sort(key=lambda lesson: (lesson[4], lesson[5], lesson[1]))
+        self._days[key] = ([lesson[4] for lesson in lessons], lessons)
+
+    def get_next_lessons(self, owner, moment):
+        # returns the date and the lessons starting at the same minute, not earlier than moment
+        self.refresh()
+        calendar = get_academic_calendar()
+        minute = moment.hour * 60 + moment.minute
+        for offset in range(self.LOOKAHEAD_DAYS):
+            day = calendar.get_day(moment.date() + datetime.timedelta(days=offset))
+            if day.is_holiday:
+                continue
+            with self._lock:
+                starts, lessons = self._days.get((owner, day.week, day.weekday), ([], []))
+                i = bisect.bisect_left(starts, minute if offset == 0 else 0)
+                if i < len(starts):
+                    return day, lessons[i:bisect.bisect_right(starts, starts[i])]
+        return None, []
+
+
+def _get_search_order(lesson):
+    _, course_group_id, week, weekday, start_minute, _, subject_name, _, _ = lesson
+    return subject_name, week == 'd', weekday, start_minute, course_group_id
+
+
+def _normalize_search_text(text):
+    return normalize_professor_name(text).lower().replace('ё', 'е')
+
+
+def _get_trigrams(value):
+    return {value[i:i + 3] for i in range(len(value) - 2)}
+
+
+def _get_words(value):
+    return set(re.findall(r'\w+', value))
+
+
+def _minutes_mask(start_minute, end_minute):
+    return ((1 << (end_minute - start_minute)) - 1) << start_minute
+
+
+classroom_index = ClassroomOccupancyIndex()
+search_index = ScheduleSearchIndex()
+next_lesson_index = NextLessonIndex()
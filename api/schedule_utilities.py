@@ -7,22 +7,39 @@ import django
 django.setup()
 
 import datetime
+import hashlib
 import json
+import logging
+import re
+import threading
+from contextlib import contextmanager
 
 from django.conf import settings
-from rest_framework.exceptions import NotFound
+from django.db import transaction
+from rest_framework.exceptions import NotFound, ValidationError
 
-from api.models import Schedule
+from api.academic_calendar import get_academic_calendar
+from api.cache import LRUCache
+from api.schedule_binary import BinarySchedule, get_binary_path, open_schedule_binary, remove_schedule_binary, \
+    write_schedule_binary
+from api.models import Schedule, ProfessorSchedule, Lesson
 
-ROOT_PATH = os.path.join(settings.MEDIA_ROOT, 'schedules')
+logger = logging.getLogger(__name__)
+
+WEEKS = dict(Lesson.WEEKS)
+WEEKDAYS = tuple(day for _, day in Lesson.WEEKDAYS)
+
+schedule_cache = LRUCache(settings.SCHEDULE_CACHE_SIZE,
+                          on_evict=lambda document: document.close() if isinstance(document, BinarySchedule) else None)
+
+_bulk_update = threading.local()
 
 
 def get_user_schedule(user, user_role, week=None, day=None):
-    file = None
-    if user_role == 'professor':
-        file = get_professor_schedule(user)
-    if user_role == 'student':
-        file = get_student_schedule(user)
+    if user_role == 'professor' and week not in ('n', 'd', 'a') and day is not None:
+        return get_professor_day_schedule(user, day)
+
+    file = load_user_schedule(user, user_role)
 
     if week is not None:
         if week == 'n':
@@ -32,83 +49,301 @@ def get_user_schedule(user, user_role, week=None, day=None):
         if week == 'a':
             return file
     if day is not None:
-        parse_date = datetime.datetime.strptime(day, "%d-%m-%Y").date()
-        week_number = parse_date.isocalendar().week
-        weekday = parse_date.weekday()
-
-        week_schedule = file
-
-        if week_number % 2 == 0:
-            week_schedule = file['denominator']
-        else:
-            week_schedule = file['numerator']
-
-        if weekday == 0:
-            return week_schedule['monday']
-        if weekday == 1:
-            return week_schedule['tuesday']
-        if weekday == 2:
-            return week_schedule['wednesday']
-        if weekday == 3:
-            return week_schedule['thursday']
-        if weekday == 4:
-            return week_schedule['friday']
-        if weekday == 5:
-            return week_schedule['saturday']
+        week, weekday = _get_week_and_weekday(day)
+
         if weekday == 6:
             return None
 
+        return file[WEEKS[week]][WEEKDAYS[weekday]]
+
     return file
 
 
+def get_user_schedule_range(user, user_role, date_from, date_to):
+    try:
+        first_date = parse_date(date_from)
+        last_date = parse_date(date_to)
+    except ValueError:
+        raise ValidationError('dates must be in dd-mm-yyyy format')
+    if last_date < first_date:
+        raise ValidationError('"from" must not be later than "to"')
+    if (last_date - first_date).days >= settings.SCHEDULE_RANGE_MAX_DAYS:
+        raise ValidationError(f'range must not exceed {settings.SCHEDULE_RANGE_MAX_DAYS} days')
+
+    file = load_user_schedule(user, user_role)
+
+    schedule_range = {}
+    current_date = first_date
+    while current_date <= last_date:
+        if current_date == first_date or current_date.weekday() == 0:
+            week_schedule = file[WEEKS[get_date_week(current_date)]]
+        weekday = current_date.weekday()
+        schedule_range[current_date.strftime("%d-%m-%Y")] = None if weekday == 6 \
+            else week_schedule[WEEKDAYS[weekday]]
+        current_date += datetime.timedelta(days=1)
+    return schedule_range
+
+
+def load_user_schedule(user, user_role):
+    if user_role == 'professor':
+        return get_professor_schedule(user)
+    if user_role == 'student':
+        return get_student_schedule(user)
+    return None
+
+
+def parse_date(day):
+    return datetime.datetime.strptime(day, "%d-%m-%Y").date()
+
+
+def get_date_week(date):
+    return get_academic_calendar().get_day(date).week
+
+
+def get_semester_bounds(date):
+    return get_academic_calendar().get_semester_bounds(date)
+
+
+def _get_week_and_weekday(day):
+    calendar_day = get_academic_calendar().get_day(parse_date(day))
+    return calendar_day.week, calendar_day.weekday
+
+
 def get_student_schedule(student):
     try:
-        schedule = Schedule.objects.get(course_group_id=student.course_group)
-        file = json.load(schedule.schedule_file)
-        return file
+        schedule = Schedule.objects.only('course_group_id', 'schedule_file', 'checksum') \
+            .get(course_group_id=student.course_group)
+        return load_schedule_document(schedule)
     except Exception:
         raise NotFound('course group not found')
 
 
+def load_schedule_document(schedule):
+    if schedule.document is not None:
+        if schedule.checksum:
+            schedule_cache.set(schedule.course_group_id, schedule.document, schedule.checksum)
+        return schedule.document
+
+    if schedule.checksum:
+        document = schedule_cache.get(schedule.course_group_id, schedule.checksum)
+        if document is not None:
+            return document
+        document = open_schedule_binary(get_binary_path(schedule.schedule_file.path), schedule.checksum)
+        if document is not None:
+            schedule_cache.set(schedule.course_group_id, document, schedule.checksum)
+            return document
+
+    with schedule.schedule_file.open('rb') as schedule_file:
+        document = json.load(schedule_file)
+
+    if schedule.checksum:
+        schedule_cache.set(schedule.course_group_id, document, schedule.checksum)
+    return document
+
+
+def save_schedule_binary(schedule):
+    try:
+        document = load_schedule_document(schedule)
+        if isinstance(document, BinarySchedule):
+            return True
+        return write_schedule_binary(get_binary_path(schedule.schedule_file.path), document, schedule.checksum)
+    except Exception:
+        logger.exception("schedule binary: %s could not be written", schedule.schedule_file.name)
+        return False
+
+
+def delete_schedule_binary(schedule):
+    try:
+        remove_schedule_binary(get_binary_path(schedule.schedule_file.path))
+    except Exception:
+        logger.exception("schedule binary: %s could not be removed", schedule.schedule_file.name)
+
+
+def get_professor_identification(professor):
+    return normalize_professor_name(
+        professor.user.second_name + ' ' + professor.user.first_name[0] + '.' + professor.user.patronymic[0] + '.')
+
+
+def normalize_professor_name(name: str):
+    name = ' '.join(name.split())
+    return re.sub(r'\.\s+(?=\w\.)', '.', name)
+
+
 def get_professor_schedule(professor):
-    identification = professor.user.second_name + ' ' + professor.user.first_name[0] + '.' + professor.user.patronymic[
-        0] + '.'
+    index = ProfessorSchedule.objects.filter(identification=get_professor_identification(professor)).first()
+    if index is None:
+        return _create_empty_schedule_dict()
+    return index.schedule
+
+
+def get_professor_day_schedule(professor, day):
+    week, weekday = _get_week_and_weekday(day)
+    if weekday == 6:
+        return None
+
+    lessons = Lesson.objects.filter(professor=get_professor_identification(professor), week=week, weekday=weekday) \
+        .order_by('start_minute') \
+        .values_list('start_minute', 'end_minute', 'subject_name', 'classroom', 'professor') \
+        .distinct()
+    return [_create_lesson_couple_dict(*lesson) for lesson in lessons]
+
+
+def index_schedule_lessons(schedule):
+    try:
+        document = load_schedule_document(schedule)
+    except Exception:
+        # the lessons indexed from the last readable file are kept
+        logger.exception("schedule index: %s could not be read", schedule.schedule_file.name)
+        return set()
+
+    lessons = [
+        Lesson(schedule=schedule, course_group_id=schedule.course_group_id, **lesson)
+        for lesson in get_document_lessons(document, schedule.schedule_file.name)
+    ]
+
+    with transaction.atomic():
+        professors = get_schedule_professors(schedule)
+        Lesson.objects.filter(schedule=schedule).delete()
+        Lesson.objects.bulk_create(lessons)
+
+    return professors | {lesson.professor for lesson in lessons}
+
+
+def get_document_lessons(document, name=''):
+    lessons = []
+    for week, week_name in WEEKS.items():
+        for weekday, day in enumerate(WEEKDAYS):
+            for position, couple in enumerate(document.get(week_name, {}).get(day, [])):
+                if len(couple) == 0:
+                    continue
+                try:
+                    start_minute = parse_minutes(couple['timeFrom'])
+                    end_minute = parse_minutes(couple['timeTo'])
+                except (KeyError, ValueError) as e:
+                    logger.warning("schedule index: %s: %s %s %s: %r", name, week_name, day, position, e)
+                    continue
+                lessons.append({
+                    'week': week,
+                    'weekday': weekday,
+                    'position': position,
+                    'start_minute': start_minute,
+                    'end_minute': end_minute,
+                    'subject_name': couple.get('subjectName', ''),
+                    'classroom': couple.get('classroom', ''),
+                    'professor': normalize_professor_name(couple.get('professor', ''))
+                })
+    return lessons
+
+
+def get_schedule_professors(schedule):
+    return set(Lesson.objects.filter(schedule=schedule).values_list('professor', flat=True).distinct())
+
+
+@contextmanager
+def bulk_schedule_update():
+    _bulk_update.active = True
+    _bulk_update.professors = set()
+    try:
+        yield
+    finally:
+        _bulk_update.active = False
+    update_professor_index(_bulk_update.professors)
+
+
+def refresh_professor_index(professors):
+    if getattr(_bulk_update, 'active', False):
+        _bulk_update.professors |= professors
+        return
+    update_professor_index(professors)
+
 
-    schedule_dict = _create_empty_schedule_dict()
+def rebuild_professor_index():
+    professors = set(Lesson.objects.values_list('professor', flat=True).distinct())
+    professors |= set(ProfessorSchedule.objects.values_list('identification', flat=True))
+    update_professor_index(professors)
 
-    for file in os.listdir(ROOT_PATH):
-        filename = os.fsdecode(file)
-        if filename.endswith(".json"):
-            current_schedule = json.load(open(ROOT_PATH + '/' + filename, encoding='utf-8', mode="r", ))
-        else:
-            continue
 
-        for week in current_schedule.keys():
-            for day, v in current_schedule[week].items():
-                for couple in v:
-                    if len(couple) != 0 and couple['professor'] == identification \
-                            and _check_uniq_couple(schedule_dict[week][day], couple):
-                        schedule_dict[week][day].append(_create_couple_dict(
-                            couple['timeFrom'],
-                            couple['timeTo'],
-                            couple['subjectName'],
-                            couple['classroom'],
-                            couple['professor']
-                        ))
-                _sort_couples(schedule_dict[week][day])
+def update_professor_index(professors):
+    professors = professors - {''}
+    if not professors:
+        return
 
-            continue
-        else:
-            continue
+    lessons = Lesson.objects.filter(professor__in=professors) \
+        .values_list('week', 'weekday', 'start_minute', 'end_minute', 'subject_name', 'classroom', 'professor')
+    schedules = aggregate_professor_schedules(lessons)
 
-    # with open(ROOT_PATH + '/out.json', encoding='utf-8', mode="w", ) as uu:
-    #     json.dump(schedule_dict, uu)
+    with transaction.atomic():
+        existing = {
+            index.identification: index
+            for index in ProfessorSchedule.objects.select_for_update().filter(identification__in=professors)
+        }
+
+        created = []
+        updated = []
+        for identification in professors:
+            schedule_dict = schedules.get(identification)
+            index = existing.get(identification)
+            if index is None:
+                if schedule_dict is not None:
+                    created.append(ProfessorSchedule(identification=identification, schedule=schedule_dict,
+                                                     checksum=_get_schedule_dict_checksum(schedule_dict)))
+                continue
+
+            schedule_dict = schedule_dict or _create_empty_schedule_dict()
+            checksum = _get_schedule_dict_checksum(schedule_dict)
+            if index.checksum != checksum:
+                index.schedule = schedule_dict
+                index.checksum = checksum
+                index.version += 1
+                updated.append(index)
+
+        ProfessorSchedule.objects.bulk_create(created)
+        ProfessorSchedule.objects.bulk_update(updated, ['schedule', 'checksum', 'version'])
+
+
+def get_schedule_owner(user, user_role):
+    # professor identification or course group, schedules of different owners never share an etag
+    if user_role == 'professor':
+        return get_professor_identification(user)
+    if user_role == 'student':
+        return user.course_group_id
+    return None
+
+
+def get_user_schedule_etag(user, user_role, *params):
+    owner = get_schedule_owner(user, user_role)
+    version = None
+    if user_role == 'professor':
+        version = ProfessorSchedule.objects.filter(identification=owner).values_list('version', flat=True).first()
+    if user_role == 'student':
+        version = Schedule.objects.filter(course_group_id=owner).values_list('checksum', flat=True).first()
 
-    return schedule_dict
+    if not version:
+        return None
+    key = ':'.join(str(param) for param in (user_role, owner, version) + params)
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
 
 
-def _sort_couples(couples: list):
-    couples.sort(key=lambda couple: datetime.datetime.strptime(couple['timeFrom'], '%H:%M'))
+def aggregate_professor_schedules(lessons):
+    unique_lessons = set(lessons)
+
+    professors = {}
+    for week, weekday, start_minute, end_minute, subject_name, classroom, professor in sorted(unique_lessons):
+        schedule_dict = professors.get(professor)
+        if schedule_dict is None:
+            schedule_dict = professors[professor] = _create_empty_schedule_dict()
+        schedule_dict[WEEKS[week]][WEEKDAYS[weekday]].append(
+            _create_lesson_couple_dict(start_minute, end_minute, subject_name, classroom, professor))
+    return professors
+
+
+def parse_minutes(time: str):
+    hours, minutes = time.split(':')
+    return int(hours) * 60 + int(minutes)
+
+
+def format_minutes(minutes: int):
+    return f'{minutes // 60:02d}:{minutes % 60:02d}'
 
 
 def _create_empty_schedule_dict():
@@ -142,14 +377,14 @@ def _create_couple_dict(time_from, time_to, subject_name, classroom, professor):
     }
 
 
-def _check_uniq_couple(day: list, couple):
-    for curr_couple in day:
-        if curr_couple['timeFrom'] == couple['timeFrom'] \
-                and curr_couple['timeTo'] == couple['timeTo'] \
-                and curr_couple['subjectName'] == couple['subjectName'] \
-                and curr_couple['classroom'] == couple['classroom']:
-            return False
-    return True
+def _create_lesson_couple_dict(start_minute, end_minute, subject_name, classroom, professor):
+    return _create_couple_dict(format_minutes(start_minute), format_minutes(end_minute), subject_name, classroom,
+                               professor)
+
+
+def _get_schedule_dict_checksum(schedule_dict):
+    return hashlib.sha256(json.dumps(schedule_dict, sort_keys=True).encode('utf-8')).hexdigest()
+
 
 # if __name__ == "__main__":
 #     file = get_professor_schedule()
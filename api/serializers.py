@@ -1,10 +1,11 @@
 import os
 
+from django.conf import settings
 from djoser.serializers import UserCreateSerializer
 from rest_framework import serializers
 from rest_framework.serializers import ModelSerializer
 
-from api.models import User, Student, Schedule, Publication, Event
+from api.models import User, Student, Schedule, Publication, Event, get_recurrence_errors
 from api.models import Professor, Map
 from api.models import CourseGroup
 from rest_framework.exceptions import ParseError
@@ -35,9 +36,21 @@ class EventSerializer(ModelSerializer):
             "event_start_datetime",
             "event_end_datetime",
             "is_full_day",
-            "e_type"
+            "e_type",
+            "recurrence",
+            "recurrence_exceptions",
+            "recurrence_parent",
+            "recurrence_date"
         )
 
+    def validate(self, attrs):
+        values = {name: attrs[name] if name in attrs else getattr(self.instance, name, None)
+                  for name in ('recurrence', 'recurrence_parent', 'recurrence_date')}
+        errors = get_recurrence_errors(**values)
+        if errors:
+            raise serializers.ValidationError(errors)
+        return attrs
+
 
 class CourseGroupSerializer(ModelSerializer):
     class Meta:
@@ -101,9 +114,29 @@ class SimpleUserSerializer(serializers.ModelSerializer):
 #         return publication
 
 class PublicationSerializer(ModelSerializer):
+    image = serializers.SerializerMethodField()
+    image_srcset = serializers.SerializerMethodField()
+
     class Meta:
         model = Publication
-        fields = '__all__'
+        exclude = ('image_variants',)
+
+    def get_image(self, publication):
+        # the largest local JPEG, VK links expire
+        variants = [variant for variant in publication.image_variants if variant['type'] == 'image/jpeg']
+        if not variants:
+            return publication.image
+        return self.get_media_url(max(variants, key=lambda variant: variant['width'])['path'])
+
+    def get_image_srcset(self, publication):
+        return [{'url': self.get_media_url(variant['path']), 'width': variant['width'],
+                 'height': variant['height'], 'type': variant['type']}
+                for variant in publication.image_variants]
+
+    def get_media_url(self, path):
+        url = f'{settings.MEDIA_URL}{path}'
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request is not None else url
 
 
 class MyUserCreateSerializer(UserCreateSerializer):
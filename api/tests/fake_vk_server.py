@@ -0,0 +1,69 @@
+import asyncio
+import threading
+
+from aiohttp import web
+
+
+class FakeVkServer:
+    # Local stand-in for the wall.get method of the VK API and its photo CDN. walls maps a domain or owner id
+    # to its posts, newest first, failures maps it to the responses returned before the real ones, files maps
+    # a name to the content served at /files/<name>.
+    def __init__(self):
+        self.walls = {}
+        self.files = {}
+        self.failures = {}
+        self.requests = []
+        self.url = None
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._start(), self._loop).result()
+        return self
+
+    def stop(self):
+        self._loop.call_soon_threadsafe(self._stopping.set)
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+    async def _start(self):
+        self._stopping = asyncio.Event()
+        app = web.Application()
+        app.router.add_get('/method/wall.get', self.wall_get)
+        app.router.add_get('/files/{name}', self.get_file)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, '127.0.0.1', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f'http://127.0.0.1:{port}/method/'
+        self.files_url = f'http://127.0.0.1:{port}/files/'
+
+    async def wall_get(self, request):
+        source = request.query.get('domain') or request.query.get('owner_id')
+        offset = int(request.query.get('offset', 0))
+        count = int(request.query.get('count', 20))
+        self.requests.append((source, offset, count))
+
+        failures = self.failures.get(source)
+        if failures:
+            failure = failures.pop(0)
+            if failure == 'timeout':
+                # holds the request past the client timeout, until the server stops
+                await self._stopping.wait()
+            if isinstance(failure, int):
+                return web.Response(status=failure)
+            return web.json_response({'error': failure})
+
+        if source not in self.walls:
+            return web.json_response({'error': {'error_code': 100, 'error_msg': 'domain not found'}})
+        posts = self.walls[source]
+        return web.json_response({'response': {'count': len(posts), 'items': posts[offset:offset + count]}})
+
+    async def get_file(self, request):
+        self.requests.append(('files', request.match_info['name'], 0))
+        if request.match_info['name'] not in self.files:
+            return web.Response(status=404)
+        return web.Response(body=self.files[request.match_info['name']])
@@ -0,0 +1,6 @@
+def make_post(post_id, date, text='Новости факультета компьютерных наук', owner_id=-1):
+    # a VK wall post with a photo, its largest size is https://vk.com/<post_id>.jpg
+    return {'id': post_id, 'owner_id': owner_id, 'date': date, 'text': text, 'attachments': [
+        {'type': 'photo', 'photo': {'sizes': [{'type': 'm', 'url': 'https://vk.com/m.jpg'},
+                                              {'type': 'w', 'url': f'https://vk.com/{post_id}.jpg'}]}}
+    ]}
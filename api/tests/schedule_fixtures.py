@@ -0,0 +1,70 @@
+import json
+import shutil
+import tempfile
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+from api.models import Schedule, CourseGroup, User, Student
+from api.schedule_utilities import schedule_cache
+
+# test classes that upload schedules override MEDIA_ROOT with this directory
+MEDIA_ROOT = tempfile.mkdtemp()
+
+WEEKS = ('numerator', 'denominator')
+DAYS = ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday')
+
+
+def create_lesson(time_from='09:45', time_to='11:20', subject_name='Дискретная математика', classroom='292',
+                  professor='Зенин К.В.'):
+    return {
+        'timeFrom': time_from,
+        'timeTo': time_to,
+        'subjectName': subject_name,
+        'classroom': classroom,
+        'professor': professor
+    }
+
+
+def create_document(lessons=()):
+    # lessons are (week, day, lesson) triples
+    document = {week: {day: [] for day in DAYS} for week in WEEKS}
+    for week, day, lesson in lessons:
+        document[week][day].append(lesson)
+    return document
+
+
+def dump_document(document):
+    return json.dumps(document).encode('utf-8')
+
+
+def create_schedule_file(lessons=(), name='schedule.json'):
+    return SimpleUploadedFile(name, dump_document(create_document(lessons)), content_type='application/json')
+
+
+class TemporaryMediaRootMixin:
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+
+class StudentScheduleMixin(TemporaryMediaRootMixin):
+    # a student of a group that has one lesson on numerator Mondays, the client is logged in as the student
+    def setUp(self):
+        schedule_cache.clear()
+        self.course_group = CourseGroup.objects.create(course_number=3, group_number='5', higher_education_level='b')
+        self.schedule = Schedule.objects.create(course_group=self.course_group, schedule_file=create_schedule_file(
+            [('numerator', 'monday', create_lesson(subject_name='Теория графов'))]))
+        self.student = User.objects.create_user(username='andrew', email='maloy@gmail.com',
+                                                password='pla232piSR', first_name='Андрей',
+                                                second_name='Иванков', patronymic='Валерьевич', is_staff=True)
+        Student.objects.create(year_of_enrollment='2021', record_book_number='16290710',
+                               course_group=self.course_group, user=self.student)
+        response = self.client.post('/api/auth/jwt/create/', {'username': 'andrew', 'password': 'pla232piSR'},
+                                    format='json')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {response.data["access"]}')
+
+    def replace_schedule(self, subject_name):
+        self.schedule.schedule_file = create_schedule_file(
+            [('numerator', 'monday', create_lesson(subject_name=subject_name))])
+        self.schedule.save()
@@ -0,0 +1,54 @@
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+
+from api.models import Schedule, CourseGroup, User
+from api.schedule_indexes import classroom_index
+from schedule_fixtures import MEDIA_ROOT, TemporaryMediaRootMixin, create_lesson, create_schedule_file
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, SCHEDULE_INDEX_REFRESH_SECONDS=0)
+class FreeClassroomsApiTest(TemporaryMediaRootMixin, APITestCase):
+    def setUp(self):
+        classroom_index.clear()
+        self.client = APIClient()
+        User.objects.create_user(username='stepkin', email='stepkin@gmail.com', password='kd203sdlA')
+        response = self.client.post('/api/auth/jwt/create/', {'username': 'stepkin', 'password': 'kd203sdlA'},
+                                    format='json')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {response.data["access"]}')
+
+        group_1 = CourseGroup.objects.create(course_number=3, group_number='5', higher_education_level='b')
+        group_2 = CourseGroup.objects.create(course_number=3, group_number='6', higher_education_level='b')
+        self.schedule = Schedule.objects.create(course_group=group_1, schedule_file=create_schedule_file([
+            ('numerator', 'monday', create_lesson()),
+            ('numerator', 'monday', create_lesson('11:30', '13:05', classroom='380')),
+            ('denominator', 'monday', create_lesson(classroom='380')),
+        ]))
+        Schedule.objects.create(course_group=group_2, schedule_file=create_schedule_file([
+            ('numerator', 'monday', create_lesson('13:25', '15:00')),
+            ('numerator', 'tuesday', create_lesson('08:00', '09:35', classroom='314')),
+        ]))
+
+    def get_free_classrooms(self, query):
+        response = self.client.get(f'/api/classrooms/free?{query}')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data['classrooms']
+
+    def test_free_classrooms(self):
+        self.assertEqual(self.get_free_classrooms('date=11-09-2023&time=10:00&duration=30'), ['314', '380'])
+        self.assertEqual(self.get_free_classrooms('date=11-09-2023&time=11:20&duration=10'), ['292', '314', '380'])
+        self.assertEqual(self.get_free_classrooms('date=11-09-2023&time=11:00&duration=150'), ['314'])
+        self.assertEqual(self.get_free_classrooms('date=04-09-2023&time=10:00'), ['292', '314'])
+        self.assertEqual(self.get_free_classrooms('date=10-09-2023&time=10:00'), ['292', '314', '380'])
+
+    def test_index_updated_on_schedule_change(self):
+        self.assertEqual(self.get_free_classrooms('date=11-09-2023&time=10:00&duration=30'), ['314', '380'])
+        self.schedule.schedule_file = create_schedule_file([('numerator', 'monday', create_lesson(classroom='314'))])
+        self.schedule.save()
+        self.assertEqual(self.get_free_classrooms('date=11-09-2023&time=10:00&duration=30'), ['292'])
+
+    def test_invalid_parameters(self):
+        response = self.client.get('/api/classrooms/free?date=2023-09-11')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get('/api/classrooms/free?time=10:00&duration=0')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
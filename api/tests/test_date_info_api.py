@@ -0,0 +1,39 @@
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+
+from api.models import User
+
+
+class DateInfoApiTest(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        User.objects.create_user(username='stepkin', email='stepkin@gmail.com', password='kd203sdlA')
+        response = self.client.post('/api/auth/jwt/create/', {'username': 'stepkin', 'password': 'kd203sdlA'},
+                                    format='json')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {response.data["access"]}')
+
+    def test_get_date_info(self):
+        response = self.client.get('/api/dateInfo?date=11-09-2023')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'week': 'Числитель', 'weekday': 'Понедельник'})
+
+        response = self.client.get('/api/dateInfo?date=17-09-2023')
+        self.assertEqual(response.data, {'week': 'Числитель', 'weekday': 'Воскресенье'})
+
+    def test_get_date_range_info(self):
+        response = self.client.get('/api/dateInfo/range?from=03-11-2023&to=06-11-2023')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(list(response.data), ['03-11-2023', '04-11-2023', '05-11-2023', '06-11-2023'])
+        self.assertEqual(response.data['03-11-2023'], {'week': 'Знаменатель', 'weekday': 'Пятница',
+                                                       'semester': '2023-autumn', 'holiday': False})
+        self.assertTrue(response.data['04-11-2023']['holiday'])
+        self.assertEqual(response.data['06-11-2023']['week'], 'Числитель')
+
+        response = self.client.get('/api/dateInfo/range?from=01-07-2023&to=01-07-2023')
+        self.assertIsNone(response.data['01-07-2023']['semester'])
+
+    def test_get_date_range_info_limits(self):
+        response = self.client.get('/api/dateInfo/range?from=06-11-2023&to=03-11-2023')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get('/api/dateInfo/range?from=01-01-2023&to=01-01-2025')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
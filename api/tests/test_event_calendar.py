@@ -0,0 +1,82 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+
+from api.models import User, Student, Event, CourseGroup
+
+
+class EventCalendarTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        group_1 = CourseGroup.objects.create(course_number=3, group_number='5', higher_education_level='b')
+        group_2 = CourseGroup.objects.create(course_number=3, group_number='6', higher_education_level='b')
+
+        Event.objects.create(title='Сессия', e_type='e', event_start_datetime='2023-12-28T09:00:00+03:00',
+                             event_end_datetime='2024-01-02T18:00:00+03:00')
+        Event.objects.create(title='Аттестация', e_type='a', event_start_datetime='2023-12-05T13:00:00+03:00',
+                             event_end_datetime='2023-12-05T14:00:00+03:00').course_groups.add(group_1)
+        Event.objects.create(title='Экзамен', e_type='e', event_start_datetime='2023-12-05T09:00:00+03:00',
+                             event_end_datetime='2023-12-05T12:00:00+03:00').course_groups.add(group_2)
+        Event.objects.create(title='Новый год', e_type='h', event_start_datetime='2023-12-31T23:00:00+03:00',
+                             event_end_datetime='2024-01-01T01:00:00+03:00')
+        Event.objects.create(title='День программиста', e_type='i', event_start_datetime='2023-09-13T00:00:00+03:00',
+                             event_end_datetime='2023-09-13T23:59:00+03:00')
+
+        user = User.objects.create_user(username='stepkin', email='stepkin@gmail.com', password='kd203sdlA')
+        Student.objects.create(year_of_enrollment='2021', record_book_number='16290710',
+                               course_group=group_1, user=user)
+        response = self.client.post('/api/auth/jwt/create/', {'username': 'stepkin', 'password': 'kd203sdlA'},
+                                    format='json')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {response.data["access"]}')
+
+    def get_titles(self, query):
+        response = self.client.get(f'/api/event/?{query}')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [event['title'] for event in response.data]
+
+    def test_range_filter(self):
+        self.assertEqual(self.get_titles('from=01-12-2023&to=31-12-2023'), ['Аттестация', 'Сессия', 'Новый год'])
+        self.assertEqual(self.get_titles('from=01-01-2024&to=01-01-2024'), ['Сессия', 'Новый год'])
+        self.assertEqual(self.get_titles('from=03-01-2024'), [])
+        self.assertEqual(self.get_titles('to=13-09-2023'), ['День программиста'])
+
+    def test_type_filter(self):
+        self.assertEqual(self.get_titles('e_type=e,h'), ['Сессия', 'Новый год'])
+        self.assertEqual(self.get_titles('e_type=a&from=06-12-2023'), [])
+
+    def test_range_filter_for_superuser(self):
+        User.objects.create_superuser(username='admin', email='admin@gmail.com', password='kd203sdlA')
+        response = self.client.post('/api/auth/jwt/create/', {'username': 'admin', 'password': 'kd203sdlA'},
+                                    format='json')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {response.data["access"]}')
+
+        self.assertEqual(sorted(self.get_titles('from=05-12-2023&to=05-12-2023&e_type=a,e')),
+                         ['Аттестация', 'Экзамен'])
+
+    def test_month_counts(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/event/month/?month=12-2023')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(sum('GROUP BY' in query['sql'] for query in queries.captured_queries), 1)
+
+        days = response.data['days']
+        self.assertEqual(len(days), 31)
+        self.assertEqual(days['05-12-2023'], 1)
+        self.assertEqual(days['28-12-2023'], 1)
+        self.assertEqual(days['31-12-2023'], 2)
+        self.assertEqual(days['01-12-2023'], 0)
+
+        response = self.client.get('/api/event/month/?month=01-2024&e_type=h')
+        self.assertEqual(response.data['days']['01-01-2024'], 1)
+        self.assertEqual(response.data['days']['02-01-2024'], 0)
+
+    def test_bad_filters(self):
+        self.assertEqual(self.client.get('/api/event/?from=2023-12-01').status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get('/api/event/?from=02-12-2023&to=01-12-2023').status_code,
+                         status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get('/api/event/?e_type=x').status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get('/api/event/month/?month=13-2023').status_code,
+                         status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,63 @@
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+
+from api.event_feed import get_event_feed
+from api.models import User, Student, Event, CourseGroup
+
+
+class EventFeedTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.group_1 = CourseGroup.objects.create(course_number=3, group_number='5', higher_education_level='b')
+        self.group_2 = CourseGroup.objects.create(course_number=3, group_number='6', higher_education_level='b')
+
+        self.public_event = Event.objects.create(title='День программиста', e_type='i',
+                                                 event_start_datetime='2023-09-23T12:00:00+03:00',
+                                                 event_end_datetime='2023-09-23T15:00:00+03:00')
+        self.group_event = Event.objects.create(title='Аттестация №3 по ИСиС', e_type='a',
+                                                event_start_datetime='2023-06-03T13:00:00+03:00',
+                                                event_end_datetime='2023-06-03T13:10:00+03:00')
+        self.group_event.course_groups.add(self.group_1, self.group_2)
+        self.other_event = Event.objects.create(title='Экзамен', e_type='e',
+                                                event_start_datetime='2023-06-10T09:00:00+03:00',
+                                                event_end_datetime='2023-06-10T12:00:00+03:00')
+        self.other_event.course_groups.add(self.group_2)
+
+        user = User.objects.create_user(username='stepkin', email='stepkin@gmail.com', password='kd203sdlA')
+        Student.objects.create(year_of_enrollment='2021', record_book_number='16290710',
+                               course_group=self.group_1, user=user)
+        response = self.client.post('/api/auth/jwt/create/', {'username': 'stepkin', 'password': 'kd203sdlA'},
+                                    format='json')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {response.data["access"]}')
+
+    def get_titles(self, client=None):
+        response = (client or self.client).get('/api/event/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [event['title'] for event in response.data]
+
+    def test_group_feed(self):
+        self.assertEqual(self.get_titles(), ['Аттестация №3 по ИСиС', 'День программиста'])
+        self.assertEqual(self.get_titles(APIClient()), ['День программиста'])
+
+    def test_feed_served_from_cache(self):
+        get_event_feed(self.group_1.pk)
+
+        with self.assertNumQueries(0):
+            feed = get_event_feed(self.group_1.pk)
+        self.assertEqual([item.data['id'] for item in feed], [self.group_event.pk, self.public_event.pk])
+
+    def test_feed_invalidated_on_change(self):
+        self.get_titles()
+
+        self.other_event.course_groups.add(self.group_1)
+        self.assertEqual(self.get_titles(), ['Аттестация №3 по ИСиС', 'Экзамен', 'День программиста'])
+
+        self.group_event.course_groups.clear()
+        self.group_event.title = 'Аттестация №4 по ИСиС'
+        self.group_event.save()
+        self.assertEqual(self.get_titles(APIClient()), ['Аттестация №4 по ИСиС', 'День программиста'])
+
+        self.public_event.delete()
+        self.assertEqual(self.get_titles(), ['Аттестация №4 по ИСиС', 'Экзамен'])
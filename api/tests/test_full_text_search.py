@@ -0,0 +1,104 @@
+from unittest import skipUnless
+
+from django.db import connection
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+
+from api.full_text_search import TABLE, rebuild_search_index
+from api.models import User, Student, Event, Publication, CourseGroup
+
+
+class FullTextSearchTest(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.career_day = Publication.objects.create(
+            title='День карьеры на ФКН!',
+            body_text='29 апреля Факультет компьютерных наук приглашает студентов IT-специальностей на день карьеры.',
+            publication_datetime='2022-04-20 10:00:00 +00:00')
+        self.programmers_day = Publication.objects.create(
+            title='День программиста', body_text='В России 23 сентября отмечается праздник программистов.',
+            publication_datetime='2023-09-13 00:00:00 +00:00')
+        self.open_day = Event.objects.create(title='День открытых дверей',
+                                             description='Встреча с программистами и студентами факультета',
+                                             e_type='i', event_start_datetime='2023-03-02T12:00:00+03:00',
+                                             event_end_datetime='2023-03-02T15:00:00+03:00')
+        group_1 = CourseGroup.objects.create(course_number=3, group_number='5', higher_education_level='b')
+        self.group_2 = group_2 = CourseGroup.objects.create(course_number=3, group_number='6',
+                                                            higher_education_level='b')
+        self.exam = Event.objects.create(title='Экзамен по программированию', e_type='e',
+                                         event_start_datetime='2023-06-10T09:00:00+03:00',
+                                         event_end_datetime='2023-06-10T12:00:00+03:00')
+        self.exam.course_groups.add(group_2)
+
+        user = User.objects.create_user(username='stepkin', email='stepkin@gmail.com', password='kd203sdlA')
+        Student.objects.create(year_of_enrollment='2021', record_book_number='16290710',
+                               course_group=group_1, user=user)
+
+    def search(self, params, client=None):
+        response = (client or self.client).get('/api/search/', params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_ranked_and_highlighted(self):
+        results = self.search({'q': 'программисты'})['results']
+        self.assertEqual([(result['type'], result['id']) for result in results],
+                         [('publication', self.programmers_day.pk), ('event', self.open_day.pk)])
+        self.assertEqual(results[0]['title'], 'День <b>программиста</b>')
+        self.assertIn('<b>программистами</b>', results[1]['snippet'])
+        self.assertEqual(results[0]['object']['title'], 'День программиста')
+
+    def test_hidden_events_not_returned(self):
+        self.assertEqual([result['type'] for result in self.search({'q': 'программ', 'type': 'event'})['results']],
+                         ['event'])
+
+        User.objects.create_superuser(username='admin', email='admin@gmail.com', password='kd203sdlA')
+        client = APIClient()
+        client.force_authenticate(User.objects.get(username='admin'))
+        self.assertEqual(len(self.search({'q': 'программ', 'type': 'event'}, client)['results']), 2)
+
+        user = User.objects.create_user(username='ivanov', email='ivanov@gmail.com', password='kd203sdlA')
+        Student.objects.create(year_of_enrollment='2021', record_book_number='16290711',
+                               course_group=self.group_2, user=user)
+        client.force_authenticate(user)
+        self.assertEqual(len(self.search({'q': 'программ', 'type': 'event'}, client)['results']), 2)
+
+    def test_cursor_pagination(self):
+        first = self.search({'q': 'день', 'page_size': 2})
+        self.assertEqual(len(first['results']), 2)
+        second = self.client.get(first['next']).data
+        self.assertIsNone(second['next'])
+        ids = [(result['type'], result['id']) for result in first['results'] + second['results']]
+        self.assertEqual(sorted(ids), sorted([('publication', self.career_day.pk),
+                                              ('publication', self.programmers_day.pk),
+                                              ('event', self.open_day.pk)]))
+
+    def test_index_follows_changes(self):
+        self.programmers_day.title = 'Праздник'
+        self.programmers_day.body_text = 'Праздник'
+        self.programmers_day.save()
+        self.career_day.delete()
+        self.assertEqual([result['id'] for result in self.search({'q': 'день', 'type': 'publication'})['results']], [])
+
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {TABLE}')
+        rebuild_search_index()
+        self.assertEqual(len(self.search({'q': 'праздник'})['results']), 1)
+
+    def test_bad_requests(self):
+        self.assertEqual(self.client.get('/api/search/', {'q': ''}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get('/api/search/', {'q': 'день', 'type': 'map'}).status_code,
+                         status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get('/api/search/', {'q': 'день', 'cursor': 'abc'}).status_code,
+                         status.HTTP_404_NOT_FOUND)
+
+    @skipUnless(connection.vendor == 'postgresql', 'the PostgreSQL backend only')
+    def test_postgresql_table(self):
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT indexdef FROM pg_indexes WHERE tablename = %s AND indexname = %s',
+                           [TABLE, f'{TABLE}_document'])
+            self.assertIn('USING gin (document)', cursor.fetchone()[0])
+        # websearch syntax and Russian stemming
+        results = self.search({'q': 'праздников -России', 'type': 'publication'})['results']
+        self.assertEqual(results, [])
+        results = self.search({'q': 'праздников', 'type': 'publication'})['results']
+        self.assertEqual([result['id'] for result in results], [self.programmers_day.pk])
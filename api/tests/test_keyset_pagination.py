@@ -0,0 +1,72 @@
+import datetime
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+
+from api.models import User, Event, Publication
+
+
+class KeysetPaginationTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        start = timezone.make_aware(datetime.datetime(2023, 9, 1, 12, 0))
+        for day in (0, 1, 1, 1, 2):
+            Publication.objects.create(title=f'Новость {day}', publication_datetime=start + datetime.timedelta(days=day))
+            Event.objects.create(title=f'Событие {day}', e_type='i',
+                                 event_start_datetime=start + datetime.timedelta(days=day),
+                                 event_end_datetime=start + datetime.timedelta(days=day, hours=1))
+
+    def get_all_pages(self, url):
+        ids = []
+        while url is not None:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(response.data['results']), 2)
+            ids += [item['id'] for item in response.data['results']]
+            url = response.data['next']
+        return ids
+
+    def test_publication_pages(self):
+        expected = list(Publication.objects.order_by('-publication_datetime', '-id').values_list('id', flat=True))
+
+        self.assertEqual(self.get_all_pages('/api/publication/?page_size=2'), expected)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/publication/?page_size=2')
+        self.assertEqual(set(response.data), {'next', 'results'})
+        self.assertFalse(any('COUNT' in query['sql'] for query in queries.captured_queries))
+
+    def test_event_pages(self):
+        expected = list(Event.objects.order_by('event_start_datetime', 'id').values_list('id', flat=True))
+
+        self.assertEqual(self.get_all_pages('/api/event/?page_size=2'), expected)
+
+        User.objects.create_superuser(username='admin', email='admin@gmail.com', password='kd203sdlA')
+        response = self.client.post('/api/auth/jwt/create/', {'username': 'admin', 'password': 'kd203sdlA'},
+                                    format='json')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {response.data["access"]}')
+        self.assertEqual(self.get_all_pages('/api/event/?page_size=2'), expected)
+
+    def test_offset_mode_and_whole_list(self):
+        response = self.client.get('/api/publication/?limit=2&offset=2')
+        self.assertEqual(response.data['count'], 5)
+        self.assertEqual(len(response.data['results']), 2)
+
+        response = self.client.get('/api/event/')
+        self.assertEqual(len(response.data), 5)
+
+    def test_invalid_cursor(self):
+        response = self.client.get('/api/publication/?cursor=bad')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_invalid_page_size(self):
+        for page_size in ('0', '-2', 'two'):
+            response = self.client.get(f'/api/publication/?page_size={page_size}')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(len(response.data['results']), 5)
+            self.assertIsNone(response.data['next'])
@@ -0,0 +1,102 @@
+from unittest import mock
+
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from api.models import Publication
+from api.news_parser import get_news, save_posts
+from fake_vk_server import FakeVkServer
+from news_fixtures import make_post
+
+
+@mock.patch('api.news_parser.mirror_images', lambda urls: {})
+class NewsParserTest(APITestCase):
+    def test_posts_created_in_one_insert(self):
+        posts = [make_post(3, 1695459600), make_post(2, 1695459600), make_post(1, 1695456000, text='')]
+        with CaptureQueriesContext(connection) as queries:
+            counts = save_posts(posts)
+        self.assertEqual(counts, {'created': 2, 'stored': 0, 'empty': 1, 'failed': 0})
+        self.assertEqual(sum(query['sql'].startswith('INSERT') for query in queries.captured_queries), 1)
+
+        publication = Publication.objects.get(vk_post_id=3)
+        self.assertEqual(publication.title, 'Новости факультета компьютерных наук')
+        self.assertEqual(publication.image, 'https://vk.com/3.jpg')
+        self.assertEqual(publication.publication_datetime.timestamp(), 1695459600)
+
+    def test_runs_are_idempotent(self):
+        save_posts([make_post(1, 1695456000), make_post(2, 1695459600)])
+        counts = save_posts([make_post(1, 1695456000), make_post(2, 1695459600), make_post(3, 1695459600)])
+        self.assertEqual(counts, {'created': 1, 'stored': 2, 'empty': 0, 'failed': 0})
+        self.assertEqual(sorted(Publication.objects.values_list('vk_post_id', flat=True)), [1, 2, 3])
+
+    def test_legacy_publications_not_duplicated(self):
+        Publication.objects.create(title='Новости', body_text='Новости',
+                                   publication_datetime='2023-09-23T12:00:00+03:00')
+        counts = save_posts([make_post(1, 1695459600), make_post(2, 1695459601)])
+        self.assertEqual(counts['stored'], 1)
+        self.assertEqual(Publication.objects.count(), 2)
+
+    def test_broken_post_skipped(self):
+        with self.assertLogs('api.news_parser', 'ERROR'):
+            counts = save_posts([make_post(1, 1695459600), {'id': 2, 'owner_id': -1, 'date': 1695459601}])
+        self.assertEqual(counts, {'created': 1, 'stored': 0, 'empty': 0, 'failed': 1})
+
+
+
+@mock.patch('api.news_parser.mirror_images', lambda urls: {})
+@override_settings(NEWS_PAGE_SIZE=2, NEWS_FETCH_RETRIES=2, NEWS_FETCH_BACKOFF=0, NEWS_FETCH_TIMEOUT=1)
+class NewsFetcherTest(APITestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = FakeVkServer().start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.server.walls = {
+            'csfvsu': [make_post(post_id, 1695459600 + post_id) for post_id in range(7, 0, -1)],
+            '-2': [make_post(post_id, 1695459600 + post_id, owner_id=-2) for post_id in range(3, 0, -1)],
+        }
+        self.server.failures = {}
+        self.server.requests = []
+
+    def get_news(self, sources=('csfvsu', '-2')):
+        with override_settings(VK_API_URL=self.server.url, NEWS_SOURCES=list(sources)), \
+                self.assertLogs('api', 'INFO') as logs:
+            counts = get_news()
+        return counts, logs.output
+
+    def test_first_run_reads_one_page(self):
+        counts, logs = self.get_news()
+        self.assertEqual(counts['created'], 4)
+        self.assertEqual(sorted(self.server.requests), [('-2', 0, 2), ('csfvsu', 0, 2)])
+        self.assertIn('4 posts fetched', logs[-1])
+
+    def test_pages_until_high_water_mark(self):
+        save_posts([make_post(2, 1695459602)])
+        self.server.walls['csfvsu'].insert(0, dict(make_post(1, 1695459601), is_pinned=1))
+
+        counts, _ = self.get_news(['csfvsu'])
+        self.assertEqual(counts['created'], 5)
+        self.assertEqual(self.server.requests, [('csfvsu', 0, 2), ('csfvsu', 2, 2), ('csfvsu', 4, 2),
+                                                ('csfvsu', 6, 2)])
+        self.assertEqual(sorted(Publication.objects.values_list('vk_post_id', flat=True)), [2, 3, 4, 5, 6, 7])
+
+    def test_retries_transient_errors(self):
+        self.server.failures = {'csfvsu': [503, {'error_code': 6, 'error_msg': 'Too many requests per second'}],
+                                '-2': ['timeout']}
+        counts, logs = self.get_news()
+        self.assertEqual(counts['created'], 4)
+        self.assertEqual(sum('retrying' in line for line in logs), 3)
+
+    def test_failed_source_does_not_stop_others(self):
+        self.server.failures = {'-2': [{'error_code': 5, 'error_msg': 'User authorization failed'}]}
+        counts, logs = self.get_news(['csfvsu', '-2', 'missing'])
+        self.assertEqual(counts['created'], 2)
+        self.assertEqual(sum('failed' in line and 'ERROR' in line for line in logs), 2)
@@ -0,0 +1,83 @@
+import datetime
+from unittest import mock
+
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+
+from api.models import Schedule, CourseGroup, User, Student, Professor
+from api.schedule_indexes import next_lesson_index
+from schedule_fixtures import MEDIA_ROOT, TemporaryMediaRootMixin, create_lesson, create_schedule_file
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, SCHEDULE_INDEX_REFRESH_SECONDS=0)
+class NextLessonApiTest(TemporaryMediaRootMixin, APITestCase):
+    def setUp(self):
+        next_lesson_index.clear()
+        self.client = APIClient()
+        self.group_1 = CourseGroup.objects.create(course_number=3, group_number='5', higher_education_level='b')
+        self.group_2 = CourseGroup.objects.create(course_number=3, group_number='6', higher_education_level='b')
+        Schedule.objects.create(course_group=self.group_1, schedule_file=create_schedule_file([
+            ('numerator', 'monday', create_lesson('13:25', '15:00', 'Теория графов', professor='Иванов А.А.')),
+            ('numerator', 'monday', create_lesson()),
+            ('denominator', 'friday', create_lesson('08:00', '09:35', 'Физика', professor='Иванов А.А.')),
+        ]))
+        Schedule.objects.create(course_group=self.group_2, schedule_file=create_schedule_file([
+            ('numerator', 'monday', create_lesson(professor='Зенин К. В.')),
+        ]))
+
+    def login(self, username, student_group=None):
+        user = User.objects.create_user(username=username, email=f'{username}@gmail.com', password='kd203sdlA',
+                                        first_name='Кирилл', second_name='Зенин', patronymic='Вячеславович')
+        if student_group is not None:
+            Student.objects.create(year_of_enrollment='2021', record_book_number='16290710',
+                                   course_group=student_group, user=user)
+        else:
+            Professor.objects.create(department='Mathematical', user=user)
+        response = self.client.post('/api/auth/jwt/create/', {'username': username, 'password': 'kd203sdlA'},
+                                    format='json')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {response.data["access"]}')
+
+    def get_next(self, moment):
+        moment = timezone.make_aware(moment)
+        with mock.patch('django.utils.timezone.now', return_value=moment):
+            return self.client.get('/api/schedule/next/')
+
+    def test_next_lesson_of_student(self):
+        self.login('stepkin', self.group_1)
+
+        response = self.get_next(datetime.datetime(2023, 9, 11, 10, 0))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['date'], '11-09-2023')
+        self.assertEqual(response.data['week'], 'numerator')
+        self.assertEqual([lesson['subjectName'] for lesson in response.data['lessons']], ['Теория графов'])
+        self.assertEqual(response['Cache-Control'], f'private, max-age={(3 * 60 + 25) * 60}')
+
+        response = self.get_next(datetime.datetime(2023, 9, 11, 9, 45))
+        self.assertEqual(response.data['lessons'][0]['subjectName'], 'Дискретная математика')
+        self.assertEqual(response['Cache-Control'], 'private, max-age=0')
+
+    def test_next_lesson_rolls_to_next_week(self):
+        self.login('stepkin', self.group_1)
+
+        response = self.get_next(datetime.datetime(2023, 9, 11, 15, 0))
+        self.assertEqual(response.data['date'], '22-09-2023')
+        self.assertEqual(response.data['week'], 'denominator')
+        self.assertEqual(response.data['weekday'], 'friday')
+        self.assertEqual(response.data['lessons'][0]['timeFrom'], '08:00')
+
+    def test_next_lesson_of_professor(self):
+        self.login('flapson')
+
+        response = self.get_next(datetime.datetime(2023, 9, 10, 20, 0))
+        self.assertEqual(response.data['date'], '11-09-2023')
+        self.assertEqual(len(response.data['lessons']), 1)
+        self.assertEqual(sorted(response.data['lessons'][0]['courseGroups']), [self.group_1.pk, self.group_2.pk])
+
+    def test_no_next_lesson(self):
+        group = CourseGroup.objects.create(course_number=1, group_number='1', higher_education_level='b')
+        self.login('stepkin', group)
+
+        response = self.get_next(datetime.datetime(2023, 9, 11, 10, 0))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
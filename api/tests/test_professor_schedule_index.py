@@ -0,0 +1,138 @@
+import os
+
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+
+from api.models import Schedule, CourseGroup, User, Professor, ProfessorSchedule, Lesson
+from api.schedule_utilities import index_schedule_lessons, schedule_cache
+from schedule_fixtures import MEDIA_ROOT, TemporaryMediaRootMixin, create_lesson, create_schedule_file
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ProfessorScheduleIndexTest(TemporaryMediaRootMixin, APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.professor = User.objects.create_user(username='flapson', email='flapson@gmail.com',
+                                                  password='kd203sdlAsg',
+                                                  first_name='Кирилл', second_name='Зенин', patronymic='Вячеславович')
+        Professor.objects.create(department='Mathematical', user_id=self.professor.pk)
+        response = self.client.post('/api/auth/jwt/create/', {'username': 'flapson', 'password': 'kd203sdlAsg'},
+                                    format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {response.data["access"]}')
+
+        self.group_1 = CourseGroup.objects.create(course_number=3, group_number='5', higher_education_level='b')
+        self.group_2 = CourseGroup.objects.create(course_number=3, group_number='6', higher_education_level='b')
+
+        lecture = create_lesson('09:45', '11:20', 'Дискретная математика', '292', 'Зенин К. В.')
+        self.schedule_1 = Schedule.objects.create(course_group=self.group_1, schedule_file=create_schedule_file(
+            name='3_5_b.json', lessons=[
+                ('numerator', 'monday', create_lesson('13:25', '15:00', 'Теория графов', '380', 'Зенин К.В.')),
+                ('numerator', 'monday', lecture),
+                ('numerator', 'monday', {}),
+                ('denominator', 'friday', create_lesson('08:00', '09:35', 'Физика', '301', 'Иванов А.А.')),
+            ]))
+        Schedule.objects.create(course_group=self.group_2, schedule_file=create_schedule_file(
+            name='3_6_b.json', lessons=[
+                ('numerator', 'monday', lecture),
+                ('denominator', 'tuesday', create_lesson('11:30', '13:05', 'Логика', '305', 'Зенин К.В.')),
+            ]))
+
+    def test_index_built_on_save(self):
+        self.assertEqual(
+            set(ProfessorSchedule.objects.values_list('identification', flat=True)),
+            {'Зенин К.В.', 'Иванов А.А.'}
+        )
+
+    def test_get_professor_schedule_from_index(self):
+        response = self.client.get('/api/schedule/1/?week=n')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([couple['timeFrom'] for couple in response.data['monday']], ['09:45', '13:25'])
+
+        response = self.client.get('/api/schedule/1/?week=d')
+        self.assertEqual(len(response.data['tuesday']), 1)
+        self.assertEqual(response.data['friday'], [])
+
+    def test_index_rebuilt_on_delete(self):
+        self.schedule_1.delete()
+        response = self.client.get('/api/schedule/1/?week=n')
+        self.assertEqual(len(response.data['monday']), 1)
+        index = ProfessorSchedule.objects.get(identification='Иванов А.А.')
+        self.assertEqual(index.schedule['denominator']['friday'], [])
+        self.assertEqual(index.version, 2)
+
+    def test_only_affected_professors_updated(self):
+        self.schedule_1.schedule_file = create_schedule_file(name='3_5_b.json', lessons=[
+            ('numerator', 'monday', create_lesson('13:25', '15:00', 'Теория графов', '380', 'Зенин К.В.')),
+            ('denominator', 'friday', create_lesson('08:00', '09:35', 'Физика', '301', 'Иванов А.А.')),
+            ('denominator', 'saturday', create_lesson('08:00', '09:35', 'Химия', '303', 'Петров В.В.')),
+        ])
+        self.schedule_1.save()
+
+        versions = dict(ProfessorSchedule.objects.values_list('identification', 'version'))
+        self.assertEqual(versions, {'Зенин К.В.': 2, 'Иванов А.А.': 1, 'Петров В.В.': 1})
+
+        response = self.client.get('/api/schedule/1/?week=n')
+        self.assertEqual([couple['timeFrom'] for couple in response.data['monday']], ['09:45', '13:25'])
+
+    def test_lessons_indexed_on_save(self):
+        lessons = Lesson.objects.filter(schedule=self.schedule_1).order_by('week', 'weekday', 'position')
+        self.assertEqual(lessons.count(), 3)
+        self.assertEqual(lessons.filter(professor='Зенин К.В.', week='n', weekday=0).count(), 2)
+        self.assertEqual(lessons.get(position=1).start_minute, 9 * 60 + 45)
+
+    def test_lessons_kept_when_file_unreadable(self):
+        schedule_cache.clear()
+        os.remove(self.schedule_1.schedule_file.path)
+        os.remove(self.schedule_1.schedule_file.path + '.bin')
+        with self.assertLogs('api.schedule_utilities', 'ERROR'):
+            self.assertEqual(index_schedule_lessons(Schedule.objects.get(pk=self.schedule_1.pk)), set())
+        self.assertEqual(Lesson.objects.filter(schedule=self.schedule_1).count(), 3)
+
+    def test_lessons_replaced_on_file_change(self):
+        self.schedule_1.schedule_file = create_schedule_file(name='3_5_b.json', lessons=[
+            ('denominator', 'saturday', create_lesson('08:00', '09:35', 'Физика', '301', 'Иванов А.А.')),
+        ])
+        self.schedule_1.save()
+        self.assertEqual(list(Lesson.objects.filter(schedule=self.schedule_1).values_list('weekday', flat=True)), [5])
+
+    def test_get_professor_day_schedule(self):
+        response = self.client.get('/api/schedule/1/?day=11-09-2023')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([couple['subjectName'] for couple in response.data],
+                         ['Дискретная математика', 'Теория графов'])
+
+    def test_etag_covers_every_file(self):
+        etag = self.client.get('/api/schedule/1/?week=a')['ETag']
+        self.assertEqual(self.client.get('/api/schedule/1/?week=a', HTTP_IF_NONE_MATCH=etag).status_code,
+                         status.HTTP_304_NOT_MODIFIED)
+
+        group = CourseGroup.objects.create(course_number=4, group_number='1', higher_education_level='b')
+        Schedule.objects.create(course_group=group, schedule_file=create_schedule_file(name='4_1_b.json', lessons=[
+            ('numerator', 'saturday', create_lesson('08:00', '09:35', 'Алгебра', '314', 'Зенин К.В.')),
+        ]))
+        self.assertEqual(self.client.get('/api/schedule/1/?week=a', HTTP_IF_NONE_MATCH=etag).status_code,
+                         status.HTTP_200_OK)
+
+    def test_etag_differs_between_professors(self):
+        etag = self.client.get('/api/schedule/1/?week=a')['ETag']
+        calendar = self.client.get('/api/schedule/calendar/?date=11-09-2023')
+        b''.join(calendar.streaming_content)
+
+        User.objects.create_user(username='ivanov', email='ivanov@gmail.com', password='kd203sdlAsg',
+                                 first_name='Алексей', second_name='Иванов', patronymic='Андреевич')
+        Professor.objects.create(department='Physics', user=User.objects.get(username='ivanov'))
+        response = self.client.post('/api/auth/jwt/create/', {'username': 'ivanov', 'password': 'kd203sdlAsg'},
+                                    format='json')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {response.data["access"]}')
+
+        response = self.client.get('/api/schedule/1/?week=a', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+        response = self.client.get('/api/schedule/calendar/?date=11-09-2023', HTTP_IF_NONE_MATCH=calendar['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        body = b''.join(response.streaming_content).decode('utf-8')
+        self.assertIn('SUMMARY:Физика', body)
+        self.assertNotIn('Теория графов', body)
@@ -0,0 +1,98 @@
+import gzip
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.test import APITestCase, APIClient, APIRequestFactory
+
+from api.models import User, Publication
+from api.news_parser import save_posts
+from api.publication_cache import publication_cache, get_feed_version
+from news_fixtures import make_post
+
+
+class PublicationCacheTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        publication_cache.clear_stats()
+        self.client = APIClient()
+        self.publication = Publication.objects.create(title='День программиста', body_text='Праздник',
+                                                      publication_datetime='2023-09-13 00:00:00 +00:00')
+        Publication.objects.create(title='День карьеры', body_text='29 апреля',
+                                   publication_datetime='2022-04-20 10:00:00 +00:00')
+
+    def get_titles(self, query=''):
+        response = self.client.get(f'/api/publication/{query}')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [publication['title'] for publication in response.data]
+
+    def test_pages_served_from_cache(self):
+        first = self.client.get('/api/publication/?page_size=1')
+        # the feed version only
+        with self.assertNumQueries(1):
+            second = self.client.get('/api/publication/?page_size=1')
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second['Content-Type'], 'application/json')
+        self.assertEqual([publication['title'] for publication in second.data['results']], ['День программиста'])
+        self.assertEqual(publication_cache.stats()['hit_ratio'], 0.5)
+
+    def test_compressed_body(self):
+        body = self.client.get('/api/publication/').content
+        response = self.client.get('/api/publication/', HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(gzip.decompress(response.content), body)
+
+    def test_edits_bump_version(self):
+        self.get_titles()
+        self.publication.title = 'День программиста 2023'
+        self.publication.save()
+        self.assertEqual(self.get_titles(), ['День программиста 2023', 'День карьеры'])
+
+        self.publication.delete()
+        self.assertEqual(self.get_titles(), ['День карьеры'])
+
+    @mock.patch('api.management.commands.mirror_publication_images.mirror_images')
+    def test_mirrored_images_bump_version(self, mirror_images):
+        self.publication.image = 'https://sun9-1.userapi.com/photo.jpg'
+        self.publication.save()
+        version = get_feed_version()
+        mirror_images.return_value = {self.publication.image: [
+            {'path': 'publications/photo-640.jpg', 'width': 640, 'height': 480, 'type': 'image/jpeg'}]}
+        call_command('mirror_publication_images', stdout=mock.MagicMock())
+        self.assertEqual(get_feed_version(), version + 1)
+
+    @mock.patch('api.news_parser.mirror_images', lambda urls: {})
+    def test_news_bump_version(self):
+        self.get_titles()
+        save_posts([make_post(1, 1695459600, text='Новости факультета')])
+        self.assertEqual(self.get_titles()[0], 'Новости факультета')
+
+    def test_other_requests_not_cached(self):
+        self.client.get('/api/publication/?format=json')
+        self.client.get('/api/publication/?title=День')
+        self.assertEqual(publication_cache.stats()['hits'] + publication_cache.stats()['misses'], 0)
+
+    def test_hosts_cached_apart(self):
+        first = self.client.get('/api/publication/?page_size=1')
+        second = self.client.get('/api/publication/?page_size=1', HTTP_HOST='example.com')
+        self.assertIn('http://testserver/', first.data['next'])
+        self.assertIn('http://example.com/', second.data['next'])
+        self.assertEqual(publication_cache.stats()['misses'], 2)
+
+    def test_escaped_parameters_keyed_apart(self):
+        factory = APIRequestFactory()
+        joined = Request(factory.get('/api/publication/', {'cursor': 'x&limit=5'}))
+        separate = Request(factory.get('/api/publication/', {'cursor': 'x', 'limit': '5'}))
+        self.assertNotEqual(publication_cache.get_key(joined), publication_cache.get_key(separate))
+
+    def test_stats(self):
+        self.get_titles()
+        self.get_titles()
+        User.objects.create_superuser(username='admin', email='admin@gmail.com', password='kd203sdlA')
+        self.client.force_authenticate(User.objects.get(username='admin'))
+        response = self.client.get('/api/publication/cacheStats')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data['hits'], response.data['misses']), (1, 1))
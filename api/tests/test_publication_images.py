@@ -0,0 +1,88 @@
+import io
+import os
+import shutil
+import tempfile
+
+from django.core.management import call_command
+from django.test import override_settings
+from PIL import Image
+from rest_framework.test import APITestCase, APIClient
+
+from api.models import Publication
+from api.news_parser import save_posts
+from api.publication_images import store_image
+from fake_vk_server import FakeVkServer
+from news_fixtures import make_post
+
+
+def make_image(width, height, color='red'):
+    buffer = io.BytesIO()
+    Image.new('RGB', (width, height), color).save(buffer, 'JPEG')
+    return buffer.getvalue()
+
+
+class PublicationImagesTest(APITestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = FakeVkServer().start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings = override_settings(MEDIA_ROOT=self.media_root, NEWS_IMAGE_WIDTHS=[320, 640, 1280])
+        self.settings.enable()
+        self.server.files = {'big.jpg': make_image(1000, 500), 'copy.jpg': make_image(1000, 500)}
+        self.server.requests = []
+
+    def tearDown(self):
+        self.settings.disable()
+        shutil.rmtree(self.media_root)
+
+    def make_post(self, post_id, image):
+        post = make_post(post_id, 1695459600 + post_id)
+        post['attachments'][0]['photo']['sizes'][1]['url'] = f'{self.server.files_url}{image}'
+        return post
+
+    def test_variants_stored_by_content(self):
+        variants = store_image(make_image(1000, 500))
+        self.assertEqual([(variant['width'], variant['height'], variant['type']) for variant in variants], [
+            (320, 160, 'image/webp'), (320, 160, 'image/jpeg'),
+            (640, 320, 'image/webp'), (640, 320, 'image/jpeg'),
+            (1000, 500, 'image/webp'), (1000, 500, 'image/jpeg'),
+        ])
+        for variant in variants:
+            with Image.open(os.path.join(self.media_root, variant['path'])) as image:
+                self.assertEqual(image.size, (variant['width'], variant['height']))
+
+        self.assertEqual(store_image(make_image(1000, 500)), variants)
+        self.assertNotEqual(store_image(make_image(1000, 500, 'blue'))[0]['path'], variants[0]['path'])
+
+    def test_posts_mirrored_on_ingestion(self):
+        with self.assertLogs('api', 'INFO') as logs:
+            save_posts([self.make_post(1, 'big.jpg'), self.make_post(2, 'copy.jpg'),
+                        self.make_post(3, 'missing.jpg')])
+        self.assertIn('2 of 3 mirrored', logs.output[-1])
+
+        first, second, missing = Publication.objects.order_by('vk_post_id')
+        self.assertEqual(len(first.image_variants), 6)
+        self.assertEqual(first.image_variants, second.image_variants)
+        self.assertEqual(missing.image_variants, [])
+
+        publications = APIClient().get('/api/publication/').data
+        self.assertEqual(publications[0]['image'], missing.image)
+        self.assertEqual(publications[2]['image'],
+                         f"http://testserver/media/{first.image_variants[-1]['path']}")
+        self.assertEqual([(variant['width'], variant['type']) for variant in publications[2]['image_srcset']][:2],
+                         [(320, 'image/webp'), (320, 'image/jpeg')])
+
+    def test_backfill_command(self):
+        Publication.objects.create(title='Новости', image=f'{self.server.files_url}big.jpg')
+        Publication.objects.create(title='Без фото')
+        with self.assertLogs('api', 'INFO'):
+            call_command('mirror_publication_images', stdout=io.StringIO())
+        self.assertEqual(len(Publication.objects.get(title='Новости').image_variants), 6)
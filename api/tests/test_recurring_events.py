@@ -0,0 +1,123 @@
+import datetime
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+
+from api.models import User, Event
+from api.recurrence import parse_rule, expand, iter_occurrences
+
+
+def moment(value):
+    return timezone.make_aware(datetime.datetime.strptime(value, '%Y-%m-%d %H:%M'))
+
+
+class RecurrenceRuleTest(SimpleTestCase):
+    def get_starts(self, rule, start, window_start=None, window_end=None, skipped_dates=()):
+        start = moment(start)
+        occurrences = expand(start, start + datetime.timedelta(hours=1), parse_rule(rule), skipped_dates,
+                             moment(window_start) if window_start else None, moment(window_end) if window_end else None)
+        return [f'{occurrence:%Y-%m-%d %H:%M}' for occurrence, _ in occurrences]
+
+    def test_parse_rule(self):
+        self.assertEqual(parse_rule('RRULE:FREQ=WEEKLY;INTERVAL=2;BYDAY=WE,MO;UNTIL=20231231'),
+                         ('WEEKLY', 2, None, datetime.date(2023, 12, 31), (0, 2)))
+        for rule in ('', 'FREQ=YEARLY', 'FREQ=DAILY;COUNT=0', 'FREQ=DAILY;COUNT=2;UNTIL=20231231',
+                     'FREQ=DAILY;BYDAY=MO', 'FREQ=WEEKLY;BYDAY=XX', 'FREQ=WEEKLY;BYMONTH=1', 'FREQ=DAILY;UNTIL=2023'):
+            with self.assertRaises(ValueError, msg=rule):
+                parse_rule(rule)
+
+    def test_weekly_by_day(self):
+        self.assertEqual(self.get_starts('FREQ=WEEKLY;BYDAY=MO,WE;COUNT=4', '2023-09-06 10:00'),
+                         ['2023-09-06 10:00', '2023-09-11 10:00', '2023-09-13 10:00', '2023-09-18 10:00'])
+        self.assertEqual(self.get_starts('FREQ=WEEKLY;INTERVAL=2;UNTIL=20231002', '2023-09-04 10:00'),
+                         ['2023-09-04 10:00', '2023-09-18 10:00', '2023-10-02 10:00'])
+
+    def test_monthly_skips_missing_days(self):
+        self.assertEqual(self.get_starts('FREQ=MONTHLY;COUNT=3', '2024-01-31 09:00'),
+                         ['2024-01-31 09:00', '2024-03-31 09:00', '2024-05-31 09:00'])
+
+    def test_window_and_skipped_dates(self):
+        self.assertEqual(self.get_starts('FREQ=DAILY;INTERVAL=3', '2023-09-01 10:00', '2023-09-10 10:30',
+                                         '2023-09-17 00:00', {datetime.date(2023, 9, 13)}),
+                         ['2023-09-10 10:00', '2023-09-16 10:00'])
+
+    def test_far_window_of_unbounded_series(self):
+        rule = parse_rule('FREQ=DAILY')
+        start = moment('2000-01-01 10:00')
+        occurrences = iter_occurrences(rule, start, moment('2100-01-01 00:00'))
+        self.assertEqual(next(occurrences), moment('2099-12-30 10:00'))
+        self.assertEqual(self.get_starts('FREQ=WEEKLY;BYDAY=TU,TH', '2000-01-04 10:00', '2100-01-01 00:00',
+                                         '2100-01-08 00:00'),
+                         ['2100-01-05 10:00', '2100-01-07 10:00'])
+
+
+class RecurringEventApiTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.seminar = Event.objects.create(title='Семинар', e_type='i', is_full_day=False,
+                                            event_start_datetime='2023-09-04T10:00:00+03:00',
+                                            event_end_datetime='2023-09-04T11:30:00+03:00',
+                                            recurrence='FREQ=WEEKLY;BYDAY=MO', recurrence_exceptions=['2023-09-11'])
+        Event.objects.create(title='Семинар в актовом зале', e_type='i', is_full_day=False,
+                             event_start_datetime='2023-09-19T12:00:00+03:00',
+                             event_end_datetime='2023-09-19T13:30:00+03:00',
+                             recurrence_parent=self.seminar, recurrence_date=datetime.date(2023, 9, 18))
+        Event.objects.create(title='День программиста', e_type='i',
+                             event_start_datetime='2023-09-13T00:00:00+03:00',
+                             event_end_datetime='2023-09-13T23:59:00+03:00')
+
+    def get_events(self, query):
+        response = self.client.get(f'/api/event/?{query}')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [(event['title'], event['event_start_datetime'][:10]) for event in response.data]
+
+    def test_occurrences_expanded_inside_window(self):
+        self.assertEqual(self.get_events('from=01-09-2023&to=30-09-2023'), [
+            ('Семинар', '2023-09-04'),
+            ('День программиста', '2023-09-13'),
+            ('Семинар в актовом зале', '2023-09-19'),
+            ('Семинар', '2023-09-25'),
+        ])
+        self.assertEqual(self.get_events('from=01-01-2030&to=08-01-2030'), [('Семинар', '2030-01-07')])
+
+    def test_series_listed_once_without_window_end(self):
+        self.assertEqual(self.get_events(''), [('Семинар', '2023-09-04'), ('День программиста', '2023-09-13'),
+                                               ('Семинар в актовом зале', '2023-09-19')])
+        self.assertEqual(self.get_events('from=12-09-2023'), [('День программиста', '2023-09-13'),
+                                                              ('Семинар в актовом зале', '2023-09-19'),
+                                                              ('Семинар', '2023-09-25')])
+
+    def test_month_counts(self):
+        days = self.client.get('/api/event/month/?month=09-2023').data['days']
+        self.assertEqual([day for day, count in days.items() if count], ['04-09-2023', '13-09-2023',
+                                                                         '19-09-2023', '25-09-2023'])
+
+    def test_exception_invalidates_feed(self):
+        self.get_events('from=01-09-2023&to=30-09-2023')
+        self.seminar.recurrence_exceptions = ['2023-09-11', '2023-09-25']
+        self.seminar.save()
+        self.assertNotIn(('Семинар', '2023-09-25'), self.get_events('from=01-09-2023&to=30-09-2023'))
+
+    def test_invalid_recurrence_rejected(self):
+        User.objects.create_superuser(username='admin', email='admin@gmail.com', password='kd203sdlA')
+        response = self.client.post('/api/auth/jwt/create/', {'username': 'admin', 'password': 'kd203sdlA'},
+                                    format='json')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {response.data["access"]}')
+
+        event = {'title': 'Консультация', 'e_type': 'i', 'event_start_datetime': '2023-09-05T10:00:00+03:00',
+                 'event_end_datetime': '2023-09-05T11:00:00+03:00'}
+        response = self.client.post('/api/event/', dict(event, recurrence='FREQ=HOURLY'), format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post('/api/event/', dict(event, recurrence_date='2023-09-05'), format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        for date in ('2023-9-11', '20230911', 11):
+            response = self.client.post('/api/event/', dict(event, recurrence='FREQ=DAILY',
+                                                            recurrence_exceptions=[date]), format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, msg=date)
+        response = self.client.post('/api/event/', dict(event, recurrence='FREQ=DAILY;COUNT=5'), format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(self.get_events('from=01-09-2023&to=30-09-2023')), 9)
@@ -0,0 +1,108 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+
+from api.models import Schedule, CourseGroup, User, Student
+from api.cache import LRUCache
+from api.schedule_binary import BinarySchedule, get_binary_path, open_schedule_binary, write_schedule_binary
+from api.schedule_utilities import schedule_cache
+from schedule_fixtures import MEDIA_ROOT, TemporaryMediaRootMixin, create_document, create_lesson, dump_document
+
+
+def create_binary_document():
+    # empty couples, a lesson without a classroom and a missing day
+    document = create_document([
+        ('numerator', 'monday', {}),
+        ('numerator', 'monday', create_lesson()),
+        ('numerator', 'monday', {}),
+        ('denominator', 'friday', create_lesson('08:00', '09:35', classroom='')),
+    ])
+    del document['denominator']['saturday']
+    return document
+
+
+class ScheduleBinaryTest(TestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        self.path = os.path.join(directory, 'schedule.json.bin')
+        self.checksum = hashlib.sha256(b'schedule').hexdigest()
+
+    def test_round_trip(self):
+        document = create_binary_document()
+        self.assertTrue(write_schedule_binary(self.path, document, self.checksum))
+
+        schedule = open_schedule_binary(self.path, self.checksum)
+        self.assertEqual(json.loads(json.dumps({week: dict(days) for week, days in schedule.items()})), document)
+        self.assertEqual(schedule['numerator']['monday'][1]['subjectName'], 'Дискретная математика')
+        self.assertNotIn('saturday', schedule['denominator'])
+
+    def test_checksum_mismatch(self):
+        write_schedule_binary(self.path, create_binary_document(), self.checksum)
+
+        self.assertIsNone(open_schedule_binary(self.path, hashlib.sha256(b'other').hexdigest()))
+        self.assertIsNone(open_schedule_binary(f'{self.path}.missing', self.checksum))
+
+    def test_mapping_closed_when_evicted(self):
+        write_schedule_binary(self.path, create_binary_document(), self.checksum)
+        cache = LRUCache(1, on_evict=BinarySchedule.close)
+        first = open_schedule_binary(self.path, self.checksum)
+        cache.set(1, first, self.checksum)
+        cache.set(1, first, self.checksum)
+        self.assertEqual(first['numerator']['monday'][0], {})
+
+        second = open_schedule_binary(self.path, self.checksum)
+        cache.set(2, second, self.checksum)
+        with self.assertRaises(ValueError):
+            first.get_day(0, 0)
+        cache.clear()
+        with self.assertRaises(ValueError):
+            second.get_day(0, 0)
+
+    def test_unsupported_document_is_not_written(self):
+        write_schedule_binary(self.path, create_binary_document(), self.checksum)
+        document = create_binary_document()
+        document['numerator']['monday'][1]['note'] = 'Лекция'
+
+        self.assertFalse(write_schedule_binary(self.path, document, self.checksum))
+        self.assertFalse(os.path.exists(self.path))
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ScheduleBinaryCacheTest(TemporaryMediaRootMixin, APITestCase):
+    def setUp(self):
+        schedule_cache.clear()
+        self.client = APIClient()
+        course_group = CourseGroup.objects.create(course_number=3, group_number='5', higher_education_level='b')
+        self.schedule = Schedule.objects.create(course_group=course_group, schedule_file=SimpleUploadedFile(
+            'schedule.json', dump_document(create_binary_document())))
+        user = User.objects.create_user(username='andrew', email='maloy@gmail.com', password='pla232piSR')
+        Student.objects.create(year_of_enrollment='2021', record_book_number='16290710',
+                               course_group=course_group, user=user)
+        response = self.client.post('/api/auth/jwt/create/', {'username': 'andrew', 'password': 'pla232piSR'},
+                                    format='json')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {response.data["access"]}')
+
+    def test_binary_written_on_upload_and_read_by_cold_worker(self):
+        binary_path = get_binary_path(self.schedule.schedule_file.path)
+        self.assertTrue(os.path.exists(binary_path))
+
+        schedule_cache.clear()
+        os.remove(self.schedule.schedule_file.path)
+        response = self.client.get('/api/schedule/0/?week=a')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(json.loads(response.content), create_binary_document())
+
+    def test_binary_removed_with_schedule(self):
+        binary_path = get_binary_path(self.schedule.schedule_file.path)
+        self.schedule.delete()
+
+        self.assertFalse(os.path.exists(binary_path))
@@ -0,0 +1,29 @@
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from api.schedule_utilities import schedule_cache
+from schedule_fixtures import MEDIA_ROOT, StudentScheduleMixin
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ScheduleCacheTest(StudentScheduleMixin, APITestCase):
+    def test_checksum_stored_on_save(self):
+        self.assertEqual(len(self.schedule.checksum), 64)
+
+    def test_repeated_requests_hit_cache(self):
+        schedule_cache.clear()
+        for _ in range(3):
+            response = self.client.get('/api/schedule/0/?week=n')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        stats = self.client.get('/api/schedule/cacheStats').data
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['hits'], 2)
+
+    def test_replaced_file_invalidates_cache(self):
+        self.client.get('/api/schedule/0/?week=n')
+        self.replace_schedule('Логика')
+
+        response = self.client.get('/api/schedule/0/?week=n')
+        self.assertEqual(response.data['monday'][0]['subjectName'], 'Логика')
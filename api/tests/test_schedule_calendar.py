@@ -0,0 +1,51 @@
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from api.models import Event
+from schedule_fixtures import MEDIA_ROOT, StudentScheduleMixin, create_lesson, create_schedule_file
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ScheduleCalendarTest(StudentScheduleMixin, APITestCase):
+    def test_export_calendar(self):
+        Event.objects.create(title='День программиста', e_type='i', is_full_day=True,
+                             event_start_datetime='2023-09-13T12:00:00+03:00',
+                             event_end_datetime='2023-09-13T15:00:00+03:00')
+        response = self.client.get('/api/schedule/calendar/?date=11-09-2023')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'text/calendar; charset=utf-8')
+        body = b''.join(response.streaming_content).decode('utf-8')
+        self.assertTrue(body.startswith('BEGIN:VCALENDAR\r\n'))
+        self.assertIn('DTSTART:20230911T064500Z\r\n', body)
+        self.assertEqual(body.count('SUMMARY:Теория графов'), 8)
+        self.assertIn('DTSTART;VALUE=DATE:20230913\r\n', body)
+
+        cached = self.client.get('/api/schedule/calendar/?date=11-09-2023')
+        self.assertEqual(b''.join(cached.streaming_content).decode('utf-8'), body)
+
+        response = self.client.get('/api/schedule/calendar/?date=11-09-2023', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_event_changes_calendar(self):
+        response = self.client.get('/api/schedule/calendar/?date=11-09-2023')
+        Event.objects.create(title='День программиста', e_type='i',
+                             event_start_datetime='2023-09-13T12:00:00+03:00',
+                             event_end_datetime='2023-09-13T15:00:00+03:00')
+        response = self.client.get('/api/schedule/calendar/?date=11-09-2023', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('SUMMARY:День программиста', b''.join(response.streaming_content).decode('utf-8'))
+
+    def test_malformed_lessons_skipped(self):
+        self.schedule.schedule_file = create_schedule_file([
+            ('numerator', 'monday', create_lesson(subject_name='Теория графов')),
+            ('numerator', 'tuesday', {'subjectName': 'Без времени'}),
+            ('numerator', 'wednesday', create_lesson(time_from='9:45 утра', subject_name='Неверное время')),
+        ])
+        self.schedule.save()
+        with self.assertLogs('api.calendar_export', 'WARNING'):
+            response = self.client.get('/api/schedule/calendar/?date=11-09-2023')
+            body = b''.join(response.streaming_content).decode('utf-8')
+        self.assertEqual(body.count('SUMMARY:Теория графов'), 8)
+        self.assertNotIn('Без времени', body)
+        self.assertNotIn('Неверное время', body)
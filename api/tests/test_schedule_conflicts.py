@@ -0,0 +1,130 @@
+import io
+import os
+import shutil
+import tempfile
+
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.management import call_command, CommandError
+from django.test import TestCase, override_settings
+
+from api.models import Schedule, CourseGroup
+from api.schedule_conflicts import LessonColumns, find_conflicts, find_new_conflicts
+from api.schedule_import import import_schedules
+from schedule_fixtures import MEDIA_ROOT, TemporaryMediaRootMixin, create_document, create_lesson, dump_document
+
+
+def create_monday_document(*couples):
+    return dump_document(create_document(('numerator', 'monday', create_lesson(*couple)) for couple in couples))
+
+
+def create_lesson_row(start_minute, end_minute, subject_name, classroom, professor, week='n', weekday=0):
+    return {
+        'week': week,
+        'weekday': weekday,
+        'position': 0,
+        'start_minute': start_minute,
+        'end_minute': end_minute,
+        'subject_name': subject_name,
+        'classroom': classroom,
+        'professor': professor
+    }
+
+
+class ConflictSweepTest(TestCase):
+    def test_find_overlaps(self):
+        columns = LessonColumns()
+        columns.extend_from_document_lessons(1, [create_lesson_row(585, 680, 'Логика', '292', 'Зенин К.В.')])
+        columns.extend_from_document_lessons(2, [create_lesson_row(600, 700, 'Алгебра', '290', 'Зенин К.В.'),
+                                                 create_lesson_row(680, 775, 'Физика', '292', 'Иванов А.А.')])
+        columns.extend_from_document_lessons(3, [create_lesson_row(585, 680, 'Логика', '292', 'Зенин К.В.',
+                                                               week='d')])
+
+        conflicts = find_conflicts(columns)
+
+        self.assertEqual(len(conflicts), 1)
+        self.assertEqual(conflicts[0].kind, 'professor')
+        self.assertEqual(conflicts[0].resource, 'Зенин К.В.')
+        self.assertEqual((conflicts[0].start_minute, conflicts[0].end_minute), (600, 680))
+        self.assertEqual(conflicts[0].course_group_ids, (1, 2))
+
+    def test_joint_lecture_is_not_conflict(self):
+        columns = LessonColumns()
+        for course_group_id in (1, 2, 3):
+            columns.extend_from_document_lessons(course_group_id,
+                                                 [create_lesson_row(585, 680, 'Логика', '292', 'Зенин К.В.')])
+        columns.extend_from_document_lessons(4, [create_lesson_row(585, 680, 'Алгебра', '292', 'Иванов А.А.')])
+
+        conflicts = find_conflicts(columns, ('classroom',))
+
+        self.assertEqual(len(conflicts), 3)
+        self.assertTrue(all(conflict.course_group_ids[1] == 4 for conflict in conflicts))
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, SCHEDULE_INDEX_REFRESH_SECONDS=0)
+class ScheduleConflictTest(TemporaryMediaRootMixin, TestCase):
+    def setUp(self):
+        self.group_1 = CourseGroup.objects.create(course_number=3, group_number='5.2', higher_education_level='b')
+        self.group_2 = CourseGroup.objects.create(course_number=1, group_number='4', higher_education_level='m')
+        self.schedule = Schedule(course_group=self.group_1)
+        self.schedule.schedule_file = ContentFile(
+            create_monday_document(('09:45', '11:20', 'Логика', '292', 'Зенин К.В.')), name='3_5.2_b.json')
+        self.schedule.full_clean()
+        self.schedule.save()
+
+    def create_schedule(self, content):
+        schedule = Schedule(course_group=self.group_2)
+        schedule.schedule_file = ContentFile(content, name='1_4_m.json')
+        return schedule
+
+    def test_find_new_conflicts(self):
+        lessons = [create_lesson_row(600, 700, 'Алгебра', '290', 'Зенин К.В.')]
+
+        self.assertEqual(len(find_new_conflicts({self.group_2.pk: lessons})), 1)
+        self.assertEqual(find_new_conflicts({self.group_1.pk: lessons}), [])
+
+    def test_upload_warns_about_conflicts(self):
+        schedule = self.create_schedule(create_monday_document(('10:00', '11:40', 'Алгебра', '292', 'Иванов А.А.')))
+        schedule.full_clean()
+        schedule.save()
+
+        self.assertEqual(len(schedule.conflicts), 1)
+        self.assertIn('Аудитория 292', schedule.conflicts[0])
+        self.assertIn('3 курс 5.2 группа', schedule.conflicts[0])
+
+    @override_settings(SCHEDULE_CONFLICTS='reject')
+    def test_upload_rejects_conflicts(self):
+        schedule = self.create_schedule(create_monday_document(('10:00', '11:40', 'Алгебра', '290', 'Зенин К.В.')))
+
+        with self.assertRaises(ValidationError) as context:
+            schedule.full_clean()
+        self.assertIn('schedule_file', context.exception.message_dict)
+
+        schedule = self.create_schedule(create_monday_document(('09:45', '11:20', 'Логика', '292', 'Зенин К.В.')))
+        schedule.full_clean()
+        self.assertEqual(schedule.conflicts, [])
+
+    @override_settings(SCHEDULE_CONFLICTS='reject')
+    def test_import_rejects_conflicts(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        with open(os.path.join(directory, '1_4_m.json'), 'wb') as file:
+            file.write(create_monday_document(('10:00', '11:40', 'Алгебра', '290', 'Зенин К.В.')))
+
+        report = import_schedules(directory, workers=1)
+
+        self.assertFalse(report[0]['imported'])
+        self.assertEqual(len(report[0]['conflicts']), 1)
+        self.assertFalse(Schedule.objects.filter(course_group=self.group_2).exists())
+
+    def test_command_report(self):
+        self.create_schedule(create_monday_document(('10:00', '11:40', 'Алгебра', '292', 'Зенин К.В.'))).save()
+
+        output = io.StringIO()
+        with self.assertRaises(CommandError):
+            call_command('find_schedule_conflicts', fail=True, stdout=output)
+        self.assertIn('2 conflicts (1 professor, 1 classroom)', output.getvalue())
+
+        output = io.StringIO()
+        call_command('find_schedule_conflicts', kind=['classroom'], stdout=output)
+        self.assertIn('1 conflicts (1 classroom)', output.getvalue())
@@ -0,0 +1,22 @@
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from schedule_fixtures import MEDIA_ROOT, StudentScheduleMixin
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ScheduleEtagTest(StudentScheduleMixin, APITestCase):
+    def test_not_modified_when_etag_matches(self):
+        response = self.client.get('/api/schedule/0/?week=n')
+        etag = response['ETag']
+
+        response = self.client.get('/api/schedule/0/?week=n', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        response = self.client.get('/api/schedule/0/?week=d', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.replace_schedule('Логика')
+        response = self.client.get('/api/schedule/0/?week=n', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
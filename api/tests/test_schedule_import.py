@@ -0,0 +1,91 @@
+import io
+import os
+import shutil
+import tempfile
+import zipfile
+from unittest import mock
+
+from django.core.management import call_command, CommandError
+from django.test import TestCase, override_settings
+
+from api.models import Schedule, CourseGroup, Lesson, ProfessorSchedule
+from api.schedule_import import import_schedules
+from api.schedule_utilities import load_schedule_document, schedule_cache
+from schedule_fixtures import MEDIA_ROOT, TemporaryMediaRootMixin, create_document, create_lesson, dump_document
+
+
+def create_import_file(subject_name, professor):
+    return dump_document(create_document([('numerator', 'monday', create_lesson(subject_name=subject_name,
+                                                                                professor=professor))]))
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ScheduleImportTest(TemporaryMediaRootMixin, TestCase):
+    def setUp(self):
+        self.group_1 = CourseGroup.objects.create(course_number=3, group_number='5.2', higher_education_level='b')
+        self.group_2 = CourseGroup.objects.create(course_number=1, group_number='4', higher_education_level='m')
+        self.files = {
+            '3_5.2_b.json': create_import_file('Дискретная математика', 'Зенин К.В.'),
+            '1_4_m.json': create_import_file('Логика', 'Иванов А.А.'),
+        }
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+
+    def write_files(self, files):
+        for name, content in files.items():
+            with open(os.path.join(self.directory, name), 'wb') as file:
+                file.write(content)
+
+    def test_import_directory(self):
+        self.write_files(self.files)
+        report = import_schedules(self.directory, workers=2)
+
+        self.assertTrue(all(row['imported'] for row in report))
+        self.assertEqual(Schedule.objects.count(), 2)
+        self.assertEqual(Lesson.objects.filter(course_group=self.group_1, subject_name='Дискретная математика').count(),
+                         1)
+        self.assertEqual(ProfessorSchedule.objects.count(), 2)
+
+    def test_import_zip_replaces_existing_schedule(self):
+        self.write_files({'3_5.2_b.json': self.files['3_5.2_b.json']})
+        import_schedules(self.directory, workers=1)
+
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, 'w') as zip_file:
+            zip_file.writestr('schedules/3_5.2_b.json', create_import_file('Логика', 'Зенин К.В.'))
+        archive.seek(0)
+        import_schedules(archive, workers=1)
+
+        self.assertEqual(Schedule.objects.count(), 1)
+        self.assertEqual(list(Lesson.objects.values_list('subject_name', flat=True)), ['Логика'])
+
+    def test_invalid_files_abort_import(self):
+        self.write_files({**self.files, '2_1_b.json': self.files['1_4_m.json'], 'wrong.json': b'{'})
+
+        with self.assertRaises(CommandError):
+            call_command('import_schedules', self.directory, workers=1, stdout=io.StringIO())
+        self.assertEqual(Schedule.objects.count(), 0)
+
+        report = {row['name']: row for row in import_schedules(self.directory, workers=1, skip_invalid=True)}
+        self.assertEqual(report['2_1_b.json']['errors'], ['Группа не найдена'])
+        self.assertEqual(len(report['wrong.json']['errors']), 2)
+        self.assertTrue(report['1_4_m.json']['imported'])
+        self.assertEqual(Schedule.objects.count(), 2)
+
+    def test_files_replaced_on_commit(self):
+        self.write_files({'3_5.2_b.json': self.files['3_5.2_b.json']})
+        with self.captureOnCommitCallbacks(execute=True):
+            import_schedules(self.directory)
+        schedule = Schedule.objects.get()
+        self.assertTrue(os.path.exists(schedule.schedule_file.path + '.bin'))
+
+        self.write_files({'3_5.2_b.json': create_import_file('Логика', 'Зенин К.В.')})
+        with mock.patch('api.schedule_utilities.update_professor_index', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                import_schedules(self.directory)
+        schedule = Schedule.objects.get()
+        self.assertEqual(sorted(name for name in os.listdir(os.path.dirname(schedule.schedule_file.path))
+                                if name.startswith('3_5.2_b')), ['3_5.2_b.json', '3_5.2_b.json.bin'])
+        schedule_cache.clear()
+        self.assertEqual(load_schedule_document(schedule)['numerator']['monday'][0]['subjectName'],
+                         'Дискретная математика')
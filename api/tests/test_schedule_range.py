@@ -0,0 +1,22 @@
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from schedule_fixtures import MEDIA_ROOT, StudentScheduleMixin
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ScheduleRangeTest(StudentScheduleMixin, APITestCase):
+    def test_get_schedule_range(self):
+        response = self.client.get('/api/schedule/0/?from=10-09-2023&to=18-09-2023')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 9)
+        self.assertIsNone(response.data['10-09-2023'])
+        self.assertEqual(response.data['11-09-2023'][0]['subjectName'], 'Теория графов')
+        self.assertEqual(response.data['18-09-2023'], [])
+
+    def test_get_schedule_range_limits(self):
+        response = self.client.get('/api/schedule/0/?from=18-09-2023&to=10-09-2023')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get('/api/schedule/0/?from=01-01-2023&to=31-12-2023')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
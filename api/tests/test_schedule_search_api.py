@@ -0,0 +1,77 @@
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+
+from api.models import Schedule, CourseGroup, User
+from api.schedule_indexes import search_index
+from schedule_fixtures import MEDIA_ROOT, TemporaryMediaRootMixin, create_lesson, create_schedule_file
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, SCHEDULE_INDEX_REFRESH_SECONDS=0)
+class ScheduleSearchApiTest(TemporaryMediaRootMixin, APITestCase):
+    def setUp(self):
+        search_index.clear()
+        self.client = APIClient()
+        User.objects.create_user(username='stepkin', email='stepkin@gmail.com', password='kd203sdlA')
+        response = self.client.post('/api/auth/jwt/create/', {'username': 'stepkin', 'password': 'kd203sdlA'},
+                                    format='json')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {response.data["access"]}')
+
+        self.group_1 = CourseGroup.objects.create(course_number=3, group_number='5', higher_education_level='b')
+        group_2 = CourseGroup.objects.create(course_number=3, group_number='6', higher_education_level='b')
+        self.schedule = Schedule.objects.create(course_group=self.group_1, schedule_file=create_schedule_file([
+            ('numerator', 'monday', create_lesson()),
+            ('denominator', 'monday', create_lesson('08:00')),
+            ('numerator', 'tuesday', create_lesson('08:00', '11:20', 'Философия', '380', 'Ёлкин А.А.')),
+        ]))
+        Schedule.objects.create(course_group=group_2, schedule_file=create_schedule_file([
+            ('numerator', 'monday', create_lesson('08:00', '11:20', 'Математический анализ', '314', 'Иванов А.А.')),
+        ]))
+
+    def search(self, query):
+        response = self.client.get(f'/api/schedule/search?{query}')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_search_subject(self):
+        data = self.search('q=МАТЕМАТ')
+
+        self.assertEqual(data['count'], 3)
+        self.assertEqual([(lesson['subjectName'], lesson['week'], lesson['timeFrom']) for lesson in data['results']],
+                         [('Дискретная математика', 'numerator', '09:45'),
+                          ('Дискретная математика', 'denominator', '08:00'),
+                          ('Математический анализ', 'numerator', '08:00')])
+        self.assertEqual(data['results'][0]['courseGroup']['id'], self.group_1.pk)
+        self.assertEqual(data['results'][0]['weekday'], 'monday')
+
+    def test_search_professor_and_classroom(self):
+        self.assertEqual(self.search('q=зенин к. в.&field=professor')['count'], 2)
+        self.assertEqual(self.search('q=елкин')['results'][0]['subjectName'], 'Философия')
+        self.assertEqual(self.search('q=29&field=classroom')['count'], 2)
+        self.assertEqual(self.search('q=а&field=professor')['count'], 2)
+        self.assertEqual(self.search('q=292&field=subjectName')['count'], 0)
+
+    def test_search_pagination(self):
+        data = self.search('q=математика&limit=1&offset=1')
+
+        self.assertEqual(data['count'], 2)
+        self.assertEqual(len(data['results']), 1)
+        self.assertEqual(data['results'][0]['week'], 'denominator')
+
+    def test_search_follows_schedule_updates(self):
+        self.search('q=математика')
+        self.schedule.schedule_file = create_schedule_file([
+            ('numerator', 'friday', create_lesson(subject_name='Логика')),
+        ])
+        self.schedule.save()
+
+        self.assertEqual(self.search('q=математика')['count'], 0)
+        self.assertEqual(self.search('q=логика')['results'][0]['weekday'], 'friday')
+
+        self.schedule.delete()
+        self.assertEqual(self.search('q=логика')['count'], 0)
+
+    def test_search_bad_request(self):
+        self.assertEqual(self.client.get('/api/schedule/search?q=%20').status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get('/api/schedule/search?q=292&field=group').status_code,
+                         status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,46 @@
+import json
+from unittest import mock
+
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+
+from api.models import Schedule, CourseGroup, Lesson
+from schedule_fixtures import MEDIA_ROOT, TemporaryMediaRootMixin, create_document, create_lesson
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ScheduleFileValidationTest(TemporaryMediaRootMixin, TestCase):
+    def setUp(self):
+        self.course_group = CourseGroup.objects.create(course_number=3, group_number='5', higher_education_level='b')
+
+    def create_schedule(self, content):
+        return Schedule(course_group=self.course_group,
+                        schedule_file=SimpleUploadedFile('schedule.json', content.encode('utf-8')))
+
+    def test_all_schema_errors_reported(self):
+        document = create_document([('numerator', 'monday', create_lesson())])
+        del document['numerator']['monday'][0]['professor']
+        del document['denominator']['saturday']
+        document['numerator']['friday'] = {}
+
+        with self.assertRaises(ValidationError) as context:
+            self.create_schedule(json.dumps(document)).full_clean()
+
+        messages = context.exception.message_dict['schedule_file']
+        self.assertEqual(len(messages), 3)
+        self.assertIn("numerator/monday/0: 'professor' is a required property", messages[2])
+
+    def test_invalid_json_reported(self):
+        with self.assertRaises(ValidationError):
+            self.create_schedule('{"numerator":').full_clean()
+
+    def test_validated_document_reused_on_save(self):
+        schedule = self.create_schedule(json.dumps(create_document([('numerator', 'monday', create_lesson())])))
+        schedule.full_clean()
+
+        with mock.patch('api.schedule_utilities.json.load', side_effect=AssertionError('file parsed twice')):
+            schedule.save()
+
+        self.assertEqual(len(schedule.checksum), 64)
+        self.assertEqual(Lesson.objects.filter(schedule=schedule).count(), 1)
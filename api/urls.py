@@ -3,7 +3,9 @@ from rest_framework import routers
 
 from api.views import CourseGroupApiList, UserShortInfoViewSet, UserScheduleViewSet, UserAvatarUpdateView, \
     PublicationApiList, \
-    MapChoicesView, DateWeekInfoView, EventApiView, ChatBotApiView
+    MapChoicesView, DateWeekInfoView, EventApiView, ChatBotApiView, ScheduleCacheStatsView, \
+    FreeClassroomsView, DateRangeWeekInfoView, ScheduleSearchView, FullTextSearchView, \
+    PublicationCacheStatsView
 # from api.views import ProfessorApiList
 from api.views import StudentViewSet, ProfessorViewSet, MapApiView
 
@@ -20,12 +22,18 @@ urlpatterns = [
     # path('student/', StudentApiList.as_view()),
     # path('professor/', ProfessorApiList.as_view()),
     path('publication/', PublicationApiList.as_view()),
+    path('publication/cacheStats', PublicationCacheStatsView.as_view()),
+    path('search/', FullTextSearchView.as_view()),
     path('courseGroup/', CourseGroupApiList.as_view(), name='courseGroup'),
     # path('schedule/', ScheduleApiList.as_view()),
     # path('schedule/<int:pk>/', ScheduleApi.as_view()),
     path('map/choices/', MapChoicesView.as_view()),
     path('chatBot/getAnswer', ChatBotApiView.as_view()),
     path('dateInfo', DateWeekInfoView.as_view()),
+    path('dateInfo/range', DateRangeWeekInfoView.as_view()),
+    path('schedule/cacheStats', ScheduleCacheStatsView.as_view()),
+    path('schedule/search', ScheduleSearchView.as_view()),
+    path('classrooms/free', FreeClassroomsView.as_view()),
     path('auth/', include('djoser.urls.jwt')),
     # path('auth/users/shortinfo', UserShortInfoView.as_view())
 ]
@@ -1,14 +1,17 @@
+import hashlib
 import json
 import re
-from datetime import datetime
+from datetime import date as date_type, datetime
 
 import jsonschema
 from django.core import validators
+from django.core.exceptions import ValidationError
 from django.core.validators import BaseValidator
 from django.utils.translation import gettext_lazy as _
 from rest_framework import serializers
-from rest_framework.exceptions import ParseError, ValidationError
+from rest_framework.exceptions import ParseError
 from . import schemas
+from .recurrence import parse_rule
 
 from django.utils.deconstruct import deconstructible
 
@@ -37,20 +40,62 @@ def validate_record_book_number(record_book_number):
         raise serializers.ValidationError()
 
 
+schedule_validator = jsonschema.validators.validator_for(schemas.schedule)(schemas.schedule)
+
+
 def schedule_file_validate(schedule_file):
     try:
-        jsonschema.validate(schedule_file, schemas.schedule)
+        schedule_validator.validate(schedule_file)
     except ValueError:
         raise ParseError()
 
 
+def get_schedule_errors(document):
+    errors = sorted(schedule_validator.iter_errors(document),
+                    key=lambda error: [str(part) for part in error.absolute_path])
+    return [f"{'/'.join(str(part) for part in error.absolute_path) or '/'}: {error.message}" for error in errors]
+
+
 @deconstructible
 class FileValidator(BaseValidator):
     def __call__(self, data):
+        data.open('rb')
+        try:
+            content = data.read()
+        finally:
+            if getattr(data, '_committed', False):
+                data.close()
+
         try:
-            jsonschema.validate(json.load(data), schemas.schedule)
-        except Exception as e:
-            raise ValidationError("Ошибка валидации файла расписания")
+            document = json.loads(content)
+        except ValueError as e:
+            raise ValidationError(f"Ошибка чтения файла расписания: {e}")
 
+        errors = get_schedule_errors(document)
+        if errors:
+            raise ValidationError([f"Ошибка валидации файла расписания: {error}" for error in errors])
 
+        data.schedule_document = document
+        data.schedule_checksum = hashlib.sha256(content).hexdigest()
 
+
+def validate_recurrence_rule(rule):
+    if not rule:
+        return
+    try:
+        parse_rule(rule)
+    except ValueError as e:
+        raise ValidationError(f"Ошибка в правиле повторения: {e}")
+
+
+def validate_recurrence_exceptions(dates):
+    if not isinstance(dates, list):
+        raise ValidationError("Отменённые повторения должны быть списком дат в формате YYYY-MM-DD")
+    for date in dates:
+        try:
+            # the feed reads the dates back with fromisoformat, which needs zero-padded values
+            valid = date_type.fromisoformat(date).isoformat() == date
+        except (TypeError, ValueError):
+            valid = False
+        if not valid:
+            raise ValidationError(f"Неверная дата отменённого повторения: {date}")
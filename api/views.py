@@ -1,28 +1,39 @@
 import datetime
 
+from django.conf import settings as django_settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.tokens import default_token_generator
 from django.db.models import Q
+from django.http import HttpResponseNotModified, StreamingHttpResponse
 from django.utils import timezone
+from django.utils.http import parse_etags, quote_etag
 from djoser import signals, utils
 from djoser.conf import settings
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework import generics, status
 from rest_framework.decorators import action
-from rest_framework.exceptions import NotFound
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.mixins import RetrieveModelMixin, UpdateModelMixin
-from rest_framework.pagination import LimitOffsetPagination
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.response import Response
-from rest_framework.status import HTTP_200_OK, HTTP_429_TOO_MANY_REQUESTS
+from rest_framework.status import HTTP_200_OK, HTTP_304_NOT_MODIFIED, HTTP_429_TOO_MANY_REQUESTS
 from rest_framework.views import APIView
 from rest_framework.viewsets import ModelViewSet, GenericViewSet
 
+from api.academic_calendar import get_academic_calendar, WEEKS_RU, WEEKDAYS_RU
+from api.calendar_export import get_user_calendar
+from api.event_feed import get_event_feed, filter_event_feed, get_day_start, get_event_day_counts
+from api.full_text_search import KINDS as SEARCH_KINDS, search as full_text_search
 from api.chat_bot import get_answer
 from api.models import Student, Professor, CourseGroup, Schedule, Map, Event, Publication
+from api.pagination import PublicationPagination, EventPagination, SearchPagination, ScheduleSearchPagination
+from api.publication_cache import publication_cache
 from api.permissions import AdminOrReadOnlyPermission, IsOwnerOrAdmin
-from api.schedule_utilities import get_user_schedule
+from api.schedule_utilities import get_user_schedule, get_user_schedule_etag, get_user_schedule_range, \
+    schedule_cache, parse_date, parse_minutes, format_minutes, get_date_week, WEEKS, WEEKDAYS, \
+    get_professor_identification
+from api.schedule_indexes import classroom_index, search_index, next_lesson_index
 from api.searchfilters import BuildingSearchFilter
 from api.serializers import CourseGroupSerializer, MyUserCreateSerializer, SimpleUserSerializer, EventSerializer, \
     PublicationSerializer
@@ -95,18 +106,98 @@ class EventApiView(ModelViewSet):
     permission_classes = [AdminOrReadOnlyPermission]
     queryset = Event.objects.all()
     serializer_class = EventSerializer
+    pagination_class = EventPagination
 
     @swagger_auto_schema(
         tags=['Events'],
         operation_description="Retrieve a list of events",
+        manual_parameters=[
+            openapi.Parameter(
+                name='from',
+                in_=openapi.IN_QUERY,
+                description='Only events that end on or after this date, in the format dd-mm-yyyy',
+                type=openapi.TYPE_STRING,
+                required=False
+            ),
+            openapi.Parameter(
+                name='to',
+                in_=openapi.IN_QUERY,
+                description='Only events that start on or before this date, in the format dd-mm-yyyy',
+                type=openapi.TYPE_STRING,
+                required=False
+            ),
+            openapi.Parameter(
+                name='e_type',
+                in_=openapi.IN_QUERY,
+                description='Comma separated event types',
+                type=openapi.TYPE_STRING,
+                required=False
+            ),
+            openapi.Parameter(
+                name='latest',
+                in_=openapi.IN_QUERY,
+                description='Only events that have not started yet',
+                type=openapi.TYPE_BOOLEAN,
+                required=False
+            )
+        ],
         responses={
             200: 'Success',
+            400: 'Bad Request',
             401: 'Unauthorized',
             403: 'Forbidden'
         }
     )
     def list(self, request, *args, **kwargs):
-        return super().list(request, *args, **kwargs)
+        feed = get_event_feed(self.get_course_group_id(), all_groups=request.user.is_superuser)
+        starts_after = timezone.now() if self.request.query_params.get("latest") == "true" else None
+        feed = filter_event_feed(feed, **self.get_event_filters(), starts_after=starts_after)
+        page = self.paginator.paginate_list(feed, request, key=lambda item: (item.start, item.data['id']), view=self)
+        if page is None:
+            return Response([item.data for item in feed])
+        return self.get_paginated_response([item.data for item in page])
+
+    @swagger_auto_schema(
+        tags=['Events'],
+        operation_description="Count events of every day of a month",
+        manual_parameters=[
+            openapi.Parameter(
+                name='month',
+                in_=openapi.IN_QUERY,
+                description='Month in the format mm-yyyy, current month by default',
+                type=openapi.TYPE_STRING,
+                required=False
+            ),
+            openapi.Parameter(
+                name='e_type',
+                in_=openapi.IN_QUERY,
+                description='Comma separated event types',
+                type=openapi.TYPE_STRING,
+                required=False
+            )
+        ],
+        responses={
+            200: 'Success',
+            400: 'Bad Request',
+            401: 'Unauthorized',
+            403: 'Forbidden'
+        }
+    )
+    @action(["get"], detail=False, url_path='month')
+    def month(self, request, *args, **kwargs):
+        month = request.query_params.get('month')
+        try:
+            first_day = datetime.datetime.strptime(month, "%m-%Y").date() if month is not None \
+                else timezone.localdate().replace(day=1)
+        except ValueError:
+            raise ValidationError('month must be in mm-yyyy format')
+        last_day = (first_day + datetime.timedelta(days=31)).replace(day=1) - datetime.timedelta(days=1)
+
+        counts = get_event_day_counts(self.get_queryset(), first_day, last_day, self.get_event_filters()['e_types'])
+        return Response({
+            'month': first_day.strftime("%m-%Y"),
+            'days': {day.strftime("%d-%m-%Y"): count for day, count in counts.items()}
+        })
 
     @swagger_auto_schema(
         tags=['Events'],
@@ -163,28 +254,54 @@ class EventApiView(ModelViewSet):
 
     def get_queryset(self):
         queryset = super().get_queryset()
-        if not self.request.user.is_authenticated:
-            queryset = queryset.filter(course_groups=None)
-        elif self.request.user.is_superuser:
-            pass
-        else:
-            try:
-                student = self.request.user.student
-                student_course_group = student.course_group
-                queryset = queryset.filter(Q(course_groups=None) | Q(course_groups=student_course_group))
-            except Exception as e:
+        if not self.request.user.is_superuser:
+            course_group_id = self.get_course_group_id()
+            if course_group_id is None:
                 queryset = queryset.filter(course_groups=None)
+            else:
+                queryset = queryset.filter(Q(course_groups=None) | Q(course_groups=course_group_id)).distinct()
 
         if self.request.query_params.get("latest") == "true":
             queryset = queryset.filter(event_start_datetime__gte=timezone.now()).order_by('event_start_datetime')
         return queryset
 
+    def get_event_filters(self):
+        date_from = self.request.query_params.get('from')
+        date_to = self.request.query_params.get('to')
+        e_types = self.request.query_params.get('e_type')
+        try:
+            ends_after = get_day_start(parse_date(date_from)) if date_from is not None else None
+            starts_before = get_day_start(parse_date(date_to) + datetime.timedelta(days=1)) \
+                if date_to is not None else None
+        except ValueError:
+            raise ValidationError('"from" and "to" must be dates in dd-mm-yyyy format')
+        if ends_after is not None and starts_before is not None and starts_before <= ends_after:
+            raise ValidationError('"from" must not be later than "to"')
+
+        e_types = set(e_types.split(',')) if e_types else set()
+        if not e_types <= {e_type for e_type, _ in Event.EVENT_TYPES_RU}:
+            raise ValidationError(f'e_type must be a comma separated list of '
+                                  f'{", ".join(e_type for e_type, _ in Event.EVENT_TYPES_RU)}')
+        return {'ends_after': ends_after, 'starts_before': starts_before, 'e_types': e_types}
+
+    def get_course_group_id(self):
+        return get_user_course_group_id(self.request.user)
+
+
+def get_user_course_group_id(user):
+    if not user.is_authenticated:
+        return None
+    try:
+        return user.student.course_group_id
+    except Exception:
+        return None
+
 
 class PublicationApiList(generics.ListAPIView):
     queryset = Publication.objects.all()
     serializer_class = PublicationSerializer
     permission_classes = [AdminOrReadOnlyPermission]
-    pagination_class = LimitOffsetPagination
+    pagination_class = PublicationPagination
 
     @swagger_auto_schema(
         tags=['Publications'],
@@ -196,7 +313,15 @@ class PublicationApiList(generics.ListAPIView):
         }
     )
     def list(self, request, *args, **kwargs):
-        return super().list(request, *args, **kwargs)
+        response = publication_cache.get_response(request, lambda: self.render_list(request, *args, **kwargs))
+        if response is None:
+            return super().list(request, *args, **kwargs)
+        return response
+
+    def render_list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        return request.accepted_renderer.render(response.data, request.accepted_media_type,
+                                                self.get_renderer_context())
 
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -204,6 +329,99 @@ class PublicationApiList(generics.ListAPIView):
         return queryset
 
 
+class PublicationCacheStatsView(APIView):
+    permission_classes = [IsAdminUser]
+
+    @swagger_auto_schema(
+        tags=['Publications'],
+        operation_summary="Get publication response cache counters of the current worker",
+        responses={
+            200: openapi.Response(description="Success"),
+            401: openapi.Response(description="Unauthorized"),
+            403: openapi.Response(description="Forbidden"),
+        }
+    )
+    def get(self, request):
+        return Response(publication_cache.stats())
+
+
+class FullTextSearchView(APIView):
+    permission_classes = [AdminOrReadOnlyPermission]
+
+    @swagger_auto_schema(
+        tags=['Search'],
+        operation_summary="Search publications and events",
+        manual_parameters=[
+            openapi.Parameter(
+                name='q',
+                in_=openapi.IN_QUERY,
+                description='Words to search for in titles and texts',
+                type=openapi.TYPE_STRING,
+                required=True
+            ),
+            openapi.Parameter(
+                name='type',
+                in_=openapi.IN_QUERY,
+                description=f'Comma separated result types: {", ".join(SEARCH_KINDS)}',
+                type=openapi.TYPE_STRING,
+                required=False
+            ),
+            openapi.Parameter(
+                name='cursor',
+                in_=openapi.IN_QUERY,
+                description='The pagination cursor value',
+                type=openapi.TYPE_STRING,
+                required=False
+            ),
+            openapi.Parameter(
+                name='page_size',
+                in_=openapi.IN_QUERY,
+                description='Number of results to return per page, 20 by default',
+                type=openapi.TYPE_INTEGER,
+                required=False
+            )
+        ],
+        responses={
+            200: openapi.Response(description="Success"),
+            400: openapi.Response(description="Bad Request"),
+            404: openapi.Response(description="Invalid cursor"),
+        }
+    )
+    def get(self, request):
+        query = request.query_params.get('q', '')
+        kinds = request.query_params.get('type')
+        if not query.strip():
+            raise ValidationError('q must not be empty')
+        kinds = kinds.split(',') if kinds else list(SEARCH_KINDS)
+        if not set(kinds) <= set(SEARCH_KINDS):
+            raise ValidationError(f'type must be a comma separated list of {", ".join(SEARCH_KINDS)}')
+
+        course_group_id = get_user_course_group_id(request.user)
+        all_events = request.user.is_superuser
+
+        paginator = SearchPagination()
+        hits = paginator.paginate_search(
+            lambda limit, after: full_text_search(query, kinds, limit, after, course_group_id, all_events),
+            request, view=self)
+        objects = {
+            'publication': Publication.objects.in_bulk([hit.object_id for hit in hits if hit.kind == 'publication']),
+            'event': Event.objects.in_bulk([hit.object_id for hit in hits if hit.kind == 'event']),
+        }
+        serializer_classes = {'publication': PublicationSerializer, 'event': EventSerializer}
+        return paginator.get_paginated_response([
+            {
+                'type': hit.kind,
+                'id': hit.object_id,
+                'rank': hit.rank,
+                'title': hit.title,
+                'snippet': hit.snippet,
+                'object': serializer_classes[hit.kind](objects[hit.kind][hit.object_id],
+                                                       context={'request': request}).data
+            }
+            for hit in hits if hit.object_id in objects[hit.kind]
+        ])
+
+
 class MapApiView(ModelViewSet):
     permission_classes = [AdminOrReadOnlyPermission]
     queryset = Map.objects.all()
@@ -281,31 +499,208 @@ class DateWeekInfoView(APIView):
     )
     def get(self, request):
         date = request.query_params['date']
-        parse_date = datetime.datetime.strptime(date, "%d-%m-%Y").date()
-        response = {}
-        week_number = parse_date.isocalendar().week
-        weekday = parse_date.weekday()
+        calendar_day = get_academic_calendar().get_day(parse_date(date))
 
-        if week_number % 2 == 0:
-            response['week'] = 'Знаменатель'
-        else:
-            response['week'] = 'Числитель'
-        if weekday == 0:
-            response['weekday'] = 'Понедельник'
-        if weekday == 1:
-            response['weekday'] = 'Вторник'
-        if weekday == 2:
-            response['weekday'] = 'Среда'
-        if weekday == 3:
-            response['weekday'] = 'Четверг'
-        if weekday == 4:
-            response['weekday'] = 'Пятница'
-        if weekday == 5:
-            response['weekday'] = 'Суббота'
-        if weekday == 6:
-            response['weekday'] = 'Воскресенье'
-
-        return Response(response)
+        return Response({
+            'week': WEEKS_RU[calendar_day.week],
+            'weekday': WEEKDAYS_RU[calendar_day.weekday]
+        })
+
+
+class DateRangeWeekInfoView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        tags=['Date Info'],
+        operation_summary="Get week, weekday, semester and holiday information for every date of a range",
+        manual_parameters=[
+            openapi.Parameter(
+                name='from',
+                in_=openapi.IN_QUERY,
+                description='First date in the format dd-mm-yyyy',
+                type=openapi.TYPE_STRING,
+                required=True
+            ),
+            openapi.Parameter(
+                name='to',
+                in_=openapi.IN_QUERY,
+                description='Last date in the format dd-mm-yyyy',
+                type=openapi.TYPE_STRING,
+                required=True
+            )
+        ],
+        responses={
+            200: openapi.Response(description="Success"),
+            400: openapi.Response(description="Bad Request"),
+            401: openapi.Response(description="Unauthorized"),
+        }
+    )
+    def get(self, request):
+        try:
+            first_date = parse_date(request.query_params['from'])
+            last_date = parse_date(request.query_params['to'])
+        except (KeyError, ValueError):
+            raise ValidationError('"from" and "to" must be dates in dd-mm-yyyy format')
+        if last_date < first_date:
+            raise ValidationError('"from" must not be later than "to"')
+        if (last_date - first_date).days >= django_settings.ACADEMIC_CALENDAR_RANGE_MAX_DAYS:
+            raise ValidationError(f'range must not exceed {django_settings.ACADEMIC_CALENDAR_RANGE_MAX_DAYS} days')
+
+        return Response({
+            calendar_day.date.strftime("%d-%m-%Y"): {
+                'week': WEEKS_RU[calendar_day.week],
+                'weekday': WEEKDAYS_RU[calendar_day.weekday],
+                'semester': calendar_day.semester,
+                'holiday': calendar_day.is_holiday
+            }
+            for calendar_day in get_academic_calendar().get_days(first_date, last_date)
+        })
+
+
+class FreeClassroomsView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        tags=['Classrooms'],
+        operation_summary="Get classrooms that have no lessons at the given time",
+        manual_parameters=[
+            openapi.Parameter(
+                name='date',
+                in_=openapi.IN_QUERY,
+                description='Date in the format dd-mm-yyyy, today by default',
+                type=openapi.TYPE_STRING,
+                required=False
+            ),
+            openapi.Parameter(
+                name='time',
+                in_=openapi.IN_QUERY,
+                description='Time in the format HH:MM, now by default',
+                type=openapi.TYPE_STRING,
+                required=False
+            ),
+            openapi.Parameter(
+                name='duration',
+                in_=openapi.IN_QUERY,
+                description='Required free time in minutes, 90 by default',
+                type=openapi.TYPE_INTEGER,
+                required=False
+            )
+        ],
+        responses={
+            200: openapi.Response(description="Success"),
+            400: openapi.Response(description="Bad Request"),
+            401: openapi.Response(description="Unauthorized"),
+        }
+    )
+    def get(self, request):
+        now = timezone.localtime()
+        try:
+            date = request.query_params.get('date')
+            date = parse_date(date) if date is not None else now.date()
+            time = request.query_params.get('time')
+            start_minute = parse_minutes(time) if time is not None else now.hour * 60 + now.minute
+            duration = int(request.query_params.get('duration', 90))
+        except ValueError:
+            raise ValidationError('date must be in dd-mm-yyyy format, time in HH:MM, duration in minutes')
+        if not 0 <= start_minute < 24 * 60 or not 0 < duration <= 24 * 60:
+            raise ValidationError('time or duration is out of range')
+
+        classrooms = classroom_index.get_free_classrooms(get_date_week(date), date.weekday(), start_minute,
+                                                         start_minute + duration)
+        return Response({
+            'date': date.strftime("%d-%m-%Y"),
+            'time': format_minutes(start_minute),
+            'duration': duration,
+            'classrooms': classrooms
+        })
+
+
+class ScheduleSearchView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        tags=['User Schedule'],
+        operation_summary="Search lessons of all groups by subject, professor or classroom",
+        manual_parameters=[
+            openapi.Parameter(
+                name='q',
+                in_=openapi.IN_QUERY,
+                description='Part of a subject name, professor name or classroom',
+                type=openapi.TYPE_STRING,
+                required=True
+            ),
+            openapi.Parameter(
+                name='field',
+                in_=openapi.IN_QUERY,
+                description='Search only in one field',
+                type=openapi.TYPE_STRING,
+                enum=list(search_index.FIELDS),
+                required=False
+            ),
+            openapi.Parameter(
+                name='limit',
+                in_=openapi.IN_QUERY,
+                description='Number of results to return per page, 50 by default',
+                type=openapi.TYPE_INTEGER,
+                required=False
+            ),
+            openapi.Parameter(
+                name='offset',
+                in_=openapi.IN_QUERY,
+                description='The initial index from which to return the results',
+                type=openapi.TYPE_INTEGER,
+                required=False
+            )
+        ],
+        responses={
+            200: openapi.Response(description="Success"),
+            400: openapi.Response(description="Bad Request"),
+            401: openapi.Response(description="Unauthorized"),
+        }
+    )
+    def get(self, request):
+        query = request.query_params.get('q', '')
+        field = request.query_params.get('field')
+        if not query.strip():
+            raise ValidationError('q must not be empty')
+        if field is not None and field not in search_index.FIELDS:
+            raise ValidationError(f'field must be one of {", ".join(search_index.FIELDS)}')
+
+        paginator = ScheduleSearchPagination()
+        lessons = paginator.paginate_queryset(search_index.search(query, [field] if field else None), request,
+                                              view=self)
+        course_groups = CourseGroup.objects.in_bulk({lesson[1] for lesson in lessons})
+        return paginator.get_paginated_response([
+            {
+                'courseGroup': CourseGroupSerializer(course_groups[course_group_id]).data
+                if course_group_id in course_groups else None,
+                'week': WEEKS[week],
+                'weekday': WEEKDAYS[weekday],
+                'timeFrom': format_minutes(start_minute),
+                'timeTo': format_minutes(end_minute),
+                'subjectName': subject_name,
+                'classroom': classroom,
+                'professor': professor
+            }
+            for _, course_group_id, week, weekday, start_minute, end_minute, subject_name, classroom, professor
+            in lessons
+        ])
+
+
+class ScheduleCacheStatsView(APIView):
+    permission_classes = [IsAdminUser]
+
+    @swagger_auto_schema(
+        tags=['User Schedule'],
+        operation_summary="Get parsed schedule cache counters of the current worker",
+        responses={
+            200: openapi.Response(description="Success"),
+            401: openapi.Response(description="Unauthorized"),
+            403: openapi.Response(description="Forbidden"),
+        }
+    )
+    def get(self, request):
+        return Response(schedule_cache.stats())
 
 
 class UserScheduleViewSet(RetrieveModelMixin, GenericViewSet):
@@ -329,21 +724,149 @@ class UserScheduleViewSet(RetrieveModelMixin, GenericViewSet):
                 description='Day of the week',
                 type=openapi.TYPE_STRING,
                 required=False
+            ),
+            openapi.Parameter(
+                name='from',
+                in_=openapi.IN_QUERY,
+                description='First date of a range in the format dd-mm-yyyy, used together with "to"',
+                type=openapi.TYPE_STRING,
+                required=False
+            ),
+            openapi.Parameter(
+                name='to',
+                in_=openapi.IN_QUERY,
+                description='Last date of a range in the format dd-mm-yyyy, used together with "from"',
+                type=openapi.TYPE_STRING,
+                required=False
             )
         ],
         responses={
             200: openapi.Response(description="Success"),
+            304: openapi.Response(description="Not Modified"),
+            400: openapi.Response(description="Bad Request"),
             401: openapi.Response(description="Unauthorized"),
             404: openapi.Response(description="Not Found"),
         }
     )
     def retrieve(self, request, *args, **kwargs):
-        instance = self.get_object()
-        return Response(instance, status=HTTP_200_OK)
+        user, user_role = self.get_schedule_user()
+        week = self.request.query_params.get('week')
+        day = self.request.query_params.get('day')
+        date_from = self.request.query_params.get('from')
+        date_to = self.request.query_params.get('to')
+
+        etag = get_user_schedule_etag(user, user_role, week, day, date_from, date_to)
+        if etag is not None:
+            etag = quote_etag(etag)
+            if etag in parse_etags(request.headers.get('If-None-Match', '')):
+                return Response(status=HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+
+        if date_from is not None and date_to is not None:
+            instance = get_user_schedule_range(user, user_role, date_from, date_to)
+        else:
+            instance = get_user_schedule(user, user_role, week, day)
+        response = Response(instance, status=HTTP_200_OK)
+        if etag is not None:
+            response['ETag'] = etag
+            response['Cache-Control'] = 'private, no-cache'
+        return response
+
+    @swagger_auto_schema(
+        tags=['User Schedule'],
+        operation_summary="Export the semester schedule and events of the user as iCalendar",
+        manual_parameters=[
+            openapi.Parameter(
+                name='date',
+                in_=openapi.IN_QUERY,
+                description='Any date of the semester in the format dd-mm-yyyy, today by default',
+                type=openapi.TYPE_STRING,
+                required=False
+            )
+        ],
+        responses={
+            200: openapi.Response(description="Success"),
+            304: openapi.Response(description="Not Modified"),
+            400: openapi.Response(description="Bad Request"),
+            401: openapi.Response(description="Unauthorized"),
+            404: openapi.Response(description="Not Found"),
+        }
+    )
+    @action(["get"], detail=False, url_path='calendar')
+    def calendar(self, request, *args, **kwargs):
+        user, user_role = self.get_schedule_user()
+        date = self.request.query_params.get('date')
+        try:
+            date = parse_date(date) if date is not None else None
+        except ValueError:
+            raise ValidationError('date must be in dd-mm-yyyy format')
+
+        etag, lines = get_user_calendar(user, user_role, date)
+        if etag is not None:
+            etag = quote_etag(etag)
+            if etag in parse_etags(request.headers.get('If-None-Match', '')):
+                return HttpResponseNotModified(headers={'ETag': etag})
+
+        response = StreamingHttpResponse(lines, content_type='text/calendar; charset=utf-8')
+        response['Content-Disposition'] = 'attachment; filename="schedule.ics"'
+        if etag is not None:
+            response['ETag'] = etag
+            response['Cache-Control'] = 'private, no-cache'
+        return response
+
+    @swagger_auto_schema(
+        tags=['User Schedule'],
+        operation_summary="Get the next lesson of the user",
+        responses={
+            200: openapi.Response(description="Success"),
+            204: openapi.Response(description="No lessons in the next weeks"),
+            401: openapi.Response(description="Unauthorized"),
+            404: openapi.Response(description="Not Found"),
+        }
+    )
+    @action(["get"], detail=False, url_path='next')
+    def next(self, request, *args, **kwargs):
+        user, user_role = self.get_schedule_user()
+        if user_role == 'professor':
+            owner = ('professor', get_professor_identification(user))
+        else:
+            owner = ('group', user.course_group_id)
+
+        now = timezone.localtime()
+        day, lessons = next_lesson_index.get_next_lessons(owner, now)
+        if day is None:
+            return Response(status=status.HTTP_204_NO_CONTENT, headers={'Cache-Control': 'private, no-cache'})
+
+        couples = {}
+        for _, course_group_id, _, _, start_minute, end_minute, subject_name, classroom, professor in lessons:
+            couple = couples.setdefault((end_minute, subject_name, classroom, professor), {
+                'timeFrom': format_minutes(start_minute),
+                'timeTo': format_minutes(end_minute),
+                'subjectName': subject_name,
+                'classroom': classroom,
+                'professor': professor,
+                'courseGroups': []
+            })
+            couple['courseGroups'].append(course_group_id)
+
+        start_minute = lessons[0][4]
+        starts_at = timezone.make_aware(
+            datetime.datetime.combine(day.date, datetime.time(start_minute // 60, start_minute % 60)))
+        response = Response({
+            'date': day.date.strftime("%d-%m-%Y"),
+            'week': WEEKS[day.week],
+            'weekday': WEEKDAYS[day.weekday],
+            'lessons': list(couples.values())
+        })
+        response['Cache-Control'] = f'private, max-age={max(int((starts_at - now).total_seconds()), 0)}'
+        return response
 
     def get_object(self):
         week = self.request.query_params.get('week')
         day = self.request.query_params.get('day')
+        user, user_role = self.get_schedule_user()
+        return get_user_schedule(user, user_role, week, day)
+
+    def get_schedule_user(self):
         user_role = None
         user = None
 
@@ -370,7 +893,7 @@ class UserScheduleViewSet(RetrieveModelMixin, GenericViewSet):
         if err_count >= 2:
             raise Exception('user dont load')
 
-        return get_user_schedule(user, user_role, week, day)
+        return user, user_role
 
 
 # id - ignored
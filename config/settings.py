@@ -167,6 +167,63 @@ CRONJOBS = [
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+SCHEDULE_CACHE_SIZE = int(os.getenv("SCHEDULE_CACHE_SIZE", 256))
+SCHEDULE_RANGE_MAX_DAYS = 62
+SCHEDULE_INDEX_REFRESH_SECONDS = int(os.getenv("SCHEDULE_INDEX_REFRESH_SECONDS", 30))
+# what to do with professor and classroom conflicts of an uploaded schedule: 'warn' or 'reject'
+SCHEDULE_CONFLICTS = os.getenv("SCHEDULE_CONFLICTS", "warn")
+# (name, (month, day) start, (month, day) end) of every semester of a year
+SCHEDULE_SEMESTERS = [
+    ('spring', (2, 1), (5, 31)),
+    ('autumn', (9, 1), (12, 31)),
+]
+# function of a date returning 'n' (numerator) or 'd' (denominator)
+ACADEMIC_WEEK_PARITY = 'api.academic_calendar.iso_week_parity'
+# (month, day) of public holidays, Sundays are always holidays
+ACADEMIC_HOLIDAYS = [
+    (1, 1), (1, 2), (1, 3), (1, 4), (1, 5), (1, 6), (1, 7), (1, 8),
+    (2, 23), (3, 8), (5, 1), (5, 9), (6, 12), (11, 4),
+]
+ACADEMIC_CALENDAR_RANGE_MAX_DAYS = 366
+# event feeds are invalidated on change, the timeout bounds staleness when workers do not share the cache
+EVENT_FEED_CACHE_TIMEOUT = int(os.getenv("EVENT_FEED_CACHE_TIMEOUT", 300))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'api': {
+            'handlers': ['console'],
+            'level': os.getenv("API_LOG_LEVEL", "INFO"),
+        },
+    },
+}
+
+# walls (domains or owner ids) polled by api.news_parser.get_news
+NEWS_SOURCES = [source.strip() for source in os.getenv("NEWS_SOURCES", os.getenv("DOMAIN", "")).split(",")
+                if source.strip()]
+VK_API_URL = os.getenv("VK_API_URL", "https://api.vk.com/method/")
+NEWS_PAGE_SIZE = min(int(os.getenv("NEWS_COUNT", 100)), 100)
+# bound on posts fetched from one wall in a run when catching up
+NEWS_MAX_POSTS = int(os.getenv("NEWS_MAX_POSTS", 1000))
+NEWS_FETCH_CONCURRENCY = int(os.getenv("NEWS_FETCH_CONCURRENCY", 4))
+NEWS_FETCH_TIMEOUT = float(os.getenv("NEWS_FETCH_TIMEOUT", 15))
+NEWS_FETCH_RETRIES = int(os.getenv("NEWS_FETCH_RETRIES", 3))
+NEWS_FETCH_BACKOFF = float(os.getenv("NEWS_FETCH_BACKOFF", 1))
+# publication photos are mirrored into MEDIA_ROOT/NEWS_IMAGE_DIR as WebP and JPEG of these widths
+NEWS_IMAGE_DIR = 'publications'
+NEWS_IMAGE_WIDTHS = [320, 640, 1280]
+NEWS_IMAGE_QUALITY = 80
+NEWS_IMAGE_WORKERS = int(os.getenv("NEWS_IMAGE_WORKERS", 4))
+# rendered publication pages are keyed by the version stored in PublicationFeedVersion
+PUBLICATION_CACHE_TIMEOUT = int(os.getenv("PUBLICATION_CACHE_TIMEOUT", 300))
+PUBLICATION_CACHE_GZIP_LEVEL = 6
+
 STATICFILES_DIRS = [
 ]
 